@@ -0,0 +1,13 @@
+""" Benchmark suite for broqer. It is only using the standard library.
+
+Run all benchmarks and save the report::
+
+    $ python -m benchmarks --output baseline.json
+
+Compare a later run with the saved report (exit code 1 on regressions)::
+
+    $ python -m benchmarks --compare baseline.json --threshold 1.2
+
+Use ``--list`` to show the available cases and ``--filter 'map_*'`` to run a
+subset.
+"""
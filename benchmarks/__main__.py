@@ -0,0 +1,6 @@
+""" Entry point for ``python -m benchmarks`` """
+import sys
+
+from benchmarks.suite import main
+
+sys.exit(main())
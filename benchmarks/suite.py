@@ -0,0 +1,433 @@
+""" Benchmark cases for broqer and the runner measuring them.
+
+Each case is a function decorated with ``@benchmark(name, params)``. It is
+called once per parameter to build the workload and returns a tuple
+``(function, operations)``: ``function`` is timed and is executing
+``operations`` operations per call. The result of a case is the best time per
+operation in nanoseconds over several repeats. Each case is built and measured
+with its own event loop (see ``event_loop()``), which is passed to the cases
+registered with ``uses_loop=True``.
+"""
+import asyncio
+from contextlib import contextmanager
+from fnmatch import fnmatch
+from functools import partial
+import gc
+import json
+import platform
+import sys
+import time
+import timeit
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, \
+    Tuple
+
+import broqer
+from broqer import Publisher, Value, Sink, SinkAsync, op
+from broqer.coro_queue import AsyncMode, CoroQueue
+from broqer.publishers import PollPublisher
+from broqer.timer import Timer, TimerWheel
+
+WorkloadT = Tuple[Callable[[], Any], int]
+BuildT = Callable[[asyncio.AbstractEventLoop], WorkloadT]
+
+_CASES = []  # type: List[Tuple[str, BuildT]]
+
+
+def benchmark(name: str, params: Iterable[Any] = (None,),
+              uses_loop: bool = False) -> Callable:
+    """ Register the decorated function as benchmark case for each parameter.
+    The name of the case is ``name[param]`` (or ``name`` without parameter).
+    Each case is registered as function building the workload for a given
+    event loop.
+
+    :param uses_loop: if True, the decorated function is called with the
+        parameter and the event loop, otherwise only with the parameter
+    """
+    def _decorator(function: Callable[..., WorkloadT]) -> Callable:
+        for param in params:
+            case_name = name if param is None else f'{name}[{param}]'
+
+            if uses_loop:
+                build = partial(function, param)  # type: BuildT
+            else:
+                build = partial(_without_loop, function, param)
+
+            _CASES.append((case_name, build))
+        return function
+    return _decorator
+
+
+def _without_loop(function: Callable[[Any], WorkloadT], param: Any,
+                  _loop: asyncio.AbstractEventLoop) -> WorkloadT:
+    return function(param)
+
+
+def _nop(*_args: Any) -> None:
+    pass
+
+
+# --- synchronous dispatch ---------------------------------------------------
+
+@benchmark('notify_fanout', (1, 10, 1000, 10000))
+def _notify_fanout(subscribers: int) -> WorkloadT:
+    publisher = Publisher()
+
+    for _ in range(subscribers):
+        publisher.subscribe(Sink(_nop))
+
+    return (lambda: publisher.notify(1)), 1
+
+
+@benchmark('map_chain', (1, 10, 100))
+def _map_chain(depth: int) -> WorkloadT:
+    source = Value(0)
+    publisher = source
+
+    for _ in range(depth):
+        publisher = publisher | op.Map(lambda v: v + 1)
+
+    publisher.subscribe(Sink(_nop))
+    values = iter(range(10**9))
+    return (lambda: source.emit(next(values))), 1
+
+
+@benchmark('filter_chain', (1, 10, 100))
+def _filter_chain(depth: int) -> WorkloadT:
+    source = Value(0)
+    publisher = source
+
+    for _ in range(depth):
+        publisher = publisher | op.Filter(lambda v: v >= 0)
+
+    publisher.subscribe(Sink(_nop))
+    values = iter(range(10**9))
+    return (lambda: source.emit(next(values))), 1
+
+
+@benchmark('combine_latest_width', (2, 10, 100, 1000))
+def _combine_latest_width(width: int) -> WorkloadT:
+    sources = [Value(0) for _ in range(width)]
+    op.CombineLatest(*sources).subscribe(Sink(_nop))
+    values = iter(range(10**9))
+    return (lambda: sources[0].emit(next(values))), 1
+
+
+@benchmark('expression', ('tree', 'compiled'))
+def _expression(mode: str) -> WorkloadT:
+    a, b, c = Value(1), Value(2), Value(3)  # type: Any, Any, Any
+    expression = (a * 3 + b) > c
+
+    if mode == 'compiled':
+        expression = broqer.compile_expression(expression)
+
+    expression.subscribe(Sink(_nop))
+    values = iter(range(10**9))
+    return (lambda: a.emit(next(values))), 1
+
+
+@benchmark('cache', ('duplicate', 'distinct'))
+def _cache(mode: str) -> WorkloadT:
+    source = Value(0)
+    (source | op.Cache()).subscribe(Sink(_nop))
+
+    if mode == 'duplicate':
+        return (lambda: source.emit(1)), 1
+
+    values = iter(range(10**9))
+    return (lambda: source.emit(next(values))), 1
+
+
+# --- asynchronous paths -----------------------------------------------------
+
+_ASYNC_OPERATIONS = 100
+
+
+@contextmanager
+def event_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """ Provide a new event loop for building and measuring a case. The loop
+    is passed explicitly, the current event loop is not changed. When leaving
+    the context, pending tasks are cancelled and the loop is closed.
+    """
+    loop = asyncio.new_event_loop()
+
+    try:
+        yield loop
+    finally:
+        try:
+            tasks = [task for task in asyncio.all_tasks(loop)
+                     if not task.done()]
+
+            for task in tasks:
+                task.cancel()
+
+            if tasks:
+                # gather() without tasks would use the current event loop
+                loop.run_until_complete(
+                    asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+
+async def _identity(value: Any) -> Any:
+    return value
+
+
+@benchmark('coro_queue', [mode.name for mode in AsyncMode], uses_loop=True)
+def _coro_queue(mode_name: str, loop: asyncio.AbstractEventLoop) -> WorkloadT:
+    queue = CoroQueue(_identity, mode=AsyncMode[mode_name])
+
+    async def _run():
+        futures = [queue.schedule(i) for i in range(_ASYNC_OPERATIONS)]
+        await asyncio.gather(*futures)
+
+    return (lambda: loop.run_until_complete(_run())), _ASYNC_OPERATIONS
+
+
+def _latency_workload(loop: asyncio.AbstractEventLoop, source: Value,
+                      results: List[asyncio.Future]) -> WorkloadT:
+    """ Measure the time from an emit until the result arrived """
+    async def _run():
+        for value in range(_ASYNC_OPERATIONS):
+            results[0] = loop.create_future()
+            source.emit(value)
+            await results[0]
+
+    return (lambda: loop.run_until_complete(_run())), _ASYNC_OPERATIONS
+
+
+@benchmark('map_async_latency', uses_loop=True)
+def _map_async_latency(_param: None,
+                       loop: asyncio.AbstractEventLoop) -> WorkloadT:
+    source = Value()
+    results = [loop.create_future()]
+
+    (source | op.MapAsync(_identity)).subscribe(
+        Sink(lambda v: results[0].set_result(v)))
+
+    return _latency_workload(loop, source, results)
+
+
+@benchmark('sink_async_latency', uses_loop=True)
+def _sink_async_latency(_param: None,
+                        loop: asyncio.AbstractEventLoop) -> WorkloadT:
+    source = Value()
+    results = [loop.create_future()]
+
+    async def _set_result(value):
+        results[0].set_result(value)
+
+    source.subscribe(SinkAsync(_set_result))
+    return _latency_workload(loop, source, results)
+
+
+@benchmark('throttle_emit', ('loop', 'wheel'), uses_loop=True)
+def _throttle_emit(backend: str, loop: asyncio.AbstractEventLoop) -> WorkloadT:
+    wheel = TimerWheel(loop=loop) if backend == 'wheel' else None
+    source = Value()
+    throttle = source | op.Throttle(0.001, loop=loop, wheel=wheel)
+    throttle.subscribe(Sink(_nop))
+
+    async def _run():
+        for value in range(_ASYNC_OPERATIONS):
+            source.emit(value)
+        throttle.reset()
+
+    return (lambda: loop.run_until_complete(_run())), _ASYNC_OPERATIONS
+
+
+@benchmark('rate_reducing', ('Debounce', 'Sample', 'Delay'), uses_loop=True)
+def _rate_reducing(operator: str,
+                   loop: asyncio.AbstractEventLoop) -> WorkloadT:
+    source = Value()
+    publisher = source | getattr(op, operator)(0.001, loop=loop)
+    publisher.subscribe(Sink(_nop))
+
+    async def _run():
+        for value in range(_ASYNC_OPERATIONS):
+            source.emit(value)
+        publisher.reset_state()
+
+    return (lambda: loop.run_until_complete(_run())), _ASYNC_OPERATIONS
+
+
+@benchmark('timer_restart', ('loop', 'wheel'), uses_loop=True)
+def _timer_restart(backend: str, loop: asyncio.AbstractEventLoop) -> WorkloadT:
+    wheel = TimerWheel(loop=loop) if backend == 'wheel' else None
+    timers = [Timer(_nop, loop=loop, wheel=wheel) for _ in range(1000)]
+
+    def _restart():
+        for timer in timers:
+            timer.start(1)
+
+        for timer in timers:
+            timer.cancel()
+
+    return _restart, 2 * len(timers)
+
+
+@benchmark('poll_publisher', uses_loop=True)
+def _poll_publisher(_param: None,
+                    loop: asyncio.AbstractEventLoop) -> WorkloadT:
+
+    async def _run():
+        done = loop.create_future()
+        count = [0]
+
+        def _poll():
+            count[0] += 1
+
+            if count[0] == _ASYNC_OPERATIONS and not done.done():
+                done.set_result(None)
+
+            return count[0]
+
+        disposable = PollPublisher(_poll, 0).subscribe(Sink(_nop))
+        await done
+        disposable.dispose()
+
+    return (lambda: loop.run_until_complete(_run())), _ASYNC_OPERATIONS
+
+
+# --- runner -----------------------------------------------------------------
+
+def measure(workload: WorkloadT, repeat: int = 5,
+            min_time: float = 0.2) -> float:
+    """ Return the best time per operation in nanoseconds
+
+    :param workload: tuple (function, operations per call)
+    :param repeat: number of measurements
+    :param min_time: minimal duration of a single measurement in seconds
+    """
+    function, operations = workload
+    timer = timeit.Timer(function)
+    number = 1
+
+    # calibrate the number of calls per measurement
+    while timer.timeit(number) < min_time:
+        number *= 2
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        best = min(timer.repeat(repeat=repeat, number=number))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return best / number / operations * 1e9
+
+
+def run(pattern: str = '*', repeat: int = 5, min_time: float = 0.2,
+        log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """ Run all cases matching the pattern and return the report
+
+    :param pattern: shell-style pattern selecting the cases by name
+    :param repeat: number of measurements per case
+    :param min_time: minimal duration of a single measurement in seconds
+    :param log: optional function called with a line for each result
+    """
+    results = {}  # type: Dict[str, Dict[str, float]]
+
+    for name, build in _CASES:
+        if not fnmatch(name, pattern):
+            continue
+
+        with event_loop() as loop:
+            nanoseconds = measure(build(loop), repeat, min_time)
+        results[name] = {'ns_per_op': nanoseconds}
+
+        if log is not None:
+            log(f'{name:40} {nanoseconds:12.1f} ns/op')
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'broqer': broqer.__version__,
+        'timestamp': time.time(),
+        'results': results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = 1.1) -> Tuple[List[str], List[str]]:
+    """ Compare the results with a baseline report
+
+    :param report: report returned by run()
+    :param baseline: report of a previous run
+    :param threshold: ratio (current / baseline) regarded as regression
+    :returns: tuple (lines of the comparison table, names of regressions)
+    """
+    lines = [f'{"case":40} {"baseline":>12} {"current":>12} {"ratio":>7}']
+    regressions = []
+
+    for name, result in report['results'].items():
+        previous = baseline['results'].get(name, None)
+
+        if previous is None:
+            lines.append(f'{name:40} {"-":>12} '
+                         f'{result["ns_per_op"]:12.1f} {"new":>7}')
+            continue
+
+        ratio = result['ns_per_op'] / previous['ns_per_op']
+        marker = ''
+
+        if ratio > threshold:
+            regressions.append(name)
+            marker = ' <- regression'
+
+        lines.append(f'{name:40} {previous["ns_per_op"]:12.1f} '
+                     f'{result["ns_per_op"]:12.1f} {ratio:7.2f}{marker}')
+
+    return lines, regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """ Command line interface (see ``python -m benchmarks --help``) """
+    # pylint: disable=import-outside-toplevel
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description='Run broqer benchmarks')
+    parser.add_argument('-k', '--filter', default='*',
+                        help='shell-style pattern to select cases')
+    parser.add_argument('-o', '--output',
+                        help='write the report as JSON to this file')
+    parser.add_argument('-c', '--compare',
+                        help='compare with a report saved before')
+    parser.add_argument('-t', '--threshold', type=float, default=1.1,
+                        help='ratio regarded as regression (default 1.1)')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='measurements per case (default 5)')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimal duration of a measurement in seconds')
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='list the cases and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, _ in _CASES:
+            if fnmatch(name, args.filter):
+                print(name)
+        return 0
+
+    report = run(args.filter, args.repeat, args.min_time, log=print)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+
+        lines, regressions = compare(report, baseline, args.threshold)
+        print('\n'.join(lines))
+
+        if regressions:
+            print(f'{len(regressions)} regression(s): '
+                  f'{", ".join(regressions)}', file=sys.stderr)
+            return 1
+
+    return 0
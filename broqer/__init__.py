@@ -2,21 +2,46 @@
 of data in a reactive style with publish/subscribe and broker functionality.
 """
 
+from typing import TYPE_CHECKING
+
 from .error_handler import default_error_handler
 from .disposable import Disposable
 from .types import NONE
 from .publisher import Publisher, SubscriptionDisposable, SubscriptionError
 from .subscriber import Subscriber
-from .subscribers import (OnEmitFuture, Sink, Trace, build_sink,
-                          build_sink_factory, sink_property, SinkAsync,
-                          build_sink_async, build_sink_async_factory,
-                          sink_async_property, MaxQueueException)
+from .subscribers.sink import Sink, build_sink, build_sink_factory, \
+    sink_property
 from .value import Value
+from .lazy_import import lazy_import
 
 from .operator_overloading import apply_operator_overloading
 
 apply_operator_overloading()
 
+# operators, the asyncio based subscribers and less used features are loaded
+# on first access to keep ``import broqer`` fast
+__getattr__, __dir__ = lazy_import(__name__, {
+    'OnEmitFuture': '.subscribers',
+    'Trace': '.subscribers',
+    'TraceBuffer': '.subscribers',
+    'SinkAsync': '.subscribers',
+    'build_sink_async': '.subscribers',
+    'build_sink_async_factory': '.subscribers',
+    'sink_async_property': '.subscribers',
+    'MaxQueueException': '.subscribers',
+    'TopologicalPropagation': '.propagation',
+    'batch': '.propagation',
+    'compile_expression': '.compiler',
+}, submodules=('op',))
+
+if TYPE_CHECKING:
+    from . import op
+    from .subscribers import (OnEmitFuture, Trace, TraceBuffer, SinkAsync,
+                              build_sink_async, build_sink_async_factory,
+                              sink_async_property, MaxQueueException)
+    from .propagation import TopologicalPropagation, batch
+    from .compiler import compile_expression
+
 
 __author__ = 'Günther Jena'
 __email__ = 'guenther@jena.at'
@@ -29,7 +54,9 @@ except ImportError:
 __all__ = [
     'default_error_handler', 'Disposable', 'NONE', 'Publisher',
     'SubscriptionDisposable', 'SubscriptionError', 'Subscriber',
-    'OnEmitFuture', 'Sink', 'Trace', 'build_sink', 'build_sink_factory',
-    'sink_property', 'Value', 'op', 'SinkAsync', 'build_sink_async',
-    'build_sink_async_factory', 'sink_async_property', 'MaxQueueException'
+    'OnEmitFuture', 'Sink', 'Trace', 'TraceBuffer', 'build_sink',
+    'build_sink_factory', 'sink_property', 'Value', 'op', 'SinkAsync',
+    'build_sink_async', 'build_sink_async_factory', 'sink_async_property',
+    'MaxQueueException', 'TopologicalPropagation', 'batch',
+    'compile_expression'
 ]
@@ -0,0 +1,179 @@
+"""
+Compile expressions built by operator overloading into a single publisher.
+
+An expression like ``(a * 3 + b) > c`` is building a tree of operators (one
+for each operation). ``compile_expression`` is flattening this tree into one
+``CombineLatest`` over the leaf publishers ``a``, ``b`` and ``c`` using a
+generated function evaluating the whole expression:
+
+>>> from broqer import Value, Sink, compile_expression
+>>> a, b, c = Value(1), Value(2), Value(4)
+>>> expression = compile_expression((a * 3 + b) > c)
+>>> len(expression.dependencies)
+3
+>>> _d = expression.subscribe(Sink(print))
+True
+>>> a.emit(0)
+False
+>>> _d.dispose()
+
+As the leaf publishers are subscribed once, expressions using a publisher
+multiple times are evaluated once per emit (without glitches):
+
+>>> _d = compile_expression((a + 1) * (a - 1)).subscribe(Sink(print))
+-1
+>>> a.emit(2)
+3
+"""
+import operator
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, \
+    Tuple
+
+from broqer import Publisher
+from broqer.operator_overloading import MapConstant, MapConstantReverse, \
+    MapUnary, _GetAttr, BINARY_METHODS
+
+if TYPE_CHECKING:
+    # pylint: disable=cyclic-import
+    from broqer.op import CombineLatest
+
+# functions used by CombineLatest built via operator overloading
+_BINARY_OPERATIONS = {getattr(operator, method) for method in BINARY_METHODS}
+
+
+class _ExpressionBuilder:
+    """ Build the source code of the evaluation function for an expression
+    tree. Leaf publishers are becoming the arguments ``v0``, ``v1``, ...,
+    operations and constants are stored in the namespace of the function. The
+    result of each operator is assigned to a local variable, so operators used
+    multiple times in the tree are evaluated once.
+    """
+    def __init__(self) -> None:
+        self.leaves = []  # type: List[Publisher]
+        self.namespace = {}  # type: Dict[str, Any]
+        self.lines = []  # type: List[str]
+        self._names = {}  # type: Dict[int, str]
+
+    def _constant(self, obj: Any) -> str:
+        name = f'_c{len(self.namespace)}'
+        self.namespace[name] = obj
+        return name
+
+    def build(self, root: Publisher) -> str:
+        """ Add the evaluation of the tree with the given root and return the
+        name of the variable holding its result. The tree is traversed
+        iteratively (children first), so deep trees are not limited by the
+        recursion limit.
+        """
+        stack = [root]
+
+        while stack:
+            node = stack[-1]
+
+            if id(node) in self._names:
+                stack.pop()
+                continue
+
+            operation = _operation(node)
+
+            if operation is None:
+                stack.pop()
+                self._names[id(node)] = f'v{len(self.leaves)}'
+                self.leaves.append(node)
+                continue
+
+            function, children, constants, template = operation
+            missing = [c for c in children if id(c) not in self._names]
+
+            if missing:
+                stack.extend(reversed(missing))
+                continue
+
+            stack.pop()
+            name = self._names[id(node)] = f'_t{len(self.lines)}'
+            arguments = [self._names[id(c)] for c in children] + \
+                [self._constant(c) for c in constants]
+            self.lines.append(
+                f'{name} = {self._constant(function)}'
+                f'{template.format(*arguments)}')
+
+        return self._names[id(root)]
+
+
+def _operation(node: Any) -> Optional[Tuple[Callable, Tuple, Tuple, str]]:
+    """ Describe the operation of an operator built by operator overloading.
+
+    :returns: None for leaves, otherwise a tuple with the function, the
+        child publishers, the constants and the template for the arguments
+        (children and constants are used in this order for formatting)
+    """
+    from broqer.op import CombineLatest  # pylint: disable=C0415
+
+    # pylint: disable=protected-access
+    node_type = type(node)
+
+    if node_type is MapConstant:
+        return (node._operation, (node._originator,), (node._value,),
+                '({0}, {1})')
+
+    if node_type is MapConstantReverse:
+        return (node._operation, (node._originator,), (node._value,),
+                '({1}, {0})')
+
+    if node_type is MapUnary:
+        return (node._operation, (node._originator,), (), '({0})')
+
+    if node_type is _GetAttr:
+        if node._args is None:
+            return (getattr, (node._originator,), (node._attribute_name,),
+                    '({0}, {1})')
+
+        return (getattr, (node._originator,),
+                (node._attribute_name, node._args, node._kwargs),
+                '({0}, {1})(*{2}, **{3})')
+
+    if node_type is CombineLatest and _is_binary_operation(node):
+        return (node._map, node._originators, (), '({0}, {1})')
+
+    return None
+
+
+def _is_binary_operation(combine_latest: 'CombineLatest') -> bool:
+    """ Check if the CombineLatest was built by operator overloading """
+    # pylint: disable=protected-access
+    return combine_latest._map in _BINARY_OPERATIONS and \
+        len(combine_latest._originators) == 2 and \
+        combine_latest._emit_on is None and \
+        not combine_latest._emit_partial and \
+        not combine_latest._incremental
+
+
+def compile_expression(publisher: Publisher) -> Publisher:
+    """ Flatten an expression tree built by operator overloading (including
+    attribute access and method calls on publishers with inherited type) into
+    a single ``CombineLatest`` over the leaf publishers.
+
+    The original operators are not changed. When the given publisher is not
+    an expression it is returned unchanged.
+
+    :param publisher: root of the expression tree
+    :returns: CombineLatest evaluating the expression
+    """
+    from broqer.op import CombineLatest  # pylint: disable=C0415
+
+    builder = _ExpressionBuilder()
+    result_name = builder.build(publisher)
+
+    if not builder.lines:
+        return publisher
+
+    arguments = ', '.join(f'v{i}' for i in range(len(builder.leaves)))
+    body = ''.join(f'    {line}\n' for line in builder.lines)
+    source = f'def _expression({arguments}):\n{body}    return {result_name}\n'
+
+    exec(source, builder.namespace)  # pylint: disable=exec-used
+
+    result = CombineLatest(*builder.leaves,
+                           map_=builder.namespace['_expression'])
+    result.inherit_type(publisher.inherited_type)
+    return result
@@ -0,0 +1,175 @@
+"""
+Base classes for indices evaluating many operators of one publisher.
+
+An index is subscribing the publisher on behalf of all subscribed indexed
+operators (e.g. comparisons with constants or projections on keys). On an emit
+of the publisher the index is only evaluating the operators whose result may
+have changed. Subclasses are defining how the operators are stored and how
+the candidates for an emit are looked up.
+"""
+import sys
+from typing import Any, Callable, Iterable, Type
+import weakref
+
+from broqer import Publisher, Subscriber, NONE, default_error_handler
+from broqer.operator_overloading import MapConstant
+
+
+class ConstantIndex(Subscriber):
+    """ Index subscribing a publisher on behalf of all its subscribed
+    ``IndexedMapConstant`` operators.
+
+    Use ``.of(publisher)`` to get the index shared by all operators of a
+    publisher. Each subclass is keeping its own indices.
+
+    :param publisher: the publisher being indexed
+    """
+    __slots__ = ('_publisher', '_value', '_count', '__weakref__')
+
+    # index for each publisher (by id - the index is keeping the publisher
+    # alive, so the id is valid as long as the index exists)
+    _indices = \
+        weakref.WeakValueDictionary()  # type: weakref.WeakValueDictionary
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._indices = weakref.WeakValueDictionary()
+
+    def __init__(self, publisher: Publisher) -> None:
+        self._publisher = publisher
+        self._value = NONE  # type: Any
+        self._count = 0
+
+    @classmethod
+    def of(cls, publisher: Publisher) -> Any:
+        """ Return the index for the publisher (build it if not existing) """
+        index = cls._indices.get(id(publisher), None)
+
+        if index is None:
+            index = cls._indices[id(publisher)] = cls(publisher)
+
+        return index
+
+    def add(self, operator: 'IndexedMapConstant') -> None:
+        """ Register an operator and evaluate its current result. The first
+        registered operator is subscribing the publisher.
+        """
+        self._insert(operator)
+        self._count += 1
+
+        if self._count == 1:
+            # subscription is emitting the state, which is evaluating all
+            self._publisher.subscribe(self)
+        elif self._value is not NONE:
+            self._update(operator, self._value)
+
+    def remove(self, operator: 'IndexedMapConstant') -> None:
+        """ Unregister an operator. When no operator is left the publisher
+        gets unsubscribed.
+        """
+        self._discard(operator)
+        self._count -= 1
+
+        if not self._count:
+            self._publisher.unsubscribe(self)
+            self._value = NONE
+
+    def _insert(self, operator: 'IndexedMapConstant') -> None:
+        """ Store the operator in the lookup structure of the index """
+        raise NotImplementedError()
+
+    def _discard(self, operator: 'IndexedMapConstant') -> None:
+        """ Remove the operator from the lookup structure of the index """
+        raise NotImplementedError()
+
+    def _all(self) -> Iterable['IndexedMapConstant']:
+        """ Return all registered operators """
+        raise NotImplementedError()
+
+    def _candidates(self, previous: Any, value: Any
+                    ) -> Iterable['IndexedMapConstant']:
+        """ Return the operators whose result may change when the value of
+        the publisher is changing from previous to value. """
+        raise NotImplementedError()
+
+    def _update(self, operator: 'IndexedMapConstant', value: Any) -> None:
+        """ Evaluate the operator for the new value of the publisher and pass
+        errors (e.g. a failing comparison or a missing key) to the error
+        handler without disturbing the other operators """
+        try:
+            operator.update(value)
+        except Exception:  # pylint: disable=broad-except
+            default_error_handler(*sys.exc_info())
+
+    def emit(self, value: Any, who: Publisher) -> None:
+        if who is not self._publisher:
+            raise ValueError('Emit from non assigned publisher')
+
+        previous, self._value = self._value, value
+
+        for operator in self._candidates(previous, value):
+            self._update(operator, value)
+
+    def reset_state(self) -> None:
+        self._value = NONE
+
+        for operator in self._all():
+            operator.reset_state()
+
+
+class IndexedMapConstant(MapConstant):
+    """ Operation of a publisher with a constant evaluated via an index of
+    the publisher (given by ``_index_type``). Only emitting when the result
+    is changing.
+
+    :param publisher: source publisher
+    :param value: constant used as second argument for the operation
+    :param operation: two argument function
+    """
+    __slots__ = ('_index', '_result')
+
+    _index_type = ConstantIndex  # type: Type[ConstantIndex]
+
+    def __init__(self, publisher: Publisher, value: Any,
+                 operation: Callable[[Any, Any], Any]) -> None:
+        MapConstant.__init__(self, publisher, value, operation)
+        self._index = self._index_type.of(publisher)
+        self._result = NONE  # type: Any
+
+    def subscribe(self, subscriber: Subscriber, prepend: bool = False,
+                  weak: bool = False):
+        disposable = Publisher.subscribe(self, subscriber, prepend, weak)
+
+        if len(self._subscriptions) == 1:
+            # the index is subscribing the originator instead of this operator
+            self._index.add(self)
+
+        return disposable
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        Publisher.unsubscribe(self, subscriber)
+
+        if not self._subscriptions:
+            self._index.remove(self)
+            self._result = NONE
+            Publisher.reset_state(self)
+
+    def update(self, value: Any) -> None:
+        """ Evaluate the operation for the new value of the publisher and
+        notify the subscribers when the result changed """
+        result = self._operation(value, self._value)
+
+        if self._result is NONE or \
+                (result is not self._result and result != self._result):
+            self._result = result
+            Publisher.notify(self, result)
+
+    def emit(self, value: Any, who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        self.update(value)
+
+    def reset_state(self) -> None:
+        self._result = NONE
+        Publisher.reset_state(self)
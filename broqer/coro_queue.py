@@ -24,7 +24,8 @@ def wrap_coro(coro, unpack, *args, **kwargs):
 
 
 class MaxQueueException(Exception):
-    """ Exception raised when max_queue_threshold is exceeded in CoroQueue """
+    """ Exception raised when max_queue_threshold is exceeded in CoroQueue
+    or the queue of the RateLimit operator is full """
 
 
 class AsyncMode(Enum):
@@ -64,6 +65,9 @@ class CoroQueue:  # pylint: disable=too-few-public-methods
         # ._task is the reference to a running coroutine encapsulated as task
         self._task = None  # type: Optional[asyncio.Future]
 
+        # number of running tasks (may be more than one in CONCURRENT mode)
+        self._running = 0
+
         # queue is initialized with following sizes:
         # Mode:                size:
         # QUEUE                unlimited
@@ -76,6 +80,12 @@ class CoroQueue:  # pylint: disable=too-few-public-methods
             maxlen = (None if mode is AsyncMode.QUEUE else 1)
             self._queue = deque(maxlen=maxlen)
 
+    def __len__(self) -> int:
+        """ Number of scheduled coroutine runs (running and queued). Cancelled
+        runs are counted until they are finished.
+        """
+        return self._running + (len(self._queue) if self._queue else 0)
+
     def schedule(self, *args: Any) -> asyncio.Future:
         """ Schedule a coroutine run with the given arguments
         :param *args: variable length arguments
@@ -121,9 +131,12 @@ class CoroQueue:  # pylint: disable=too-few-public-methods
 
         # create a task out of it and add ._task_done as callback
         self._task = asyncio.ensure_future(self._coro(*args))
+        self._running += 1
         self._task.add_done_callback(partial(self._handle_done, future))
 
     def _handle_done(self, result_future: asyncio.Future, task: asyncio.Task):
+        self._running -= 1
+
         try:
             result = task.result()
             if self._queue and self._max_queue_threshold is not None and \
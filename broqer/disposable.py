@@ -21,6 +21,8 @@ class Disposable(metaclass=ABCMeta):
         working
         DISPOSED
     """
+    __slots__ = ()
+
     @abstractmethod
     def dispose(self) -> None:
         """ .dispose() method has to be overwritten"""
@@ -2,17 +2,16 @@
 as global object to register a callbacks for exceptions in asynchronous
 operators, """
 
-import logging
-
-
-log = logging.getLogger(__name__)
-
 
 def _default_error_callback(exc_type, exc_value, exc_traceback):
     """ Default error callback is printing traceback of the exception
     """
+    # logging is imported on first use to keep ``import broqer`` fast
+    import logging  # pylint: disable=import-outside-toplevel
+
     exc_info = (exc_type, exc_value, exc_traceback)
-    log.warning('broqer catched exception', exc_info=exc_info)
+    logging.getLogger(__name__).warning('broqer catched exception',
+                                        exc_info=exc_info)
 
     raise exc_value.with_traceback(exc_traceback)
 
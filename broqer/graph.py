@@ -0,0 +1,386 @@
+"""
+Analyze the graph of publishers and subscribers.
+
+``Graph(*roots)`` is discovering all nodes reachable from the given roots by
+following the subscriptions (downstream) and the dependencies (upstream) of
+the publishers. The graph can be analyzed and exported to DOT (for graphviz)
+and JSON:
+
+>>> from broqer import Value, Sink, op
+>>> x = Value(1)
+>>> a = x + 1
+>>> b = x * 2
+>>> c = a + b
+>>> _d = c.subscribe(Sink())
+>>> unused = x | op.Map(str)
+
+>>> graph = Graph(x, unused)
+>>> statistics = graph.statistics()
+>>> statistics['nodes'], statistics['max_depth']
+(6, 3)
+>>> statistics['types']['MapConstant']
+2
+>>> [(type(d.join).__name__, d.fork is x) for d in graph.diamonds()]
+[('CombineLatest', True)]
+>>> graph.dead_branches()[0] is unused
+True
+>>> print(graph.to_dot())  # doctest: +ELLIPSIS
+digraph broqer {
+  n0 [label="Value"];
+...
+"""
+from collections import Counter
+from heapq import heappop, heappush
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, \
+    Tuple
+
+from broqer import Publisher
+
+if TYPE_CHECKING:
+    # pylint: disable=cyclic-import
+    from broqer.profiler import Profiler  # noqa: F401
+
+_MULTIPLE = -1  # origin of nodes reachable from multiple predecessors
+
+
+class Edge(NamedTuple):
+    """ Edge from a publisher to a dependent node (by index in Graph.nodes)
+
+    :ivar subscribed: True if the target is subscribed to the source (False
+        for dependencies without active subscription)
+    """
+    source: int
+    target: int
+    subscribed: bool
+
+
+class Diamond(NamedTuple):
+    """ Node (join) depending on another node (fork) via multiple paths. Each
+    emit of the fork is evaluating the join multiple times (unless a
+    propagation engine is used).
+    """
+    join: Any
+    fork: Any
+
+
+def _attribute(obj: Any, name: str) -> Any:
+    """ Get an attribute without using Publisher.__getattr__ (which would
+    build a publisher for attributes of the inherited type) """
+    try:
+        return object.__getattribute__(obj, name)
+    except AttributeError:
+        return None
+
+
+def label(node: Any) -> str:
+    """ Return a label for the node, built from the type and the name of the
+    function used by the operator (if available) """
+    name = type(node).__name__
+
+    for attribute in ('_function', '_map', '_predicate', '_operation'):
+        function = _attribute(node, attribute)
+
+        # unwrap functools.partial (e.g. used by Map and Filter)
+        function = getattr(function, 'func', function)
+        function_name = getattr(function, '__name__', None)
+
+        if function_name is not None:
+            return f'{name}({function_name})'
+
+    return name
+
+
+class Graph:
+    """ Graph of all nodes reachable from the given roots.
+
+    :param \\*roots: publishers to start the discovery with (subscribers
+        which are not publishers are only discovered via their publishers)
+    :ivar nodes: list of discovered nodes (publishers and subscribers)
+    :ivar edges: list of Edge tuples (source publisher to dependent node)
+    """
+    def __init__(self, *roots: Any) -> None:
+        self.nodes = []  # type: List[Any]
+        self.edges = []  # type: List[Edge]
+        self._index = {}  # type: Dict[int, int]
+
+        self._discover(roots)
+
+        self._successors = \
+            [[] for _ in self.nodes]  # type: List[List[int]]
+        self._predecessors = \
+            [[] for _ in self.nodes]  # type: List[List[int]]
+
+        for edge in self.edges:
+            self._successors[edge.source].append(edge.target)
+            self._predecessors[edge.target].append(edge.source)
+
+        self._order = self._topological_order()
+
+    def _add(self, node: Any, stack: List[Any]) -> int:
+        index = self._index.get(id(node), None)
+
+        if index is None:
+            index = self._index[id(node)] = len(self.nodes)
+            self.nodes.append(node)
+            stack.append(node)
+
+        return index
+
+    def _discover(self, roots: Tuple[Any, ...]) -> None:
+        stack = []  # type: List[Any]
+        edges = {}  # type: Dict[Tuple[int, int], bool]
+
+        for root in roots:
+            self._add(root, stack)
+
+        while stack:
+            node = stack.pop()
+
+            if not isinstance(node, Publisher):
+                continue
+
+            index = self._index[id(node)]
+
+            for subscriber in node.subscriptions:
+                edges[(index, self._add(subscriber, stack))] = True
+
+            for dependency in node.dependencies:
+                key = (self._add(dependency, stack), index)
+
+                if key not in edges:
+                    subscribed = any(s is node
+                                     for s in dependency.subscriptions)
+                    edges[key] = subscribed
+
+        self.edges = [Edge(source, target, subscribed)
+                      for (source, target), subscribed in edges.items()]
+
+    def _topological_order(self) -> List[int]:
+        """ Return the node indices in topological order (nodes in cycles
+        are appended at the end) """
+        in_degree = [len(p) for p in self._predecessors]
+        order = [i for i, degree in enumerate(in_degree) if degree == 0]
+
+        for index in order:  # order is extended while iterating
+            for successor in self._successors[index]:
+                in_degree[successor] -= 1
+
+                if in_degree[successor] == 0:
+                    order.append(successor)
+
+        if len(order) < len(self.nodes):
+            ordered = set(order)
+            order.extend(i for i in range(len(self.nodes))
+                         if i not in ordered)
+
+        return order
+
+    def depths(self) -> List[int]:
+        """ Return for each node the length of the longest path from a node
+        without dependencies """
+        depths = [0] * len(self.nodes)
+
+        for index in self._order:
+            for successor in self._successors[index]:
+                depths[successor] = max(depths[successor], depths[index] + 1)
+
+        return depths
+
+    def diamonds(self) -> List[Diamond]:
+        """ Return the nodes reachable via multiple paths from another node.
+        For each join the closest fork (the common ancestor with the highest
+        depth) is reported.
+        """
+        depths = self.depths()
+        diamonds = []
+
+        for index, predecessors in enumerate(self._predecessors):
+            if len(predecessors) < 2:
+                continue
+
+            fork = self._closest_fork(predecessors, depths)
+
+            if fork is not None:
+                diamonds.append(Diamond(self.nodes[index], self.nodes[fork]))
+
+        return diamonds
+
+    def _closest_fork(self, predecessors: List[int], depths: List[int]
+                      ) -> Optional[int]:
+        """ Return the deepest node reachable upstream from at least two of
+        the predecessors (a predecessor itself included) or None.
+
+        The ancestors are visited by decreasing depth, so all paths from the
+        predecessors to a node are known when it is visited. Only the
+        ancestors up to the closest fork are visited.
+        """
+        # for each visited node the index of the predecessor it was reached
+        # from or _MULTIPLE when reached from different predecessors
+        origins = {}  # type: Dict[int, int]
+        heap = []  # type: List[Tuple[int, int]]
+
+        for origin, predecessor in enumerate(predecessors):
+            origins[predecessor] = origin
+            heappush(heap, (-depths[predecessor], predecessor))
+
+        while heap:
+            _, index = heappop(heap)
+            origin = origins[index]
+
+            if origin == _MULTIPLE:
+                return index
+
+            for predecessor in self._predecessors[index]:
+                previous = origins.get(predecessor, None)
+
+                if previous is None:
+                    origins[predecessor] = origin
+                    heappush(heap, (-depths[predecessor], predecessor))
+                elif previous != origin:
+                    origins[predecessor] = _MULTIPLE
+
+        return None
+
+    def dead_branches(self) -> List[Publisher]:
+        """ Return the publishers not leading to any subscriber which is not
+        a publisher itself (e.g. a Sink). Those publishers are not subscribed
+        or only subscribed by other dead publishers.
+        """
+        alive = [not isinstance(node, Publisher) for node in self.nodes]
+
+        for index in reversed(self._order):
+            if not alive[index]:
+                alive[index] = any(alive[s] for s in self._successors[index])
+
+        return [node for node, is_alive in zip(self.nodes, alive, strict=True)
+                if not is_alive]
+
+    def statistics(self, diamonds: bool = False) -> Dict[str, Any]:
+        """ Return a dictionary with the statistics of the graph:
+
+        - ``nodes``, ``edges``: number of nodes and edges
+        - ``types``: number of nodes per type name
+        - ``max_depth``: length of the longest path
+        - ``fan_in``, ``fan_out``: number of nodes per number of incoming
+          respectively outgoing edges
+        - ``dead``: number of publishers in dead branches
+        - ``diamonds``: number of nodes reachable via multiple paths (only
+          when requested, as the search is visiting the ancestors of each
+          node with multiple dependencies)
+
+        :param diamonds: include the number of diamonds
+        """
+        depths = self.depths()
+
+        statistics = {
+            'nodes': len(self.nodes),
+            'edges': len(self.edges),
+            'types': dict(Counter(type(n).__name__ for n in self.nodes)),
+            'max_depth': max(depths, default=0),
+            'fan_in': dict(sorted(Counter(
+                len(p) for p in self._predecessors).items())),
+            'fan_out': dict(sorted(Counter(
+                len(s) for s in self._successors).items())),
+            'dead': len(self.dead_branches()),
+        }
+
+        if diamonds:
+            statistics['diamonds'] = len(self.diamonds())
+
+        return statistics
+
+    def _annotations(self, profiler: Optional['Profiler']
+                     ) -> List[Dict[str, Any]]:
+        """ Return the runtime counters of the profiler for each node """
+        annotations = [{} for _ in self.nodes]  # type: List[Dict[str, Any]]
+
+        if profiler is None:
+            return annotations
+
+        for node, annotation in zip(self.nodes, annotations, strict=True):
+            publisher_stats = profiler.publishers.get(id(node), None)
+
+            if publisher_stats is not None and \
+                    publisher_stats.reference() is node:
+                annotation['notifications'] = publisher_stats.notifications
+
+            subscriber_stats = profiler.subscribers.get(id(node), None)
+
+            if subscriber_stats is not None and \
+                    subscriber_stats.reference() is node:
+                annotation['calls'] = subscriber_stats.calls
+                annotation['own_time'] = subscriber_stats.own_time
+                annotation['max_time'] = subscriber_stats.max_time
+                annotation['exceptions'] = subscriber_stats.exceptions
+
+        return annotations
+
+    def to_dict(self, profiler: Optional['Profiler'] = None
+                ) -> Dict[str, Any]:
+        """ Return the graph as dictionary (nodes, edges and statistics)
+
+        :param profiler: optional profiler to annotate the nodes with its
+            runtime counters
+        """
+        dead = {id(node) for node in self.dead_branches()}
+        depths = self.depths()
+        nodes = []
+
+        for index, (node, annotation) in enumerate(
+                zip(self.nodes, self._annotations(profiler), strict=True)):
+            nodes.append(dict(id=index, type=type(node).__name__,
+                              label=label(node), depth=depths[index],
+                              dead=id(node) in dead, **annotation))
+
+        return {
+            'nodes': nodes,
+            'edges': [edge._asdict() for edge in self.edges],
+            'statistics': self.statistics(),
+        }
+
+    def to_json(self, profiler: Optional['Profiler'] = None,
+                **kwargs: Any) -> str:
+        """ Return the graph as JSON string (see .to_dict())
+
+        :param profiler: optional profiler to annotate the nodes
+        :param \\*\\*kwargs: keyword arguments for json.dumps
+        """
+        return json.dumps(self.to_dict(profiler), **kwargs)
+
+    def to_dot(self, profiler: Optional['Profiler'] = None) -> str:
+        """ Return the graph in DOT format. Edges without active subscription
+        are dashed, nodes of dead branches are gray.
+
+        :param profiler: optional profiler to annotate the nodes
+        """
+        lines = ['digraph broqer {']
+
+        for node in self.to_dict(profiler)['nodes']:
+            text = node['label']
+
+            if 'notifications' in node:
+                text += f'\\nnotifications: {node["notifications"]}'
+
+            if 'calls' in node:
+                text += f'\\ncalls: {node["calls"]} ' \
+                        f'own: {node["own_time"] * 1e3:.3f}ms'
+
+            attributes = f'label="{_escape(text)}"'
+
+            if node['dead']:
+                attributes += ', color=gray, fontcolor=gray'
+
+            lines.append(f'  n{node["id"]} [{attributes}];')
+
+        for edge in self.edges:
+            style = '' if edge.subscribed else ' [style=dashed]'
+            lines.append(f'  n{edge.source} -> n{edge.target}{style};')
+
+        lines.append('}')
+        return '\n'.join(lines)
+
+
+def _escape(text: str) -> str:
+    return text.replace('"', '\\"')
+
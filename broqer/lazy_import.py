@@ -0,0 +1,59 @@
+""" Lazy loading of package attributes via module ``__getattr__`` (PEP 562).
+
+Packages are using ``lazy_import`` in their ``__init__.py`` to import
+submodules (e.g. the ones depending on asyncio) only when one of their
+attributes is accessed::
+
+    __getattr__, __dir__ = lazy_import(__name__, {
+        'SinkAsync': '.subscribers.sink_async',
+        'build_sink_async': '.subscribers.sink_async',
+    }, submodules=('op',))
+"""
+from importlib import import_module
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+
+def lazy_import(package: str, attributes: Dict[str, str],
+                submodules: Iterable[str] = ()
+                ) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """ Return the functions ``__getattr__`` and ``__dir__`` for the package.
+    On first access of an attribute its module is imported and all
+    attributes from this module are stored in the package namespace, so
+    following accesses are not going through ``__getattr__``.
+
+    Attributes must not have the name of a submodule in the package (it would
+    be shadowed by the submodule after importing it).
+
+    :param package: name of the package using lazy attributes
+    :param attributes: dictionary with the module (relative to the package or
+        absolute) for each attribute name
+    :param submodules: names of submodules of the package to be imported on
+        first access
+    """
+    submodule_names = frozenset(submodules)
+
+    def __getattr__(name: str) -> Any:
+        if name in submodule_names:
+            return import_module('.' + name, package)
+
+        try:
+            source = attributes[name]
+        except KeyError:
+            raise AttributeError(f'module {package!r} has no attribute '
+                                 f'{name!r}') from None
+
+        module = import_module(source, package)
+        namespace = sys.modules[package]
+
+        for attribute, attribute_source in attributes.items():
+            if attribute_source == source:
+                setattr(namespace, attribute, getattr(module, attribute))
+
+        return getattr(module, name)
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(attributes) |
+                      submodule_names)
+
+    return __getattr__, __dir__
@@ -1,19 +1,79 @@
 """ The op module contains all operators broqer offers """
+from typing import TYPE_CHECKING
 
-# synchronous operators
-from broqer.op.combine_latest import CombineLatest, build_combine_latest
-from broqer.op.filter_ import Filter, EvalTrue, EvalFalse, build_filter, \
-                              build_filter_factory
-from broqer.op.map_ import Map, build_map, build_map_factory
-from broqer.op.map_async import MapAsync, build_map_async, \
-                                build_map_async_factory, AsyncMode
-from broqer.op.bitwise import BitwiseCombineLatest, map_bit
-from broqer.op.cache import Cache
-from broqer.op.throttle import Throttle
+from broqer.lazy_import import lazy_import
 
-# enable operator overloading
-from .py_operators import Str, Bool, Int, Float, Repr, Len, In, All, Any, \
-                         BitwiseAnd, BitwiseOr, Not
+# the function fuse is shadowing its submodule broqer.op.fuse, so it has to be
+# imported eagerly (it is only depending on Map, Filter and Cache)
+from broqer.op.fuse import Fuse, fuse
+
+# operators are imported on first access, so only the used operators (and
+# their dependencies like asyncio for MapAsync and Throttle) are loaded
+__getattr__, __dir__ = lazy_import(__name__, {
+    'CombineLatest': '.combine_latest',
+    'build_combine_latest': '.combine_latest',
+    'Filter': '.filter_',
+    'EvalTrue': '.filter_',
+    'EvalFalse': '.filter_',
+    'build_filter': '.filter_',
+    'build_filter_factory': '.filter_',
+    'Map': '.map_',
+    'build_map': '.map_',
+    'build_map_factory': '.map_',
+    'MapAsync': '.map_async',
+    'build_map_async': '.map_async',
+    'build_map_async_factory': '.map_async',
+    'AsyncMode': '.map_async',
+    'BitwiseCombineLatest': '.bitwise',
+    'map_bit': '.bitwise',
+    'Cache': '.cache',
+    'Throttle': '.throttle',
+    'Debounce': '.debounce',
+    'Sample': '.sample',
+    'Delay': '.delay',
+    'Shed': '.shed',
+    'ShedMode': '.shed',
+    'RateLimit': '.rate_limit',
+    'TokenBucket': '.rate_limit',
+    'OverflowPolicy': '.rate_limit',
+    'Str': '.py_operators',
+    'Bool': '.py_operators',
+    'Int': '.py_operators',
+    'Float': '.py_operators',
+    'Repr': '.py_operators',
+    'Len': '.py_operators',
+    'In': '.py_operators',
+    'All': '.py_operators',
+    'Any': '.py_operators',
+    'BitwiseAnd': '.py_operators',
+    'BitwiseOr': '.py_operators',
+    'Not': '.py_operators',
+    'Count': '.py_operators',
+    'Sum': '.py_operators',
+    'Min': '.py_operators',
+    'Max': '.py_operators',
+})
+
+if TYPE_CHECKING:
+    # synchronous operators
+    from broqer.op.combine_latest import CombineLatest, build_combine_latest
+    from broqer.op.filter_ import Filter, EvalTrue, EvalFalse, build_filter, \
+                                  build_filter_factory
+    from broqer.op.map_ import Map, build_map, build_map_factory
+    from broqer.op.map_async import MapAsync, build_map_async, \
+                                    build_map_async_factory, AsyncMode
+    from broqer.op.bitwise import BitwiseCombineLatest, map_bit
+    from broqer.op.cache import Cache
+    from broqer.op.throttle import Throttle
+    from broqer.op.debounce import Debounce
+    from broqer.op.sample import Sample
+    from broqer.op.delay import Delay
+    from broqer.op.shed import Shed, ShedMode
+    from broqer.op.rate_limit import RateLimit, TokenBucket, OverflowPolicy
+
+    # operators used for operator overloading
+    from .py_operators import Str, Bool, Int, Float, Repr, Len, In, All, \
+        Any, BitwiseAnd, BitwiseOr, Not, Count, Sum, Min, Max
 
 __all__ = [
     'CombineLatest', 'BitwiseCombineLatest',
@@ -22,5 +82,7 @@ __all__ = [
     'build_filter', 'build_filter_factory', 'Str', 'Bool', 'Int',
     'Float', 'Repr', 'map_bit', 'build_map_async_factory',
     'Len', 'In', 'All', 'Any', 'BitwiseAnd', 'BitwiseOr', 'Not', 'Throttle',
-    'Cache'
+    'Cache', 'Fuse', 'fuse', 'Count', 'Sum', 'Min', 'Max', 'Debounce',
+    'Sample', 'Delay', 'Shed', 'ShedMode', 'RateLimit', 'TokenBucket',
+    'OverflowPolicy'
 ]
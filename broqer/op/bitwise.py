@@ -4,13 +4,13 @@ publishers to bit indicies and evaluate a value from them.
 map_bit builds a Publisher which is mapping to a specific bit on another
 Publisher.
 """
-from typing import Any, Dict  # noqa: F401
+from typing import Any, Dict, Set  # noqa: F401
 
 # pylint: disable=cyclic-import
 from broqer import Publisher, Subscriber, NONE, SubscriptionDisposable
 from broqer.op import build_map_factory
 
-from broqer.operator import MultiOperator
+from broqer.operator import MultiOperator, memoized_get
 
 
 class BitwiseCombineLatest(MultiOperator):
@@ -22,16 +22,23 @@ class BitwiseCombineLatest(MultiOperator):
                                   publisher as value
     :param init: optional init value used for undefined bits (or initial state)
     """
+    __slots__ = ('_init', '_missing', '_publisher_bit_mapping', '_bit_index')
+
     def __init__(self, publisher_bit_mapping: Dict, init: int = 0) -> None:
         MultiOperator.__init__(self, *publisher_bit_mapping)
 
         self._init = init
-        self._missing = set(self._originators)
+        self._missing = {id(p) for p in self._originators}  # type: Set[int]
         self._publisher_bit_mapping = publisher_bit_mapping
 
-    def subscribe(self, subscriber: 'Subscriber',
-                  prepend: bool = False) -> SubscriptionDisposable:
-        disposable = MultiOperator.subscribe(self, subscriber, prepend)
+        # lookup table for the bit index based on the id of the publisher
+        self._bit_index = {
+            id(p): bit_index for p, bit_index in publisher_bit_mapping.items()
+        }  # type: Dict[int, int]
+
+    def subscribe(self, subscriber: 'Subscriber', prepend: bool = False,
+                  weak: bool = False) -> SubscriptionDisposable:
+        disposable = MultiOperator.subscribe(self, subscriber, prepend, weak)
 
         if self._missing:
             self._missing.clear()
@@ -45,9 +52,10 @@ class BitwiseCombineLatest(MultiOperator):
     def unsubscribe(self, subscriber: Subscriber) -> None:
         MultiOperator.unsubscribe(self, subscriber)
         if not self._subscriptions:
-            self._missing.update(self._originators)
+            self._missing.update(id(p) for p in self._originators)
             self._state = NONE
 
+    @memoized_get
     def get(self):
         if self._subscriptions:
             return self._state
@@ -68,14 +76,22 @@ class BitwiseCombineLatest(MultiOperator):
         return state
 
     def emit(self, value: Any, who: Publisher) -> None:
-        if all(who is not p for p in self._originators):
+        self._collect(value, who)
+        return self._evaluate()
+
+    def _collect(self, value: Any, who: Publisher) -> bool:
+        """ Apply the value emitted by a source publisher to the state.
+
+        :returns: True, as each emit has to trigger an evaluation
+        """
+        key = id(who)
+        bit_index = self._bit_index.get(key, None)
+
+        if bit_index is None:
             raise ValueError('Emit from non assigned publisher')
 
         # remove source publisher from ._missing
-        self._missing.discard(who)
-
-        # evaluate
-        bit_index = self._publisher_bit_mapping[who]
+        self._missing.discard(key)
 
         if self._state is NONE:
             self._state = self._init
@@ -85,6 +101,10 @@ class BitwiseCombineLatest(MultiOperator):
         else:
             self._state &= ~(1 << bit_index)
 
+        return True
+
+    def _evaluate(self) -> None:
+        """ Notify the subscribers with the current state """
         if self._missing:
             return None
 
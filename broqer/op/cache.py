@@ -29,7 +29,7 @@ Using the initial value for cache:
 2
 >>> _disposable.dispose()
 """
-from typing import Any
+from typing import Any, Sequence
 
 from broqer import Publisher, NONE
 from broqer.publisher import ValueT
@@ -38,6 +38,8 @@ from broqer.operator import Operator
 
 class Cache(Operator):
     """ Cache object applied to publisher (see Map) """
+    __slots__ = ()
+
     def __init__(self, init: Any = NONE) -> None:
         Operator.__init__(self)
         self._state = init
@@ -57,3 +59,17 @@ class Cache(Operator):
             return Publisher.notify(self, value)
 
         return None
+
+    def emit_batch(self, values: Sequence[ValueT], who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        results = []
+        state = self._state
+
+        for value in values:
+            if value != state:
+                results.append(value)
+                state = value
+
+        return Publisher.notify_many(self, results)
@@ -21,13 +21,34 @@ immediate on subscription:
 Second sink: (1, 3)
 <...>
 
+With ``incremental=True`` the ``map_`` function is called with the index of
+the changed source and its new value instead of all values. This allows
+combining thousands of sources with constant cost per emit:
+
+>>> class Sum:
+...     def __init__(self, count):
+...         self.values = [0] * count
+...         self.total = 0
+...     def __call__(self, index, value):
+...         self.total += value - self.values[index]
+...         self.values[index] = value
+...         return self.total
+
+>>> sources = [Value(i) for i in range(1000)]
+>>> total = op.CombineLatest(*sources, map_=Sum(1000), incremental=True)
+>>> _d = total.subscribe(Sink(print))
+499500
+>>> sources[10].emit(20)
+499510
 """
+from copy import deepcopy
 from functools import wraps
-from typing import Any, Dict, MutableSequence, Callable  # noqa: F401
+from typing import Any, Dict, MutableSequence, Callable, Optional, \
+    Set  # noqa: F401
 
 from broqer import Publisher, Subscriber, NONE
 
-from broqer.operator import MultiOperator
+from broqer.operator import MultiOperator, memoized_get
 
 
 class CombineLatest(MultiOperator):
@@ -41,9 +62,24 @@ class CombineLatest(MultiOperator):
     :param emit_partial: if True, emit even if not all source publishers have a
         state. emit_partial should only be used if an emit_on publisher is
         defined.
+    :param incremental: if True, map_ is called as ``map_(index, value)`` for
+        each value emitted by a source (index is the position of the source)
+        and returns the combined result. map_ itself is kept untouched as a
+        template: each subscription period and each ``.get()`` without
+        subscription is working on a fresh ``copy.deepcopy`` of it, so state
+        accumulated by map_ is not carried over.
+
+    Sources are looked up by identity, so the cost of an emit is independent of
+    the number of sources (apart from the cost of map_, which is called with
+    all values when not using incremental mode).
     """
+    __slots__ = ('_partial_state', '_missing', '_index', '_emit_on',
+                 '_emit_partial', '_map', '_incremental', '_aggregation',
+                 '_result')
+
     def __init__(self, *publishers: Publisher, map_: Callable[..., Any] = None,
-                 emit_on=None, emit_partial: bool = False) -> None:
+                 emit_on=None, emit_partial: bool = False,
+                 incremental: bool = False) -> None:
         MultiOperator.__init__(self, *publishers)
 
         # ._partial_state is a list keeping the latest emitted values from
@@ -52,74 +88,123 @@ class CombineLatest(MultiOperator):
         self._partial_state = [
             NONE for _ in publishers]  # type: MutableSequence[Any]
 
-        # ._missing is keeping a set of source publishers which are required to
-        # emit a value. This set starts with all source publishers. Stateful
-        # publishers are required, stateless publishers not (will be removed
-        # in .subscribe).
-        self._missing = set(publishers)
+        # ._missing is keeping a set of ids of source publishers which are
+        # required to emit a value. This set starts with all source publishers.
+        self._missing = {id(p) for p in publishers}  # type: Set[int]
 
-        # ._index is a lookup table to get the list index based on publisher
+        # ._index is a lookup table to get the list index based on the id of
+        # the publisher
         self._index = \
-            {p: i for i, p in enumerate(publishers)
-             }  # type: Dict[Publisher, int]
+            {id(p): i for i, p in enumerate(publishers)
+             }  # type: Dict[int, int]
 
-        # .emit_on is a set of publishers. When a source publisher is emitting
-        # and is not in this set the CombineLatest will not emit a value.
-        # If emit_on is None all the publishers will be in the set.
+        # .emit_on is a set of publisher ids. When a source publisher is
+        # emitting and is not in this set the CombineLatest will not emit a
+        # value. If emit_on is None all the publishers will be in the set.
         if isinstance(emit_on, Publisher):
-            self._emit_on = (emit_on,)
+            self._emit_on = {id(emit_on)}  # type: Optional[Set[int]]
+        elif emit_on is not None:
+            self._emit_on = {id(p) for p in emit_on}
         else:
-            self._emit_on = emit_on
+            self._emit_on = None
 
         assert emit_partial is False or emit_on is not None, \
             'emit_on must be defined if emit_partial is True'
         self._emit_partial = emit_partial
 
+        assert incremental is False or map_ is not None, \
+            'map_ must be defined if incremental is True'
         self._map = map_
+        self._incremental = incremental
+
+        # working copy of map_ in incremental mode (while subscribed)
+        self._aggregation = None  # type: Optional[Callable[..., Any]]
+
+        # latest result of map_ in incremental mode
+        self._result = NONE  # type: Any
+
+    def subscribe(self, subscriber: Subscriber, prepend: bool = False,
+                  weak: bool = False):
+        if self._incremental and not self._subscriptions:
+            # the sources are emitting their state on the first subscription
+            self._aggregation = deepcopy(self._map)
+
+        return MultiOperator.subscribe(self, subscriber, prepend, weak)
 
     def unsubscribe(self, subscriber: Subscriber) -> None:
         MultiOperator.unsubscribe(self, subscriber)
         if not self._subscriptions:
-            self._missing = set(self._originators)
+            self._missing = {id(p) for p in self._originators}
             self._partial_state[:] = [NONE for _ in self._partial_state]
+            self._aggregation = None
+            self._result = NONE
 
+    @memoized_get
     def get(self):
         if self._subscriptions:
             return self._state
 
         values = tuple(p.get() for p in self._originators)
 
-        if NONE in values:
+        if any(value is NONE for value in values):
             return NONE
 
         if not self._map:
-            return tuple(values)
+            return values
+
+        if self._incremental:
+            aggregation = deepcopy(self._map)
+            result = NONE
+
+            for index, value in enumerate(values):
+                result = aggregation(index, value)
+
+            return result
 
         return self._map(*values)
 
     def emit(self, value: Any, who: Publisher) -> None:
-        if all(who is not p for p in self._originators):
+        if self._collect(value, who):
+            return self._evaluate()
+
+        return None
+
+    def _collect(self, value: Any, who: Publisher) -> bool:
+        """ Store the value emitted by a source publisher.
+
+        :returns: True if the emit has to trigger an evaluation
+        """
+        key = id(who)
+        index = self._index.get(key, None)
+
+        if index is None:
             raise ValueError('Emit from non assigned publisher')
 
         # remove source publisher from ._missing
-        self._missing.discard(who)
-
-        index = self._index[who]
+        self._missing.discard(key)
 
         # remember state of this source
         self._partial_state[index] = value
 
-        # if emit_partial is False and emits from publishers are missing
-        # or source of this emit is not one of emit_on -> don't evaluate
-        # and notify subscribers
+        if self._incremental:
+            self._result = self._aggregation(index, value)
 
-        if (self._emit_on is not None and
-                all(who is not p for p in self._emit_on)) or \
-                (not self._emit_partial and self._missing):
+        # if source of this emit is not one of emit_on -> don't evaluate
+        return self._emit_on is None or key in self._emit_on
+
+    def _evaluate(self) -> None:
+        """ Evaluate the state based on the collected values and notify the
+        subscribers.
+        """
+        # if emit_partial is False and emits from publishers are missing
+        # -> don't evaluate and notify subscribers
+        if not self._emit_partial and self._missing:
             return None
 
         # evaluate
-        if self._map:
+        if self._incremental:
+            state = self._result
+        elif self._map:
             state = self._map(*self._partial_state)
         else:
             state = tuple(self._partial_state)
@@ -134,7 +219,8 @@ class CombineLatest(MultiOperator):
 
 
 def build_combine_latest(map_: Callable[..., Any] = None, *, emit_on=None,
-                         emit_partial: bool = False) -> Callable:
+                         emit_partial: bool = False,
+                         incremental: bool = False) -> Callable:
     """ Decorator to wrap a function to return a CombineLatest operator.
 
     :param emit_on: publisher or list of publishers - only emitting result when
@@ -143,12 +229,15 @@ def build_combine_latest(map_: Callable[..., Any] = None, *, emit_on=None,
     :param emit_partial: if True, emit even if not all source publishers have a
         state. emit_partial should only be used if an emit_on publisher is
         defined.
+    :param incremental: if True, the function is called with index and value
+        of the changed source (see CombineLatest)
     """
     def _build_combine_latest(map_: Callable[..., Any]):
         @wraps(map_)
         def _wrapper(*publishers) -> CombineLatest:
             return CombineLatest(*publishers, map_=map_, emit_on=emit_on,
-                                 emit_partial=emit_partial)
+                                 emit_partial=emit_partial,
+                                 incremental=incremental)
         return _wrapper
 
     if map_:
@@ -0,0 +1,110 @@
+"""
+Emit a value only after a given idle time (emits meanwhile are skipped).
+
+Usage (on virtual time, see broqer.virtual_time):
+
+>>> import asyncio
+>>> from broqer import Value, op, Sink
+>>> from broqer.virtual_time import run
+>>> async def main():
+...     s = Value()
+...     _d = (s | op.Debounce(0.1)).subscribe(Sink(print))
+...     s.emit(1)
+...     await asyncio.sleep(0.05)
+...     s.emit(2)
+...     await asyncio.sleep(0.05)
+...     s.emit(3)
+...     await asyncio.sleep(0.2)
+...     s.emit(4)
+...     await asyncio.sleep(0.2)
+>>> run(main())
+3
+4
+
+Emitting is restarting the idle time, but the timer is not restarted on each
+emit. The deadline is stored and the timer is only restarted for the remaining
+time when it expires before the deadline. So an emit is O(1) without
+allocating a handle of the event loop.
+"""
+import asyncio
+import sys
+from typing import Any, Optional
+
+from broqer import Publisher, Subscriber, default_error_handler, NONE
+from broqer.operator import Operator
+from broqer.timer import Timer, TimerWheel, TOLERANCE, weak_callback
+
+
+class Debounce(Operator):
+    """ Emit a value only after a given idle time (emits meanwhile are
+    skipped). When subscribed .get() is returning the last emitted value,
+    otherwise the state of the source publisher.
+
+    :param duetime: time in seconds to be waited for debounce
+    :param error_callback: error callback to be registered
+    :param loop: asyncio event loop to use
+    :param wheel: optional TimerWheel to be used for the timer
+    """
+    __slots__ = ('_duetime', '_loop', '_timer', '_error_callback', '_value',
+                 '_deadline')
+
+    def __init__(self, duetime: float, error_callback=default_error_handler,
+                 loop=None, wheel: Optional[TimerWheel] = None) -> None:
+        Operator.__init__(self)
+
+        if duetime < 0:
+            raise ValueError('Duetime has to be positive')
+
+        self._duetime = duetime
+        self._loop = loop or asyncio.get_event_loop()
+        self._timer = Timer(weak_callback(self._timer_cb), loop=self._loop,
+                            wheel=wheel)
+        self._error_callback = error_callback
+        self._value = NONE  # type: Any
+        self._deadline = 0.0
+
+    def get(self):
+        if self._subscriptions:
+            return Publisher.get(self)
+
+        return self._originator.get()
+
+    def emit(self, value: Any, who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        self._value = value
+        self._deadline = self._loop.time() + self._duetime
+
+        if not self._timer.is_running():
+            self._timer.start(self._duetime)
+
+    def _timer_cb(self) -> None:
+        remaining = self._deadline - self._loop.time()
+
+        if remaining > TOLERANCE:
+            # emitted again while the timer was running
+            self._timer.start(remaining)
+            return
+
+        value, self._value = self._value, NONE
+
+        try:
+            Publisher.notify(self, value)
+        except Exception:  # pylint: disable=broad-except
+            self._error_callback(*sys.exc_info())
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        Operator.unsubscribe(self, subscriber)
+
+        if not self._subscriptions:
+            self._cancel()
+
+    def reset_state(self) -> None:
+        """ Drop the pending value and reset the state """
+        self._cancel()
+        Publisher.reset_state(self)
+
+    def _cancel(self) -> None:
+        self._timer.cancel()
+        self._value = NONE
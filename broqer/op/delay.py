@@ -0,0 +1,109 @@
+"""
+Emit every value delayed by the given time.
+
+Usage (on virtual time, see broqer.virtual_time):
+
+>>> import asyncio
+>>> from broqer import Value, op, Sink
+>>> from broqer.virtual_time import run
+>>> async def main():
+...     s = Value()
+...     _d = (s | op.Delay(0.1)).subscribe(Sink(print))
+...     s.emit(1)
+...     s.emit(2)
+...     await asyncio.sleep(0.05)
+...     print('before')
+...     await asyncio.sleep(0.1)
+>>> run(main())
+before
+1
+2
+
+The values are kept in a queue together with their due time. A single timer is
+running for the oldest value, so an emit is O(1) without allocating a handle
+of the event loop.
+"""
+import asyncio
+from collections import deque
+import sys
+from typing import Any, Deque, Optional
+
+from broqer import Publisher, Subscriber, default_error_handler
+from broqer.operator import Operator
+from broqer.timer import Timer, TimerWheel, TOLERANCE, weak_callback
+
+
+class Delay(Operator):
+    """ Emit every value delayed by the given time. When subscribed .get() is
+    returning the last emitted value, otherwise the state of the source
+    publisher.
+
+    :param duration: time in seconds to delay each value
+    :param error_callback: error callback to be registered
+    :param loop: asyncio event loop to use
+    :param wheel: optional TimerWheel to be used for the timer
+    """
+    __slots__ = ('_duration', '_loop', '_timer', '_error_callback',
+                 '_values', '_due_times')
+
+    def __init__(self, duration: float, error_callback=default_error_handler,
+                 loop=None, wheel: Optional[TimerWheel] = None) -> None:
+        Operator.__init__(self)
+
+        if duration < 0:
+            raise ValueError('Duration has to be positive')
+
+        self._duration = duration
+        self._loop = loop or asyncio.get_event_loop()
+        self._timer = Timer(weak_callback(self._timer_cb), loop=self._loop,
+                            wheel=wheel)
+        self._error_callback = error_callback
+        self._values = deque()  # type: Deque[Any]
+        self._due_times = deque()  # type: Deque[float]
+
+    def get(self):
+        if self._subscriptions:
+            return Publisher.get(self)
+
+        return self._originator.get()
+
+    def emit(self, value: Any, who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        self._values.append(value)
+        self._due_times.append(self._loop.time() + self._duration)
+
+        if not self._timer.is_running():
+            self._timer.start(self._duration)
+
+    def _timer_cb(self) -> None:
+        values, due_times = self._values, self._due_times
+        now = self._loop.time()
+
+        while due_times and due_times[0] - now <= TOLERANCE:
+            due_times.popleft()
+
+            try:
+                Publisher.notify(self, values.popleft())
+            except Exception:  # pylint: disable=broad-except
+                self._error_callback(*sys.exc_info())
+
+        if due_times:
+            self._timer.start(due_times[0] - now)
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        Operator.unsubscribe(self, subscriber)
+
+        if not self._subscriptions:
+            self._cancel()
+
+    def reset_state(self) -> None:
+        """ Drop the pending values and reset the state """
+        self._cancel()
+        Publisher.reset_state(self)
+
+    def _cancel(self) -> None:
+        self._timer.cancel()
+        self._values.clear()
+        self._due_times.clear()
@@ -26,10 +26,10 @@ Also possible with additional args and kwargs:
 
 """
 from functools import partial, wraps
-from typing import Any, Callable
+from typing import Any, Callable, Sequence
 
 from broqer import NONE, Publisher
-from broqer.operator import Operator
+from broqer.operator import Operator, memoized_get
 
 
 class Filter(Operator):
@@ -40,12 +40,15 @@ class Filter(Operator):
     :param unpack: value from emits will be unpacked (\\*value)
     :param \\*\\*kwargs: keyword arguments to be used for evaluating predicate
     """
+    __slots__ = ('_predicate', '_unpack')
+
     def __init__(self, predicate: Callable[[Any], bool], *args,
                  unpack: bool = False, **kwargs) -> None:
         Operator.__init__(self)
         self._predicate = partial(predicate, *args, **kwargs)  # type: Callable
         self._unpack = unpack
 
+    @memoized_get
     def get(self) -> Any:
         if self._originator is None:
             raise ValueError('Operator is missing originator')
@@ -76,6 +79,19 @@ class Filter(Operator):
             return Publisher.notify(self, value)
         return None
 
+    def emit_batch(self, values: Sequence[Any], who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        predicate = self._predicate
+
+        if self._unpack:
+            results = [value for value in values if predicate(*value)]
+        else:
+            results = [value for value in values if predicate(value)]
+
+        return Publisher.notify_many(self, results)
+
 
 class EvalTrue(Operator):
     """ Emits all values which evaluates for True.
@@ -83,10 +99,13 @@ class EvalTrue(Operator):
     This operator can be used in the pipline style (v | EvalTrue()) or as
     standalone operation (EvalTrue(v)).
     """
+    __slots__ = ()
+
     def __init__(self, publisher: Publisher = None) -> None:
         Operator.__init__(self)
         self._originator = publisher
 
+    @memoized_get
     def get(self) -> Any:
         if self._subscriptions:
             return self._state
@@ -114,10 +133,13 @@ class EvalFalse(Operator):
 
     This operator can be used in the pipline style (v | EvalFalse() or as
     standalone operation (EvalFalse(v))."""
+    __slots__ = ()
+
     def __init__(self, publisher: Publisher = None) -> None:
         Operator.__init__(self)
         self._originator = publisher
 
+    @memoized_get
     def get(self) -> Any:
         if self._subscriptions:
             return self._state
@@ -0,0 +1,220 @@
+"""
+Fuse a chain of operators into a single operator. Each hop in a pipeline is
+costing a method call, a check of the emitting publisher and a notification.
+Fusing ``Map``, ``Filter``, ``EvalTrue``, ``EvalFalse`` and ``Cache``
+operators into one operator is applying all functions in a single loop.
+
+Usage:
+
+>>> from broqer import Value, op, Sink
+>>> s = Value(1)
+
+>>> fused_publisher = s | op.Fuse(op.Map(lambda v: v * 2),
+...                               op.Filter(lambda v: v > 2),
+...                               op.Cache())
+>>> _disposable = fused_publisher.subscribe(Sink(print))
+>>> s.emit(2)
+4
+>>> s.emit(2)
+>>> s.emit(3)
+6
+>>> _disposable.dispose()
+
+An existing pipeline can be fused via ``fuse(publisher)``. The operators of the
+original pipeline are left untouched (and can still be subscribed):
+
+>>> pipeline = s | op.Map(lambda v: v + 1) | op.Map(str)
+>>> fused_publisher = op.fuse(pipeline)
+>>> isinstance(fused_publisher, op.Fuse)
+True
+>>> fused_publisher.get()
+'4'
+"""
+from typing import Any, Callable, List, Sequence
+
+from broqer import Publisher, Subscriber, NONE
+from broqer.publisher import ValueT
+from broqer.operator import Operator, memoized_get
+from broqer.op.cache import Cache
+from broqer.op.filter_ import Filter, EvalTrue, EvalFalse
+from broqer.op.map_ import Map
+
+
+class _CacheStage:
+    """ Stage suppressing values equal to the last passed value """
+    __slots__ = ('state',)
+
+    def __init__(self, state: Any) -> None:
+        self.state = state
+
+    def __call__(self, value: Any) -> Any:
+        if value != self.state:
+            self.state = value
+            return value
+        return NONE
+
+
+def _map_stage(function: Callable, unpack: bool) -> Callable[[Any], Any]:
+    if not unpack:
+        return function
+    return lambda value: function(*value)
+
+
+def _filter_stage(predicate: Callable, unpack: bool) -> Callable[[Any], Any]:
+    if unpack:
+        return lambda value: value if predicate(*value) else NONE
+    return lambda value: value if predicate(value) else NONE
+
+
+def _eval_true_stage(value: Any) -> Any:
+    return value if value else NONE
+
+
+def _eval_false_stage(value: Any) -> Any:
+    return NONE if value else value
+
+
+class Fuse(Operator):
+    """ Single operator applying the given operators one after another. The
+    operators are only used as template (function, predicate, unpack and the
+    initial value of a cache), they are not assigned to a publisher.
+
+    Supported operators are ``Map``, ``Filter``, ``EvalTrue``, ``EvalFalse``
+    and ``Cache`` (a cache with initialization only as last operator).
+
+    ``.get()`` of the fused operator is returning ``NONE`` as soon as a stage
+    gets ``NONE`` as input.
+
+    :param \\*operators: operators to be fused
+    :raises ValueError: when an operator is not supported
+    """
+    __slots__ = ('_stages', '_get_stages', '_caches')
+
+    def __init__(self, *operators: Operator) -> None:
+        Operator.__init__(self)
+
+        self._stages = []  # type: List[Callable[[Any], Any]]
+        self._get_stages = []  # type: List[Callable[[Any], Any]]
+        self._caches = []  # type: List[_CacheStage]
+
+        for index, operator in enumerate(operators):
+            # pylint: disable=protected-access
+            operator_type = type(operator)
+
+            if operator_type is Cache:
+                state = NONE if operator._subscriptions else operator._state
+
+                if state is not NONE:
+                    if index != len(operators) - 1:
+                        raise ValueError('Cache with initialization is only '
+                                         'supported as last operator')
+                    self._state = state
+
+                cache = _CacheStage(state)
+                self._caches.append(cache)
+                self._stages.append(cache)
+                continue
+
+            if isinstance(operator, Map) and operator_type is Map:
+                stage = _map_stage(operator._function, operator._unpack)
+            elif isinstance(operator, Filter) and operator_type is Filter:
+                stage = _filter_stage(operator._predicate, operator._unpack)
+            elif operator_type is EvalTrue:
+                stage = _eval_true_stage
+            elif operator_type is EvalFalse:
+                stage = _eval_false_stage
+            else:
+                raise ValueError(f'Operator {operator_type.__name__} can not '
+                                 'be fused')
+
+            self._stages.append(stage)
+            self._get_stages.append(stage)
+
+    @memoized_get
+    def get(self) -> ValueT:
+        if self._subscriptions:
+            return self._state
+
+        if self._originator is None:
+            raise ValueError('Operator is missing originator')
+
+        value = self._originator.get()  # type: Any
+
+        for stage in self._get_stages:
+            if value is NONE:
+                break
+            value = stage(value)
+
+        return value
+
+    def emit(self, value: Any, who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        for stage in self._stages:
+            value = stage(value)
+
+            if value is NONE:
+                return None
+
+        return Publisher.notify(self, value)
+
+    def emit_batch(self, values: Sequence[Any], who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        stages = self._stages
+        results = []
+
+        for value in values:
+            for stage in stages:
+                value = stage(value)
+
+                if value is NONE:
+                    break
+            else:
+                results.append(value)
+
+        return Publisher.notify_many(self, results)
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        Operator.unsubscribe(self, subscriber)
+
+        if not self._subscriptions:
+            self._reset_caches()
+
+    def reset_state(self) -> None:
+        self._reset_caches()
+        Publisher.reset_state(self)
+
+    def _reset_caches(self) -> None:
+        for cache in self._caches:
+            cache.state = NONE
+
+
+_FUSABLE = (Map, Filter, EvalTrue, EvalFalse, Cache)
+
+
+def fuse(publisher: Publisher) -> Publisher:
+    """ Build a fused operator for the pipeline ending in the given publisher.
+    All consecutive fusable operators (``Map``, ``Filter``, ``EvalTrue``,
+    ``EvalFalse`` and ``Cache``) at the end of the pipeline are replaced by a
+    single ``Fuse`` operator subscribing to the publisher before them. The
+    original operators are not changed.
+
+    :param publisher: last publisher of the pipeline
+    :returns: the fused operator or the given publisher when there is nothing
+              to fuse
+    """
+    operators = []  # type: List[Operator]
+
+    # pylint: disable=protected-access
+    while type(publisher) in _FUSABLE and \
+            publisher._originator is not None:  # type: ignore
+        operators.insert(0, publisher)  # type: ignore
+        publisher = publisher._originator  # type: ignore
+
+    if not operators:
+        return publisher
+
+    return publisher | Fuse(*operators)
@@ -36,11 +36,11 @@ Output: 1
 EMITTED None
 """
 from functools import partial, wraps
-from typing import Any, Callable
+from typing import Any, Callable, Sequence
 
 from broqer import Publisher, NONE
 from broqer.publisher import ValueT
-from broqer.operator import Operator
+from broqer.operator import Operator, memoized_get
 
 
 class Map(Operator):
@@ -51,6 +51,8 @@ class Map(Operator):
     :param unpack: value from emits will be unpacked (\\*value)
     :param \\*\\*kwargs: keyword arguments to be used for calling function
     """
+    __slots__ = ('_function', '_unpack')
+
     def __init__(self, function: Callable[[Any], Any], *args,
                  unpack: bool = False, **kwargs) -> None:
         """ Special care for return values:
@@ -64,6 +66,7 @@ class Map(Operator):
         self._function = partial(function, *args, **kwargs)
         self._unpack = unpack
 
+    @memoized_get
     def get(self) -> ValueT:
         if self._subscriptions:
             return self._state
@@ -97,6 +100,20 @@ class Map(Operator):
 
         return None
 
+    def emit_batch(self, values: Sequence[Any], who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        function = self._function
+
+        if self._unpack:
+            results = [function(*value) for value in values]
+        else:
+            results = [function(value) for value in values]
+
+        return Publisher.notify_many(
+            self, [result for result in results if result is not NONE])
+
 
 def build_map(function: Callable[..., None] = None, *,
               unpack: bool = False):
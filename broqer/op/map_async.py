@@ -1,10 +1,13 @@
 """
 Apply ``coro`` to each emitted value allowing async processing
 
-Usage:
+Usage (on virtual time, see broqer.virtual_time):
 
 >>> import asyncio
 >>> from broqer import Value, Sink, op
+>>> from broqer.virtual_time import VirtualTimeLoop
+>>> loop = VirtualTimeLoop()
+>>> asyncio.set_event_loop(loop)
 >>> s = Value()
 
 >>> async def delay_add(a):
@@ -19,7 +22,7 @@ AsyncMode: CONCURRENT (is default)
 >>> s.emit(0)
 >>> _d = (s | op.MapAsync(delay_add)).subscribe(Sink())
 >>> s.emit(1)
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.02))
+>>> loop.run_until_complete(asyncio.sleep(0.02))
 Starting with argument 0
 Starting with argument 1
 Finished with argument 0
@@ -31,10 +34,10 @@ AsyncMode: INTERRUPT
 >>> s.emit(0)
 >>> o = (s | op.MapAsync(delay_add, mode=op.AsyncMode.INTERRUPT))
 >>> _d = o.subscribe(Sink(print))
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.005))
+>>> loop.run_until_complete(asyncio.sleep(0.005))
 Starting with argument 0
 >>> s.emit(1)
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.02))
+>>> loop.run_until_complete(asyncio.sleep(0.02))
 Starting with argument 1
 Finished with argument 1
 2
@@ -46,7 +49,7 @@ AsyncMode: QUEUE
 >>> o = (s | op.MapAsync(delay_add, mode=op.AsyncMode.QUEUE))
 >>> _d = o.subscribe(Sink(print))
 >>> s.emit(1)
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.04))
+>>> loop.run_until_complete(asyncio.sleep(0.04))
 Starting with argument 0
 Finished with argument 0
 1
@@ -62,7 +65,7 @@ AsyncMode: LAST
 >>> _d = o.subscribe(Sink(print))
 >>> s.emit(1)
 >>> s.emit(2)
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.04))
+>>> loop.run_until_complete(asyncio.sleep(0.04))
 Starting with argument 0
 Finished with argument 0
 1
@@ -78,7 +81,7 @@ AsyncMode: SKIP
 >>> _d = o.subscribe(Sink(print))
 >>> s.emit(1)
 >>> s.emit(2)
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.04))
+>>> loop.run_until_complete(asyncio.sleep(0.04))
 Starting with argument 0
 Finished with argument 0
 1
@@ -91,10 +94,12 @@ Using error_callback:
 
 >>> s.emit('abc')
 >>> _d = (s | op.MapAsync(delay_add, error_callback=cb)).subscribe(Sink(print))
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.02))
+>>> loop.run_until_complete(asyncio.sleep(0.02))
 Starting with argument abc
 Got error
 >>> _d.dispose()
+>>> asyncio.set_event_loop(None)
+>>> loop.close()
 """
 import asyncio
 import sys
@@ -123,6 +128,8 @@ class MapAsync(Operator):  # pylint: disable=too-many-instance-attributes
     :ivar scheduled: Publisher emitting the value when coroutine is actually
         started.
     """
+    __slots__ = ('_coro_queue', '_error_callback')
+
     def __init__(self,
                  coro, *args, mode=AsyncMode.CONCURRENT,
                  error_callback=default_error_handler, unpack: bool = False,
@@ -134,6 +141,11 @@ class MapAsync(Operator):  # pylint: disable=too-many-instance-attributes
         )
         self._error_callback = error_callback
 
+    @property
+    def backlog(self) -> int:
+        """ Number of values being processed or waiting to be processed """
+        return len(self._coro_queue)
+
     def emit(self, value: Any, who: Publisher) -> None:
         if who is not self._originator:
             raise ValueError('Emit from non assigned publisher')
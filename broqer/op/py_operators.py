@@ -1,9 +1,10 @@
 """ Python operators """
-from typing import Any as Any_
+from typing import Any as Any_, Callable, List, Optional, Tuple
 from functools import partial, reduce
+import heapq
 import operator
 
-from broqer import Publisher
+from broqer import Publisher, NONE
 from broqer.operator_overloading import MapUnary
 from .combine_latest import CombineLatest
 
@@ -18,42 +19,56 @@ class Str(MapUnary):
     >>> literal.get()
     '0'
     """
+    __slots__ = ()
+
     def __init__(self, publisher: Publisher) -> None:
         MapUnary.__init__(self, publisher, str)
 
 
 class Bool(MapUnary):
     """ Implementing the functionality of bool() for publishers. """
+    __slots__ = ()
+
     def __init__(self, publisher: Publisher) -> None:
         MapUnary.__init__(self, publisher, bool)
 
 
 class Not(MapUnary):
     """ Implementing the functionality of not for publishers. """
+    __slots__ = ()
+
     def __init__(self, publisher: Publisher) -> None:
         MapUnary.__init__(self, publisher, operator.not_)
 
 
 class Int(MapUnary):
     """ Implementing the functionality of int() for publishers. """
+    __slots__ = ()
+
     def __init__(self, publisher: Publisher) -> None:
         MapUnary.__init__(self, publisher, int)
 
 
 class Float(MapUnary):
     """ Implementing the functionality of float() for publishers. """
+    __slots__ = ()
+
     def __init__(self, publisher: Publisher) -> None:
         MapUnary.__init__(self, publisher, float)
 
 
 class Repr(MapUnary):
     """ Implementing the functionality of repr() for publishers. """
+    __slots__ = ()
+
     def __init__(self, publisher: Publisher) -> None:
         MapUnary.__init__(self, publisher, repr)
 
 
 class Len(MapUnary):
     """ Implementing the functionality of len() for publishers. """
+    __slots__ = ()
+
     def __init__(self, publisher: Publisher) -> None:
         MapUnary.__init__(self, publisher, len)
 
@@ -67,6 +82,8 @@ class In(CombineLatest):
     :param item: publisher or constant to check for availability in container.
     :param container: container (publisher or constant)
     """
+    __slots__ = ()
+
     def __init__(self, item: Any_, container: Any_) -> None:
         if isinstance(item, Publisher) and isinstance(container, Publisher):
             CombineLatest.__init__(self, item, container, map_=_in)
@@ -80,55 +97,346 @@ class In(CombineLatest):
             CombineLatest.__init__(self, container, map_=function)
 
 
-def _all(*items):
-    return all(items)
+class _TrueCount:
+    """ Incremental aggregation counting the sources with a truthy value (or
+    a value fulfilling the predicate).
+    """
+    __slots__ = ('_flags', '_predicate', 'count')
+
+    def __init__(self, size: int, predicate: Callable = bool) -> None:
+        self._flags = [False] * size
+        self._predicate = predicate
+        self.count = 0
+
+    def update(self, index: int, value: Any_) -> None:
+        """ Set the value of the source with the given index """
+        flag = bool(self._predicate(value))
+
+        if flag != self._flags[index]:
+            self._flags[index] = flag
+            self.count += 1 if flag else -1
+
+
+class _AllAggregation(_TrueCount):
+    __slots__ = ()
+
+    def __call__(self, index: int, value: Any_) -> bool:
+        self.update(index, value)
+        return self.count == len(self._flags)
+
+
+class _AnyAggregation(_TrueCount):
+    __slots__ = ()
+
+    def __call__(self, index: int, value: Any_) -> bool:
+        self.update(index, value)
+        return self.count > 0
+
+
+class _CountAggregation(_TrueCount):
+    __slots__ = ()
+
+    def __call__(self, index: int, value: Any_) -> int:
+        self.update(index, value)
+        return self.count
 
 
 class All(CombineLatest):
     """ Implement the functionality of ``all`` operator for publishers.
     One big difference is that ``all`` takes an iterator and ``All`` take a
     variable amount of publishers as arguments.
+
+    The number of truthy sources is updated incrementally, so an emit of a
+    source is not evaluating the other sources.
+
     :param publishers: Publishers evaluated for all to be True
     """
-    def __init__(self, *publishers: Any_) -> None:
-        CombineLatest.__init__(self, *publishers, map_=_all)
-
+    __slots__ = ()
 
-def _any(*items):
-    return any(items)
+    def __init__(self, *publishers: Any_) -> None:
+        CombineLatest.__init__(self, *publishers,
+                               map_=_AllAggregation(len(publishers)),
+                               incremental=True)
 
 
 class Any(CombineLatest):
     """ Implement the functionality of ``any`` operator for publishers.
     One big difference is that ``any`` takes an iterator and ``Any`` take a
     variable amount of publishers as arguments.
+
+    The number of truthy sources is updated incrementally, so an emit of a
+    source is not evaluating the other sources.
+
     :param publishers: Publishers evaluated for one to be True
     """
+    __slots__ = ()
+
     def __init__(self, *publishers: Any_) -> None:
-        CombineLatest.__init__(self, *publishers, map_=_any)
+        CombineLatest.__init__(self, *publishers,
+                               map_=_AnyAggregation(len(publishers)),
+                               incremental=True)
+
+
+class Count(CombineLatest):
+    """ Count the publishers with a truthy value (or with a value fulfilling
+    the predicate).
+
+    Usage:
+    >>> from broqer import op, Value
+    >>> values = [Value(v) for v in (3, 0, 7)]
+    >>> op.Count(*values).get()
+    2
+    >>> op.Count(*values, predicate=lambda v: v > 5).get()
+    1
+
+    :param publishers: Publishers to be counted
+    :param predicate: optional function deciding if a value is counted
+    """
+    __slots__ = ()
+
+    def __init__(self, *publishers: Any_, predicate: Callable = bool) -> None:
+        CombineLatest.__init__(
+            self, *publishers,
+            map_=_CountAggregation(len(publishers), predicate),
+            incremental=True)
+
+
+class _BitwiseAggregation:
+    """ Incremental bitwise aggregation keeping the number of sources having
+    each bit set. Only the bits changed by an emit are updated. Values other
+    than non-negative integers (e.g. sets) are reduced the classic way.
+    """
+    __slots__ = ('_values', '_bit_counts', '_result', '_reduce_count',
+                 '_bool_count', '_operation')
+
+    def __init__(self, size: int, operation: Callable) -> None:
+        self._values = [NONE] * size  # type: List[Any_]
+        self._bit_counts = []  # type: List[int]
+        self._result = 0
+
+        # number of values not being non-negative integers
+        self._reduce_count = 0
+
+        # number of values being bool (all bools are resulting in a bool)
+        self._bool_count = 0
 
+        self._operation = operation
 
-def _bitwise_or(*items):
-    return reduce(operator.or_, items)
+    def __call__(self, index: int, value: Any_) -> Any_:
+        previous = self._values[index]
+        self._values[index] = value
+
+        bits, previous_bits = _bits(value), _bits(previous)
+        self._reduce_count += (bits is None) - (previous_bits is None)
+        self._bool_count += (type(value) is bool) - (type(previous) is bool)
+
+        changed = (previous_bits or 0) ^ (bits or 0)
+
+        if changed:
+            self._update_bits(changed, bits or 0)
+
+        if self._reduce_count:
+            return reduce(self._operation,
+                          [v for v in self._values if v is not NONE])
+
+        if self._bool_count == len(self._values):
+            return bool(self._result)
+
+        return self._result
+
+    def _update_bits(self, changed: int, value: int) -> None:
+        bit_counts = self._bit_counts
+        size = len(self._values)
+
+        if changed.bit_length() > len(bit_counts):
+            bit_counts.extend([0] * (changed.bit_length() - len(bit_counts)))
+
+        while changed:
+            lowest = changed & -changed
+            bit = lowest.bit_length() - 1
+            changed ^= lowest
+
+            bit_counts[bit] += 1 if value & lowest else -1
+
+            if self._operation is operator.or_:
+                is_set = bit_counts[bit] > 0
+            else:
+                is_set = bit_counts[bit] == size
+
+            if is_set:
+                self._result |= lowest
+            else:
+                self._result &= ~lowest
+
+
+def _bits(value: Any_) -> Optional[int]:
+    """ Return the value for per bit aggregation (0 for a missing value) or
+    None if the value is not a non-negative integer.
+    """
+    if value is NONE:
+        return 0
+    if isinstance(value, int) and value >= 0:
+        return value
+    return None
 
 
 class BitwiseOr(CombineLatest):
     """ Implement the functionality of bitwise or (``|``) operator for
     publishers.
+
+    For non-negative integers the number of sources per set bit is updated
+    incrementally, so an emit of a source is not evaluating the other sources.
+
     :param publishers: Publishers evaluated for bitwise or
     """
-    def __init__(self, *publishers: Any_) -> None:
-        CombineLatest.__init__(self, *publishers, map_=_bitwise_or)
-
+    __slots__ = ()
 
-def _bitwise_and(*items):
-    return reduce(operator.and_, items)
+    def __init__(self, *publishers: Any_) -> None:
+        CombineLatest.__init__(
+            self, *publishers,
+            map_=_BitwiseAggregation(len(publishers), operator.or_),
+            incremental=True)
 
 
 class BitwiseAnd(CombineLatest):
     """ Implement the functionality of bitwise and (``&``) operator for
     publishers.
+
+    For non-negative integers the number of sources per set bit is updated
+    incrementally, so an emit of a source is not evaluating the other sources.
+
     :param publishers: Publishers evaluated for bitwise and
     """
+    __slots__ = ()
+
+    def __init__(self, *publishers: Any_) -> None:
+        CombineLatest.__init__(
+            self, *publishers,
+            map_=_BitwiseAggregation(len(publishers), operator.and_),
+            incremental=True)
+
+
+class _SumAggregation:
+    """ Incremental sum keeping the latest value of each source """
+    __slots__ = ('_values', '_total')
+
+    def __init__(self, size: int, start: Any_) -> None:
+        self._values = [0] * size  # type: List[Any_]
+        self._total = start
+
+    def __call__(self, index: int, value: Any_) -> Any_:
+        self._total += value - self._values[index]
+        self._values[index] = value
+        return self._total
+
+
+class Sum(CombineLatest):
+    """ Implement the functionality of ``sum`` for publishers. The sum is
+    updated by the difference of the changed value, so an emit of a source is
+    not evaluating the other sources. For floats this may accumulate rounding
+    errors over many emits.
+
+    Usage:
+    >>> from broqer import op, Value
+    >>> values = [Value(v) for v in range(5)]
+    >>> total = op.Sum(*values)
+    >>> total.get()
+    10
+
+    :param publishers: Publishers to be summed up
+    :param start: value to start with (like ``start`` of ``sum``)
+    """
+    __slots__ = ()
+
+    def __init__(self, *publishers: Any_, start: Any_ = 0) -> None:
+        CombineLatest.__init__(self, *publishers,
+                               map_=_SumAggregation(len(publishers), start),
+                               incremental=True)
+
+
+class _Reversed:
+    """ Wrapper reversing the order of values (to build a max heap) """
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any_) -> None:
+        self.value = value
+
+    def __lt__(self, other: '_Reversed') -> bool:
+        return other.value < self.value
+
+
+class _HeapAggregation:
+    """ Incremental min/max aggregation based on a heap with lazy deletion.
+    Each heap entry is tagged with a stamp, entries with an outdated stamp
+    are removed when they reach the top of the heap.
+    """
+    __slots__ = ('_heap', '_stamps', '_counter', '_wrap')
+
+    def __init__(self, size: int, wrap: Callable[[Any_], Any_]) -> None:
+        self._heap = []  # type: List[Tuple[Any_, int, int]]
+        self._stamps = [-1] * size
+        self._counter = 0
+        self._wrap = wrap
+
+    def __call__(self, index: int, value: Any_) -> Any_:
+        heap = self._heap
+        self._counter += 1
+        self._stamps[index] = self._counter
+        heapq.heappush(heap, (self._wrap(value), self._counter, index))
+
+        # rebuild the heap when too many entries are outdated
+        if len(heap) > 2 * len(self._stamps) + 16:
+            heap[:] = [e for e in heap if self._stamps[e[2]] == e[1]]
+            heapq.heapify(heap)
+
+        while self._stamps[heap[0][2]] != heap[0][1]:
+            heapq.heappop(heap)
+
+        result = heap[0][0]
+        return result.value if self._wrap is _Reversed else result
+
+
+def _identity(value: Any_) -> Any_:
+    return value
+
+
+class Min(CombineLatest):
+    """ Implement the functionality of ``min`` for publishers. The values are
+    kept in a heap, so an emit of a source is costing O(log n).
+
+    Usage:
+    >>> from broqer import op, Value
+    >>> values = [Value(v) for v in (3, 1, 2)]
+    >>> op.Min(*values).get()
+    1
+
+    :param publishers: Publishers evaluated for the minimum
+    """
+    __slots__ = ()
+
+    def __init__(self, *publishers: Any_) -> None:
+        CombineLatest.__init__(
+            self, *publishers,
+            map_=_HeapAggregation(len(publishers), _identity),
+            incremental=True)
+
+
+class Max(CombineLatest):
+    """ Implement the functionality of ``max`` for publishers. The values are
+    kept in a heap, so an emit of a source is costing O(log n).
+
+    Usage:
+    >>> from broqer import op, Value
+    >>> values = [Value(v) for v in (3, 1, 2)]
+    >>> op.Max(*values).get()
+    3
+
+    :param publishers: Publishers evaluated for the maximum
+    """
+    __slots__ = ()
+
     def __init__(self, *publishers: Any_) -> None:
-        CombineLatest.__init__(self, *publishers, map_=_bitwise_and)
+        CombineLatest.__init__(
+            self, *publishers,
+            map_=_HeapAggregation(len(publishers), _Reversed),
+            incremental=True)
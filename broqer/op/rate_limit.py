@@ -0,0 +1,252 @@
+"""
+Limit the rate of emits by a token bucket, forwarding bursts via a queue.
+
+Other than ``Throttle`` (which is keeping only the latest value) every value
+is forwarded as long as the bounded queue is not overflowing. Up to ``burst``
+values are forwarded immediately, further values are queued and forwarded
+with ``rate`` values per second.
+
+Usage (on virtual time, see broqer.virtual_time):
+
+>>> import asyncio
+>>> from broqer import Value, op, Sink
+>>> from broqer.virtual_time import run
+>>> async def main():
+...     s = Value()
+...     limit = s | op.RateLimit(10, burst=2)
+...     _d = limit.subscribe(Sink(print))
+...     for value in range(4):
+...         s.emit(value)
+...     print('queued:', limit.backlog)
+...     await asyncio.sleep(0.15)
+...     print('queued:', limit.backlog)
+...     await asyncio.sleep(0.1)
+>>> run(main())
+0
+1
+queued: 2
+2
+queued: 1
+3
+
+The ``TokenBucket`` can also be awaited, e.g. to limit the number of
+coroutine calls per second of ``MapAsync``:
+
+>>> async def query(value):
+...     print(f'query {value} at {asyncio.get_running_loop().time():.2f}s')
+>>> async def main():
+...     bucket = op.TokenBucket(10)
+...     s = Value()
+...     _d = (s | op.MapAsync(bucket.wrap(query))).subscribe(Sink())
+...     for value in range(3):
+...         s.emit(value)
+...     await asyncio.sleep(0.3)
+>>> run(main())
+query 0 at 0.00s
+query 1 at 0.10s
+query 2 at 0.20s
+"""
+import asyncio
+from collections import deque
+from enum import Enum
+from functools import wraps
+import sys
+from typing import Any, Callable, Deque, Optional
+
+from broqer import Publisher, Subscriber, default_error_handler
+from broqer.coro_queue import MaxQueueException
+from broqer.operator import Operator
+from broqer.timer import Timer, TimerWheel, weak_callback
+
+# A timer may expire slightly before the requested time and the refill is
+# subject to rounding, so a token count missing less than this fraction of a
+# token is regarded as available. The tolerance is a fixed number of tokens,
+# independent of the rate.
+TOKEN_TOLERANCE = 1e-6
+
+
+class OverflowPolicy(Enum):
+    """ OverflowPolicy defines how to act when a value is emitted while the
+    queue of the RateLimit operator is full """
+    DROP_OLDEST = 1  # remove the oldest queued value and queue the new one
+    DROP_NEWEST = 2  # drop the emitted value
+    RAISE = 3  # raise MaxQueueException to the emitting publisher
+
+
+class TokenBucket:
+    """ Token bucket refilled with ``rate`` tokens per second up to ``burst``
+    tokens. It's starting full.
+
+    :param rate: number of tokens per second
+    :param burst: maximal number of tokens in the bucket
+    :param loop: asyncio event loop to use (its clock is used)
+    """
+    __slots__ = ('_rate', '_burst', '_loop', '_tokens', '_timestamp')
+
+    def __init__(self, rate: float, burst: int = 1, loop=None) -> None:
+        if rate <= 0:
+            raise ValueError('Rate has to be bigger than zero')
+
+        if burst < 1:
+            raise ValueError('Burst has to be at least 1')
+
+        self._rate = rate
+        self._burst = burst
+        self._loop = loop or asyncio.get_event_loop()
+        self._tokens = float(burst)
+        self._timestamp = self._loop.time()
+
+    @property
+    def tokens(self) -> float:
+        """ Number of tokens currently available (negative when tokens are
+        reserved by waiting ``acquire`` calls) """
+        self._refill()
+        return self._tokens
+
+    def _refill(self) -> None:
+        now = self._loop.time()
+        self._tokens = min(self._tokens + (now - self._timestamp) * self._rate,
+                           self._burst)
+        self._timestamp = now
+
+    def consume(self) -> bool:
+        """ Take a token if available.
+
+        :returns: True if a token was taken
+        """
+        self._refill()
+
+        if self._tokens + TOKEN_TOLERANCE >= 1:
+            self._tokens -= 1
+            return True
+
+        return False
+
+    def delay(self) -> float:
+        """ Time in seconds until the next token is available """
+        self._refill()
+        return max(1 - self._tokens, 0) / self._rate
+
+    async def acquire(self) -> None:
+        """ Take a token, waiting until it's available. Concurrent calls are
+        served in order. """
+        self._refill()
+        self._tokens -= 1
+
+        if self._tokens + TOKEN_TOLERANCE >= 0:
+            return
+
+        try:
+            await asyncio.sleep(-self._tokens / self._rate)
+        except asyncio.CancelledError:
+            self._tokens += 1  # give back the reserved token
+            raise
+
+    def wrap(self, coro: Callable, *args, **kwargs) -> Callable:
+        """ Return a coroutine function receiving one argument and calling
+        ``coro(*args, value, **kwargs)`` after a token was acquired (e.g. to
+        be used as coroutine for ``MapAsync``) """
+        @wraps(coro)
+        async def _coro(value):
+            await self.acquire()
+            return await coro(*args, value, **kwargs)
+
+        return _coro
+
+
+class RateLimit(Operator):
+    """ Forward emits limited by a token bucket. Values emitted while no token
+    is available are queued. When subscribed .get() is returning the last
+    forwarded value, otherwise the state of the source publisher.
+
+    :param rate: maximal average number of forwarded values per second
+    :param burst: number of values forwarded without delay after being idle
+    :param max_queue: maximal number of queued values (0 for no queue)
+    :param policy: OverflowPolicy used when the queue is full
+    :param error_callback: error callback to be registered
+    :param loop: asyncio event loop to use
+    :param wheel: optional TimerWheel to be used for the timer
+    """
+    __slots__ = ('_bucket', '_max_queue', '_policy', '_queue', '_timer',
+                 '_error_callback')
+
+    def __init__(self, rate: float, burst: int = 1, max_queue: int = 100,
+                 policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                 error_callback=default_error_handler, loop=None,
+                 wheel: Optional[TimerWheel] = None) -> None:
+        Operator.__init__(self)
+
+        if max_queue < 0:
+            raise ValueError('max_queue has to be positive')
+
+        loop = loop or asyncio.get_event_loop()
+        self._bucket = TokenBucket(rate, burst, loop=loop)
+        self._max_queue = max_queue
+        self._policy = policy
+        self._queue = deque()  # type: Deque[Any]
+        self._timer = Timer(weak_callback(self._timer_cb), loop=loop,
+                            wheel=wheel)
+        self._error_callback = error_callback
+
+    @property
+    def backlog(self) -> int:
+        """ Number of values waiting to be forwarded """
+        return len(self._queue)
+
+    def get(self):
+        if self._subscriptions:
+            return Publisher.get(self)
+
+        return self._originator.get()
+
+    def emit(self, value: Any, who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        if not self._queue and self._bucket.consume():
+            self._forward(value)
+            return
+
+        if len(self._queue) >= self._max_queue:
+            if self._policy is OverflowPolicy.RAISE:
+                raise MaxQueueException(
+                    f'RateLimit queue exceeded {self._max_queue} values')
+
+            if self._policy is OverflowPolicy.DROP_NEWEST or \
+                    not self._queue:
+                return
+
+            self._queue.popleft()
+
+        self._queue.append(value)
+
+        if not self._timer.is_running():
+            self._timer.start(self._bucket.delay())
+
+    def _forward(self, value: Any) -> None:
+        try:
+            Publisher.notify(self, value)
+        except Exception:  # pylint: disable=broad-except
+            self._error_callback(*sys.exc_info())
+
+    def _timer_cb(self) -> None:
+        while self._queue and self._bucket.consume():
+            self._forward(self._queue.popleft())
+
+        if self._queue:
+            self._timer.start(self._bucket.delay())
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        Operator.unsubscribe(self, subscriber)
+
+        if not self._subscriptions:
+            self._cancel()
+
+    def reset_state(self) -> None:
+        """ Drop the queued values and reset the state """
+        self._cancel()
+        Publisher.reset_state(self)
+
+    def _cancel(self) -> None:
+        self._timer.cancel()
+        self._queue.clear()
@@ -0,0 +1,103 @@
+"""
+Emit the last received value periodically.
+
+Usage (on virtual time, see broqer.virtual_time):
+
+>>> import asyncio
+>>> from broqer import Value, op, Sink
+>>> from broqer.virtual_time import run
+>>> async def main():
+...     s = Value()
+...     _d = (s | op.Sample(0.1)).subscribe(Sink(print))
+...     for value in range(8):
+...         s.emit(value)
+...         await asyncio.sleep(0.03)
+...     await asyncio.sleep(0.2)
+>>> run(main())
+3
+6
+7
+
+Each interval the latest value received since the previous sample is emitted.
+Intervals without a new value are not emitting and the timer is stopped until
+the next value is received, so an idle source is not costing anything. An emit
+is only storing the value.
+"""
+import asyncio
+import sys
+from typing import Any, Optional
+
+from broqer import Publisher, Subscriber, default_error_handler, NONE
+from broqer.operator import Operator
+from broqer.timer import Timer, TimerWheel, weak_callback
+
+
+class Sample(Operator):
+    """ Emit the last received value periodically. When subscribed .get() is
+    returning the last emitted value, otherwise the state of the source
+    publisher.
+
+    :param interval: time in seconds between samples
+    :param error_callback: error callback to be registered
+    :param loop: asyncio event loop to use
+    :param wheel: optional TimerWheel to be used for the timer
+    """
+    __slots__ = ('_interval', '_timer', '_error_callback', '_value')
+
+    def __init__(self, interval: float, error_callback=default_error_handler,
+                 loop=None, wheel: Optional[TimerWheel] = None) -> None:
+        Operator.__init__(self)
+
+        if interval <= 0:
+            raise ValueError('Interval has to be bigger than zero')
+
+        self._interval = interval
+        self._timer = Timer(weak_callback(self._timer_cb),
+                            loop=loop or asyncio.get_event_loop(),
+                            wheel=wheel)
+        self._error_callback = error_callback
+        self._value = NONE  # type: Any
+
+    def get(self):
+        if self._subscriptions:
+            return Publisher.get(self)
+
+        return self._originator.get()
+
+    def emit(self, value: Any, who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        self._value = value
+
+        if not self._timer.is_running():
+            self._timer.start(self._interval)
+
+    def _timer_cb(self) -> None:
+        value, self._value = self._value, NONE
+
+        if value is NONE:
+            # no value received in the last interval
+            return
+
+        self._timer.start(self._interval)
+
+        try:
+            Publisher.notify(self, value)
+        except Exception:  # pylint: disable=broad-except
+            self._error_callback(*sys.exc_info())
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        Operator.unsubscribe(self, subscriber)
+
+        if not self._subscriptions:
+            self._cancel()
+
+    def reset_state(self) -> None:
+        """ Drop the pending value and reset the state """
+        self._cancel()
+        Publisher.reset_state(self)
+
+    def _cancel(self) -> None:
+        self._timer.cancel()
+        self._value = NONE
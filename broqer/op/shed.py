@@ -0,0 +1,227 @@
+"""
+Shed load adaptively when the downstream is falling behind.
+
+The operator is measuring the time spent in the downstream subscribers (and
+optionally the backlog of an asynchronous subscriber like ``SinkAsync``). Once
+per ``window`` the load is compared with the budget and the ratio of forwarded
+values is adapted:
+
+- pass-through: every value is forwarded (no overload)
+- sampling: only a fraction of the values is forwarded
+- conflation: only the latest value is forwarded once per window
+
+Skipped values are conflated: the latest value skipped in a window is
+forwarded at the end of the window, so the downstream is always getting the
+latest state.
+
+Usage (on virtual time, see broqer.virtual_time; the clock measuring the load
+is advanced by the sink to simulate a slow subscriber):
+
+>>> import asyncio
+>>> from broqer import Value, op, Sink
+>>> from broqer.virtual_time import run
+>>> now = [0.0]
+>>> def slow_sink(value):
+...     now[0] += 0.01  # each value is costing 10ms
+>>> async def main():
+...     source = Value()
+...     shed = source | op.Shed(cpu_budget=0.5, window=0.05,
+...                             clock=lambda: now[0])
+...     _d = shed.subscribe(Sink(slow_sink))
+...     for value in range(150):
+...         source.emit(value)
+...         await asyncio.sleep(0.001)
+...     return shed
+>>> shed = run(main())
+>>> shed.mode
+<ShedMode.SAMPLE: 2>
+>>> shed.ratio.get() > 0.5
+True
+"""
+import asyncio
+from enum import Enum
+import sys
+import time
+from typing import Any, Callable, Optional
+
+from broqer import Publisher, Subscriber, Value, default_error_handler, NONE
+from broqer.operator import Operator
+from broqer.timer import Timer, TimerWheel, weak_callback
+
+
+class ShedMode(Enum):
+    """ Current behavior of the Shed operator """
+    PASS = 1  # forward every value
+    SAMPLE = 2  # forward a fraction of the values
+    CONFLATE = 3  # forward only the latest value once per window
+
+
+class Shed(Operator):  # pylint: disable=too-many-instance-attributes
+    """ Forward values depending on the load of the downstream. When
+    subscribed .get() is returning the last forwarded value, otherwise the
+    state of the source publisher.
+
+    The load of a window is the time spent in the downstream relative to
+    ``cpu_budget * window`` or, when ``backlog`` is given, the backlog
+    relative to ``max_backlog`` (the higher one is used). With a load above 1
+    the ratio of forwarded values is reduced proportionally, otherwise it is
+    increased (at most doubled per window) until all values are forwarded
+    again. Below ``min_ratio`` the operator is conflating.
+
+    :param cpu_budget: fraction of the time to be spent in the downstream
+    :param window: duration of a measurement window in seconds
+    :param backlog: optional function returning the number of values waiting
+        to be processed (e.g. ``lambda: sink.backlog`` for a SinkAsync)
+    :param max_backlog: backlog to be regarded as full load
+    :param min_ratio: ratio of forwarded values below which is conflated
+    :param clock: function returning the current time in seconds, used to
+        measure the time spent in the downstream
+    :param error_callback: error callback to be registered
+    :param loop: asyncio event loop to use
+    :param wheel: optional TimerWheel to be used for the timer
+    :ivar ratio: Value publishing the ratio of shed values in the last window
+        (0 when all values were forwarded)
+    """
+    __slots__ = ('_cpu_budget', '_window', '_backlog', '_max_backlog',
+                 '_min_ratio', '_clock', '_timer', '_error_callback',
+                 '_keep', '_credit', '_pending', '_busy', '_received',
+                 '_forwarded', 'ratio')
+
+    def __init__(self, cpu_budget: float = 0.5, window: float = 1.0, *,
+                 backlog: Optional[Callable[[], int]] = None,
+                 max_backlog: int = 100, min_ratio: float = 0.01,
+                 clock: Callable[[], float] = time.perf_counter,
+                 error_callback=default_error_handler, loop=None,
+                 wheel: Optional[TimerWheel] = None) -> None:
+        Operator.__init__(self)
+
+        if not 0 < cpu_budget <= 1:
+            raise ValueError('cpu_budget has to be in the range (0, 1]')
+
+        if window <= 0:
+            raise ValueError('Window has to be bigger than zero')
+
+        if max_backlog < 1:
+            raise ValueError('max_backlog has to be at least 1')
+
+        self._cpu_budget = cpu_budget
+        self._window = window
+        self._backlog = backlog
+        self._max_backlog = max_backlog
+        self._min_ratio = min_ratio
+        self._clock = clock
+        self._timer = Timer(weak_callback(self._control),
+                            loop=loop or asyncio.get_event_loop(),
+                            wheel=wheel)
+        self._error_callback = error_callback
+
+        self._keep = 1.0  # ratio of values to be forwarded
+        self._credit = 0.0  # accumulated ratio used for sampling
+        self._pending = NONE  # type: Any
+
+        # measurement of the current window
+        self._busy = 0.0
+        self._received = 0
+        self._forwarded = 0
+
+        self.ratio = Value(0.0)
+
+    @property
+    def mode(self) -> ShedMode:
+        """ Current mode depending on the ratio of forwarded values """
+        if self._keep >= 1:
+            return ShedMode.PASS
+
+        if self._keep >= self._min_ratio:
+            return ShedMode.SAMPLE
+
+        return ShedMode.CONFLATE
+
+    def get(self):
+        if self._subscriptions:
+            return Publisher.get(self)
+
+        return self._originator.get()
+
+    def emit(self, value: Any, who: Publisher) -> None:
+        if who is not self._originator:
+            raise ValueError('Emit from non assigned publisher')
+
+        self._received += 1
+
+        if not self._timer.is_running():
+            self._timer.start(self._window)
+
+        keep = self._keep
+
+        if keep >= 1:
+            self._forward(value)
+            return
+
+        if keep >= self._min_ratio:
+            self._credit += keep
+
+            if self._credit >= 1:
+                self._credit -= 1
+                self._forward(value)
+                return
+
+        self._pending = value
+
+    def _forward(self, value: Any) -> None:
+        self._pending = NONE
+        self._forwarded += 1
+        start = self._clock()
+
+        try:
+            Publisher.notify(self, value)
+        except Exception:  # pylint: disable=broad-except
+            self._error_callback(*sys.exc_info())
+        finally:
+            self._busy += self._clock() - start
+
+    def _control(self) -> None:
+        """ Called at the end of each window to adapt the ratio """
+        if self._pending is not NONE:
+            self._forward(self._pending)
+
+        load = self._busy / (self._cpu_budget * self._window)
+
+        if self._backlog is not None:
+            load = max(load, self._backlog() / self._max_backlog)
+
+        if self._received:
+            ratio = 1 - min(self._forwarded / self._received, 1.0)
+        else:
+            ratio = 0.0
+
+        active = self._received or self._keep < 1
+
+        # reduce proportionally on overload, otherwise increase (at most
+        # doubled per window)
+        self._keep = max(min(self._keep / max(load, 0.5), 1.0),
+                         self._min_ratio / 2, 1e-6)
+        self._busy = 0.0
+        self._received = self._forwarded = 0
+
+        if ratio != self.ratio.get():
+            self.ratio.emit(ratio)
+
+        if active:
+            self._timer.start(self._window)
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        Operator.unsubscribe(self, subscriber)
+
+        if not self._subscriptions:
+            self._timer.cancel()
+            self._pending = NONE
+            self._keep = 1.0
+            self._credit = 0.0
+            self._busy = 0.0
+            self._received = self._forwarded = 0
+
+    def reset_state(self) -> None:
+        """ Drop the pending value and reset the state """
+        self._pending = NONE
+        Publisher.reset_state(self)
@@ -1,33 +1,36 @@
 """
 Rate limit emits by the given time.
-Usage:
+Usage (on virtual time, see broqer.virtual_time):
 >>> import asyncio
 >>> from broqer import Value, op, Sink
->>> v = Value()
->>> throttle_publisher = v | op.Throttle(0.1)
->>> _d = throttle_publisher.subscribe(Sink(print))
->>> v.emit(1)
+>>> from broqer.virtual_time import run
+>>> async def main():
+...     v = Value()
+...     throttle_publisher = v | op.Throttle(0.1)
+...     _d = throttle_publisher.subscribe(Sink(print))
+...     v.emit(1)
+...     v.emit(2)
+...     await asyncio.sleep(0.05)
+...     v.emit(3)
+...     await asyncio.sleep(0.2)
+...     # It's also possible to reset the throttling duration:
+...     v.emit(4)
+...     v.emit(5)
+...     await asyncio.sleep(0.05)
+...     throttle_publisher.reset()
+>>> run(main())
 1
->>> v.emit(2)
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.05))
->>> v.emit(3)
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.2))
 3
->>> # It's also possible to reset the throttling duration:
->>> v.emit(4)
 4
->>> v.emit(5)
->>> asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.05))
->>> throttle_publisher.reset()
 """
 import asyncio
 import sys
-from typing import Any  # noqa: F401
+from typing import Any, Optional  # noqa: F401
 
 from broqer import Publisher, default_error_handler, NONE
 
 from broqer.operator import Operator
-from broqer.timer import Timer
+from broqer.timer import Timer, TimerWheel, weak_callback
 
 
 class Throttle(Operator):
@@ -36,9 +39,14 @@ class Throttle(Operator):
     :param duration: time for throttling in seconds
     :param error_callback: the error callback to be registered
     :param loop: asyncio event loop to use
+    :param wheel: optional TimerWheel to be used for the timer (recommended
+                  for a high number of throttles)
     """
+    __slots__ = ('_duration', '_loop', '_timer', '_error_callback')
+
     def __init__(self, duration: float,
-                 error_callback=default_error_handler, loop=None) -> None:
+                 error_callback=default_error_handler, loop=None,
+                 wheel: Optional[TimerWheel] = None) -> None:
 
         Operator.__init__(self)
 
@@ -47,7 +55,8 @@ class Throttle(Operator):
 
         self._duration = duration
         self._loop = loop or asyncio.get_event_loop()
-        self._timer = Timer(self._delayed_emit_cb, loop=loop)
+        self._timer = Timer(weak_callback(self._delayed_emit_cb), loop=loop,
+                            wheel=wheel)
         self._error_callback = error_callback
 
     def get(self):
@@ -1,11 +1,45 @@
 """ Module implementing Operator, MultiOperator.
 """
+import functools
 import typing
 from abc import abstractmethod
 
 # pylint: disable=cyclic-import
 from broqer import Publisher, SubscriptionDisposable, Subscriber
-from broqer.publisher import ValueT
+from broqer.publisher import CHANGES, ValueT
+
+# marker for a memo entry without memoized result
+_UNSET = object()
+
+
+def _cached_version(operator, sources: typing.Iterable[Publisher]) -> int:
+    """ Return the version of the operator: the maximum of its own version
+    and the versions of its sources. The result is cached in ._memo as long
+    as the global change counter is unchanged, so each node is evaluated once
+    per change (also in diamond shaped graphs) and reading an unchanged graph
+    is O(1).
+    """
+    memo = operator._memo  # pylint: disable=protected-access
+    changes = CHANGES[0]
+
+    if memo is not None and memo[0] == changes:
+        return memo[1]
+
+    version = operator._version  # pylint: disable=protected-access
+
+    for source in sources:
+        source_version = source.version
+
+        if source_version > version:
+            version = source_version
+
+    if memo is not None and memo[1] == version:
+        # nothing upstream changed, keep the memoized result
+        operator._memo = (changes, version, memo[2])
+    else:
+        operator._memo = (changes, version, _UNSET)
+
+    return version
 
 
 class Operator(Publisher, Subscriber):
@@ -15,11 +49,18 @@ class Operator(Publisher, Subscriber):
 
     On unsubscription of the last subscriber the dependent publisher will also
     be unsubscripted.
+
+    :ivar _memo: tuple (change counter, version, result) caching the version
+                 and the result of the last .get() call without
+                 subscriptions (see memoized_get)
     """
+    __slots__ = ('_originator', '_memo')
+
     def __init__(self) -> None:
         Publisher.__init__(self)
         Subscriber.__init__(self)
         self._originator = None  # type: typing.Optional[Publisher]
+        self._memo = None  # type: typing.Optional[typing.Tuple]
 
     @property
     def originator(self):
@@ -37,9 +78,16 @@ class Operator(Publisher, Subscriber):
         if self._subscriptions:
             self._originator.subscribe(self)
 
-    def subscribe(self, subscriber: 'Subscriber',
-                  prepend: bool = False) -> SubscriptionDisposable:
-        disposable = Publisher.subscribe(self, subscriber, prepend)
+    @property
+    def version(self) -> int:
+        if self._originator is None:
+            return self._version
+
+        return _cached_version(self, (self._originator,))
+
+    def subscribe(self, subscriber: 'Subscriber', prepend: bool = False,
+                  weak: bool = False) -> SubscriptionDisposable:
+        disposable = Publisher.subscribe(self, subscriber, prepend, weak)
 
         if len(self._subscriptions) == 1 and self._originator is not None:
             # if this was the first subscription
@@ -57,6 +105,9 @@ class Operator(Publisher, Subscriber):
     def notify(self, value: ValueT) -> None:
         raise ValueError('Operator doesn\'t support .notify()')
 
+    def notify_many(self, values: typing.Sequence[ValueT]) -> None:
+        raise ValueError('Operator doesn\'t support .notify_many()')
+
     @abstractmethod
     def emit(self, value: typing.Any, who: Publisher) -> None:
         """ Send new value to the operator
@@ -70,16 +121,27 @@ class MultiOperator(Publisher, Subscriber):
     Operator all publishers will be subscribed on first subscription to this
     operator. Accordingly all publishers get unsubscribed on unsubscription
     of the last subscriber.
+
+    :ivar _memo: tuple (change counter, version, result) caching the version
+                 and the result of the last .get() call without
+                 subscriptions (see memoized_get)
     """
+    __slots__ = ('_originators', '_memo')
+
     def __init__(self, *publishers: Publisher) -> None:
         Publisher.__init__(self)
         Subscriber.__init__(self)
         self._originators = publishers
+        self._memo = None  # type: typing.Optional[typing.Tuple]
         self.add_dependencies(*publishers)
 
-    def subscribe(self, subscriber: 'Subscriber',
-                  prepend: bool = False) -> SubscriptionDisposable:
-        disposable = Publisher.subscribe(self, subscriber, prepend)
+    @property
+    def version(self) -> int:
+        return _cached_version(self, self._originators)
+
+    def subscribe(self, subscriber: 'Subscriber', prepend: bool = False,
+                  weak: bool = False) -> SubscriptionDisposable:
+        disposable = Publisher.subscribe(self, subscriber, prepend, weak)
 
         if len(self._subscriptions) == 1:  # if this was the first subscription
             for publisher in self._originators:
@@ -98,9 +160,47 @@ class MultiOperator(Publisher, Subscriber):
     def notify(self, value: ValueT) -> None:
         raise ValueError('Operator doesn\'t support .notify()')
 
+    def notify_many(self, values: typing.Sequence[ValueT]) -> None:
+        raise ValueError('Operator doesn\'t support .notify_many()')
+
     def emit(self, value: typing.Any, who: Publisher) -> None:
         """ Send new value to the operator
         :param value: value to be send
         :param who: reference to which publisher is emitting
         """
         raise NotImplementedError('.emit not implemented')
+
+
+def memoized_get(get: typing.Callable) -> typing.Callable:
+    """ Decorator for .get() of operators computing their result from their
+    source publishers. When Publisher.memoize_get is True and the operator is
+    not subscribed, the result is memoized and only recomputed when the
+    version of the operator has changed (a source got notified).
+
+    The version of a publisher is the value of the global change counter at
+    its last change and the version of an operator is the maximum of its own
+    version and the versions of its sources. So the version of an operator is
+    changing whenever any publisher it depends on changed. The version is
+    cached while the global change counter is unchanged (see
+    _cached_version).
+    """
+    @functools.wraps(get)
+    def _get(self):
+        if not self.memoize_get or self._subscriptions:
+            return get(self)
+
+        version = self.version
+        memo = self._memo  # updated by .version
+
+        if memo is None or memo[1] != version:
+            # operator without source or with an overwritten .version
+            return get(self)
+
+        if memo[2] is not _UNSET:
+            return memo[2]
+
+        result = get(self)
+        self._memo = (memo[0], memo[1], result)
+        return result
+
+    return _get
@@ -1,15 +1,20 @@
 """ This module enables the operator overloading of publishers """
+from enum import Enum
 import math
 import operator
-from typing import Any as Any_
+from typing import Any as Any_, Callable, Hashable, Optional
+import weakref
 
 # pylint: disable=cyclic-import
 from broqer import Publisher
-from broqer.operator import Operator
+from broqer.publisher import next_version
+from broqer.operator import Operator, memoized_get
 
 
 class MapConstant(Operator):
     """ MapConstant TODO Docstring """
+    __slots__ = ('_value', '_operation')
+
     def __init__(self, publisher: Publisher, value, operation) -> None:
         Operator.__init__(self)
         self.originator = publisher
@@ -19,6 +24,7 @@ class MapConstant(Operator):
         if publisher.inherited_type is not None:
             self.inherit_type(publisher.inherited_type)
 
+    @memoized_get
     def get(self):
         return self._operation(self._originator.get(), self._value)
 
@@ -33,6 +39,8 @@ class MapConstant(Operator):
 
 class MapConstantReverse(Operator):
     """ MapConstantReverse TODO """
+    __slots__ = ('_value', '_operation')
+
     def __init__(self, publisher: Publisher, value, operation) -> None:
         Operator.__init__(self)
         self.originator = publisher
@@ -42,6 +50,7 @@ class MapConstantReverse(Operator):
         if publisher.inherited_type is not None:
             self.inherit_type(publisher.inherited_type)
 
+    @memoized_get
     def get(self):
         return self._operation(self._value, self._originator.get())
 
@@ -56,6 +65,8 @@ class MapConstantReverse(Operator):
 
 class MapUnary(Operator):
     """ MapUnary TODO """
+    __slots__ = ('_operation',)
+
     def __init__(self, publisher: Publisher, operation) -> None:
         Operator.__init__(self)
         self.originator = publisher
@@ -64,6 +75,7 @@ class MapUnary(Operator):
         if publisher.inherited_type is not None:
             self.inherit_type(publisher.inherited_type)
 
+    @memoized_get
     def get(self):
         return self._operation(self._originator.get())
 
@@ -77,6 +89,8 @@ class MapUnary(Operator):
 
 
 class _GetAttr(Operator):
+    __slots__ = ('_attribute_name', '_args', '_kwargs')
+
     def __init__(self, publisher: Publisher, attribute_name) -> None:
         Operator.__init__(self)
         self.originator = publisher
@@ -86,6 +100,7 @@ class _GetAttr(Operator):
 
         self.inherit_type(publisher.inherited_type)
 
+    @memoized_get
     def get(self):
         value = self._originator.get()  # may raise ValueError
         attribute = getattr(value, self._attribute_name)
@@ -94,8 +109,20 @@ class _GetAttr(Operator):
         return attribute(*self._args, **self._kwargs)
 
     def __call__(self, *args, **kwargs):
+        if self._args is None and Publisher.intern_expressions:
+            # the interned attribute publisher must not be changed
+            key = _key('call', id(self._originator), self._attribute_name,
+                       _constant_key(args),
+                       _constant_key(tuple(sorted(kwargs.items()))))
+            return intern(key, lambda: _GetAttr(
+                self._originator, self._attribute_name)._call(args, kwargs))
+
+        return self._call(args, kwargs)
+
+    def _call(self, args, kwargs) -> '_GetAttr':
         self._args = args
         self._kwargs = kwargs
+        self._version = next_version()  # the result of .get() changed
         return self
 
     def emit(self, value: Any_, who: Publisher) -> None:
@@ -110,6 +137,122 @@ class _GetAttr(Operator):
         return Publisher.notify(self, attribute(*self._args, **self._kwargs))
 
 
+# publishers built by operator overloading (see Publisher.intern_expressions)
+_interned = \
+    weakref.WeakValueDictionary()  # type: weakref.WeakValueDictionary
+
+
+def intern(key: Hashable, factory: Callable[[], Publisher]) -> Publisher:
+    """ Return the interned publisher for the key or build it via factory.
+    When Publisher.intern_expressions is False or the key is None (e.g. for
+    constants not to be interned, see _constant_key) a new publisher is built.
+    Publishers built with different index modes (see
+    Publisher.index_comparisons and Publisher.index_projections) are interned
+    separately.
+
+    The interned publishers are referenced weakly. Keys are using the
+    identity of the operand publishers, which is valid as long as the interned
+    publisher is alive (it is referencing its operands).
+
+    :param key: tuple describing the operation, operands and constants
+    :param factory: function building the publisher
+    """
+    if key is None or not Publisher.intern_expressions:
+        return factory()
+
+    # the index modes are changing the type of the built publisher
+    key = (key, Publisher.index_comparisons, Publisher.index_projections)
+    publisher = _interned.get(key, None)
+
+    if publisher is None:
+        publisher = _interned[key] = factory()
+
+    return publisher
+
+
+def _map_constant(publisher: Publisher, value: Any_,
+                  operation: Callable) -> Publisher:
+    """ Build a MapConstant or an indexed operator (see
+    Publisher.index_comparisons and Publisher.index_projections) """
+    # pylint: disable=import-outside-toplevel
+    if Publisher.index_projections and operation is operator.getitem:
+        from broqer import projection_index
+
+        if projection_index.is_indexable(value):
+            return projection_index.IndexedProjection(publisher, value,
+                                                      operation)
+
+    if Publisher.index_comparisons:
+        from broqer.predicate_index import IndexedComparison, is_indexable
+
+        if is_indexable(value, operation):
+            return IndexedComparison(publisher, value, operation)
+
+    return MapConstant(publisher, value, operation)
+
+
+def _get_attr(publisher: Publisher, attribute_name: str) -> Publisher:
+    """ Build a _GetAttr or (when Publisher.index_projections is True) an
+    IndexedProjection """
+    if Publisher.index_projections:
+        # pylint: disable=import-outside-toplevel
+        from broqer.projection_index import IndexedProjection
+        return IndexedProjection(publisher, attribute_name, getattr)
+
+    return _GetAttr(publisher, attribute_name)
+
+
+# constants of these types are compared by type and value for interning
+_SCALAR_TYPES = (type(None), bool, int, str, bytes)
+
+
+def _constant_key(value: Any_) -> Optional[Hashable]:
+    """ Return the key for a constant used in an expression or None when the
+    constant is not to be interned. Equal constants may lead to different
+    results (e.g. 1 and 1.0, 0.0 and -0.0 or (1, 1.0) and (1.0, 1)), so only
+    constants of known types are interned: scalars are compared by type and
+    value (floats by their repr), tuples and frozensets by the keys of their
+    items and enum members by identity.
+    """
+    value_type = type(value)
+
+    if value_type in _SCALAR_TYPES:
+        return (value_type, value)
+
+    if value_type in (float, complex):
+        return (value_type, repr(value))
+
+    if value_type in (tuple, frozenset):
+        keys = tuple(_constant_key(item) for item in value)
+
+        if any(key is None for key in keys):
+            return None
+
+        return (value_type, keys if value_type is tuple else frozenset(keys))
+
+    if isinstance(value, Enum):
+        return (value_type, id(value))
+
+    return None
+
+
+def _key(*parts: Optional[Hashable]) -> Optional[Hashable]:
+    """ Build the key for intern() - None if any part is None """
+    if any(part is None for part in parts):
+        return None
+
+    return parts
+
+
+# binary operations - with a publisher as right operand a CombineLatest is
+# used, otherwise MapConstant
+BINARY_METHODS = (
+    '__lt__', '__le__', '__eq__', '__ne__', '__ge__', '__gt__',
+    '__add__', '__and__', '__lshift__', '__mod__', '__mul__',
+    '__pow__', '__rshift__', '__sub__', '__xor__', '__concat__',
+    '__getitem__', '__floordiv__', '__truediv__')
+
+
 def apply_operator_overloading():
     """ Function to apply operator overloading to Publisher class """
     # operator overloading is (unfortunately) not working for the following
@@ -117,19 +260,20 @@ def apply_operator_overloading():
     # int, float, str - should return appropriate type instead of a Publisher
     # len - should return an integer
     # 'x in y' - is using __bool__ which is not working with Publisher
-    for method in (
-            '__lt__', '__le__', '__eq__', '__ne__', '__ge__', '__gt__',
-            '__add__', '__and__', '__lshift__', '__mod__', '__mul__',
-            '__pow__', '__rshift__', '__sub__', '__xor__', '__concat__',
-            '__getitem__', '__floordiv__', '__truediv__'):
+    for method in BINARY_METHODS:
         def _op(operand_left, operand_right, operation=method):
             if isinstance(operand_right, Publisher):
                 from broqer import op  # pylint: disable=C0415
-                return op.CombineLatest(operand_left, operand_right,
-                                        map_=getattr(operator,
-                                                     operation))
-            return MapConstant(operand_left, operand_right,
-                               getattr(operator, operation))
+                return intern(
+                    (operation, id(operand_left), id(operand_right)),
+                    lambda: op.CombineLatest(operand_left, operand_right,
+                                             map_=getattr(operator,
+                                                          operation)))
+            return intern(
+                _key(operation, id(operand_left),
+                     _constant_key(operand_right)),
+                lambda: _map_constant(operand_left, operand_right,
+                                      getattr(operator, operation)))
 
         setattr(Publisher, method, _op)
 
@@ -141,8 +285,11 @@ def apply_operator_overloading():
             ('__rxor__', '__xor__'), ('__rfloordiv__', '__floordiv__'),
             ('__rtruediv__', '__truediv__')):
         def _op(operand_left, operand_right, operation=_method):
-            return MapConstantReverse(operand_left, operand_right,
-                                      getattr(operator, operation))
+            return intern(
+                _key(operation, _constant_key(operand_right),
+                     id(operand_left)),
+                lambda: MapConstantReverse(operand_left, operand_right,
+                                           getattr(operator, operation)))
 
         setattr(Publisher, method, _op)
 
@@ -152,7 +299,8 @@ def apply_operator_overloading():
             ('__round__', round), ('__trunc__', math.trunc),
             ('__floor__', math.floor), ('__ceil__', math.ceil)):
         def _op_unary(operand, operation=_method):
-            return MapUnary(operand, operation)
+            return intern((operation, id(operand)),
+                          lambda: MapUnary(operand, operation))
 
         setattr(Publisher, method, _op_unary)
 
@@ -160,6 +308,7 @@ def apply_operator_overloading():
         if not publisher.inherited_type or \
            not hasattr(publisher.inherited_type, attribute_name):
             raise AttributeError(f'Attribute {attribute_name!r} not found')
-        return _GetAttr(publisher, attribute_name)
+        return intern(('getattr', id(publisher), attribute_name),
+                      lambda: _get_attr(publisher, attribute_name))
 
     Publisher.__getattr__ = _getattr
@@ -0,0 +1,202 @@
+"""
+Index for comparisons of one publisher with many constants.
+
+Comparing a publisher with thousands of constants (e.g. ``temperature > k``
+for many thresholds ``k``) is building one operator for each comparison and
+each emit of the publisher is evaluating all of them. When
+``Publisher.index_comparisons`` is True, comparisons built by operator
+overloading are registered in an index shared by all comparisons of the same
+publisher. An emit is then only evaluating the comparisons whose result may
+have changed:
+
+- ``<``, ``<=``, ``>`` and ``>=`` with a number are kept sorted by their
+  threshold, so only the thresholds between the previous and the new value
+  are evaluated (O(log n + flips))
+- ``==`` and ``!=`` are kept in a dictionary, so only the comparisons with the
+  previous and the new value are evaluated
+
+Contrary to the comparisons without index, the comparisons are only emitting
+when their result changed.
+
+>>> from broqer import Publisher, Sink
+>>> Publisher.index_comparisons = True
+>>> temperature = Publisher(20)
+>>> warnings = [temperature > k for k in range(25, 35)]
+>>> _d = warnings[0].subscribe(Sink(print, 'above 25:'))
+above 25: False
+>>> _d = warnings[5].subscribe(Sink(print, 'above 30:'))
+above 30: False
+>>> temperature.notify(28)
+above 25: True
+>>> temperature.notify(29)
+>>> temperature.notify(31)
+above 30: True
+>>> Publisher.index_comparisons = False
+"""
+from bisect import bisect_left, bisect_right
+import operator
+from typing import Any, Callable, Dict, List
+
+from broqer import Publisher, NONE
+from broqer.constant_index import ConstantIndex, IndexedMapConstant
+
+# comparisons with a result flipping for thresholds in [low, high)
+_RIGHT_FAMILY = (operator.gt, operator.le)
+
+# comparisons with a result flipping for thresholds in (low, high]
+_LEFT_FAMILY = (operator.ge, operator.lt)
+
+_EQUALITY = (operator.eq, operator.ne)
+
+
+def _is_number(value: Any) -> bool:
+    """ Check if the value can be used in the sorted index (NaN is not
+    ordered) """
+    # pylint: disable=comparison-with-itself
+    return isinstance(value, (int, float)) and value == value
+
+
+def _is_hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def is_indexable(value: Any, operation: Callable) -> bool:
+    """ Check if a comparison of a publisher with the given constant can be
+    indexed.
+
+    :param value: constant the publisher is compared with
+    :param operation: comparison function from the operator module
+    """
+    if operation in _EQUALITY:
+        return _is_hashable(value)
+
+    if operation in _RIGHT_FAMILY or operation in _LEFT_FAMILY:
+        return _is_number(value)
+
+    return False
+
+
+class _SortedThresholds:
+    """ Comparisons sorted by their threshold """
+    __slots__ = ('keys', 'comparisons')
+
+    def __init__(self) -> None:
+        self.keys = []  # type: List[Any]
+        self.comparisons = []  # type: List[IndexedMapConstant]
+
+    def add(self, comparison: IndexedMapConstant) -> None:
+        # pylint: disable=protected-access
+        index = bisect_right(self.keys, comparison._value)
+        self.keys.insert(index, comparison._value)
+        self.comparisons.insert(index, comparison)
+
+    def remove(self, comparison: IndexedMapConstant) -> None:
+        # pylint: disable=protected-access
+        start = bisect_left(self.keys, comparison._value)
+        stop = bisect_right(self.keys, comparison._value)
+
+        for index in range(start, stop):
+            if self.comparisons[index] is comparison:
+                del self.keys[index]
+                del self.comparisons[index]
+                return
+
+    def between(self, low: Any, high: Any, bisect: Callable
+                ) -> List[IndexedMapConstant]:
+        """ Return the comparisons with thresholds between low and high (the
+        bounds are depending on the bisect function) """
+        return self.comparisons[bisect(self.keys, low):
+                                bisect(self.keys, high)]
+
+
+class PredicateIndex(ConstantIndex):
+    """ Index subscribing a publisher on behalf of all its subscribed
+    ``IndexedComparison`` operators.
+
+    Use ``PredicateIndex.of(publisher)`` to get the index shared by all
+    comparisons of a publisher.
+
+    :param publisher: the publisher being compared
+    """
+    __slots__ = ('_right', '_left', '_equal')
+
+    def __init__(self, publisher: Publisher) -> None:
+        ConstantIndex.__init__(self, publisher)
+        self._right = _SortedThresholds()
+        self._left = _SortedThresholds()
+        self._equal = {}  # type: Dict[Any, List[IndexedMapConstant]]
+
+    def _insert(self, comparison: IndexedMapConstant) -> None:
+        # pylint: disable=protected-access
+        operation = comparison._operation
+
+        if operation in _EQUALITY:
+            self._equal.setdefault(comparison._value, []).append(comparison)
+        elif operation in _RIGHT_FAMILY:
+            self._right.add(comparison)
+        else:
+            self._left.add(comparison)
+
+    def _discard(self, comparison: IndexedMapConstant) -> None:
+        # pylint: disable=protected-access
+        operation = comparison._operation
+
+        if operation in _EQUALITY:
+            comparisons = self._equal[comparison._value]
+            comparisons[:] = [c for c in comparisons if c is not comparison]
+
+            if not comparisons:
+                del self._equal[comparison._value]
+        elif operation in _RIGHT_FAMILY:
+            self._right.remove(comparison)
+        else:
+            self._left.remove(comparison)
+
+    def _all(self) -> List[IndexedMapConstant]:
+        comparisons = self._right.comparisons + self._left.comparisons
+
+        for equal in self._equal.values():
+            comparisons.extend(equal)
+
+        return comparisons
+
+    def _candidates(self, previous: Any, value: Any
+                    ) -> List[IndexedMapConstant]:
+        if previous is NONE or \
+                not (_is_hashable(previous) and _is_hashable(value)):
+            return self._all()
+
+        candidates = []  # type: List[IndexedMapConstant]
+
+        if self._right.keys or self._left.keys:
+            if not (_is_number(previous) and _is_number(value)):
+                return self._all()
+
+            low, high = (previous, value) if previous < value else \
+                (value, previous)
+
+            candidates = self._right.between(low, high, bisect_left) + \
+                self._left.between(low, high, bisect_right)
+
+        for key in (previous, value):
+            candidates.extend(self._equal.get(key, ()))
+
+        return candidates
+
+
+class IndexedComparison(IndexedMapConstant):
+    """ Comparison of a publisher with a constant evaluated via the
+    ``PredicateIndex`` of the publisher. Only emitting when the result is
+    changing.
+
+    :param publisher: publisher to be compared
+    :param value: constant to compare with (see is_indexable)
+    :param operation: comparison function from the operator module
+    """
+    __slots__ = ()
+
+    _index_type = PredicateIndex
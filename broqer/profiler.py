@@ -0,0 +1,359 @@
+"""
+Profiler measuring the notifications in a running graph.
+
+While a profiler is attached, ``Publisher.notify`` and
+``Publisher.notify_many`` are wrapped to count the notifications of each
+publisher, and ``.emit`` and ``.emit_batch`` of the classes of the notified
+subscribers are wrapped to measure the time spent in each subscriber. Detaching
+the profiler restores the original methods, so profiling is not costing
+anything when it is not used.
+
+For each subscriber the total time (including the time spent in its
+subscribers) and the own time (excluding the time spent in subscribers
+notified by it) is measured. The own time is pointing to the slow operator:
+
+>>> import time
+>>> from broqer import Value, Sink, op
+>>> source = Value(0)
+>>> slow = source | op.Map(lambda v: time.sleep(0.01) or v)
+>>> fast = slow | op.Map(lambda v: v + 1)
+>>> _d = fast.subscribe(Sink())
+
+>>> with Profiler() as profiler:
+...     source.emit(1)
+>>> profiler.top(1)[0].reference() is slow
+True
+>>> profiler.publishers[id(source)].notifications
+1
+"""
+from functools import wraps
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, \
+    Set, Tuple, Type
+import weakref
+
+from broqer import Publisher, Subscriber
+from broqer.subscription_store import WeakSubscription
+
+_MISSING = object()
+
+
+def _no_reference() -> None:
+    """ Reference used for objects not supporting weak references """
+    return None
+
+
+def _reference(obj: Any) -> Callable[[], Any]:
+    """ Return a weak reference to the object (or _no_reference if the object
+    is not supporting weak references) """
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        return _no_reference
+
+
+def _belongs_to(reference: Callable[[], Any], obj: Any) -> bool:
+    """ Check if statistics with the reference are belonging to obj. Objects
+    not supporting weak references can only be identified by their id. """
+    return reference is _no_reference or reference() is obj
+
+
+class SubscriberStats:
+    """ Statistics for a subscriber
+
+    :ivar name: representation of the subscriber
+    :ivar reference: weak reference to the subscriber (returning None when
+        the subscriber is collected or not weak referenceable)
+    :ivar calls: number of calls of .emit() and .emit_batch()
+    :ivar total_time: time spent in this subscriber including the time spent
+        in the subscribers notified by it
+    :ivar own_time: time spent in this subscriber without the time spent in
+        the subscribers notified by it
+    :ivar max_time: maximum total time of a single call
+    :ivar exceptions: number of exceptions raised by the subscriber
+    """
+    __slots__ = ('name', 'reference', 'calls', 'total_time', 'own_time',
+                 'max_time', 'exceptions')
+
+    def __init__(self, subscriber: Subscriber) -> None:
+        self.name = repr(subscriber)
+        self.reference = _reference(subscriber)
+        self.calls = 0
+        self.total_time = 0.0
+        self.own_time = 0.0
+        self.max_time = 0.0
+        self.exceptions = 0
+
+    def __repr__(self) -> str:
+        return (f'<SubscriberStats {self.name} calls={self.calls} '
+                f'total={self.total_time:.6f}s own={self.own_time:.6f}s '
+                f'max={self.max_time:.6f}s exceptions={self.exceptions}>')
+
+
+class PublisherStats:
+    """ Statistics for a publisher
+
+    :ivar name: representation of the publisher
+    :ivar reference: weak reference to the publisher
+    :ivar notifications: number of calls of .notify() and .notify_many()
+    :ivar values: number of notified values
+    """
+    __slots__ = ('name', 'reference', 'notifications', 'values')
+
+    def __init__(self, publisher: Publisher) -> None:
+        self.name = repr(publisher)
+        self.reference = _reference(publisher)
+        self.notifications = 0
+        self.values = 0
+
+    def __repr__(self) -> str:
+        return (f'<PublisherStats {self.name} '
+                f'notifications={self.notifications} values={self.values}>')
+
+
+def _publisher_classes() -> Iterator[Type[Publisher]]:
+    """ Iterate over Publisher and all its subclasses """
+    classes = [Publisher]  # type: List[Type[Publisher]]
+
+    while classes:
+        cls = classes.pop()
+        yield cls
+        classes.extend(cls.__subclasses__())
+
+
+class Profiler:
+    """ Profiler collecting statistics for publishers and subscribers while
+    attached (via ``.attach()`` and ``.detach()`` or as context manager).
+    Only one profiler can be attached at a time.
+
+    Statistics are kept by the id of the publisher or subscriber.
+
+    :param clock: function returning the current time in seconds
+    :ivar publishers: dictionary with PublisherStats by id of the publisher
+    :ivar subscribers: dictionary with SubscriberStats by id of the subscriber
+    """
+    # currently attached profiler
+    _attached = None  # type: Optional[Profiler]
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter
+                 ) -> None:
+        self._clock = clock
+        self.publishers = {}  # type: Dict[int, PublisherStats]
+        self.subscribers = {}  # type: Dict[int, SubscriberStats]
+
+        # for each running subscriber call the time spent in the subscribers
+        # notified by it
+        self._stack = []  # type: List[float]
+        self._running = []  # type: List[Any]
+
+        # original functions replaced while attached
+        self._originals = {}  # type: Dict[str, Callable]
+
+        # subscriber classes with timed .emit and .emit_batch, the replaced
+        # class attributes and the original function of each timed function
+        self._instrumented = set()  # type: Set[type]
+        self._patched = []  # type: List[Tuple[type, str, Any]]
+        self._timed = {}  # type: Dict[Callable, Callable]
+
+    def attach(self) -> None:
+        """ Start profiling by replacing the notification methods
+
+        :raises ValueError: when a profiler is already attached
+        """
+        if Profiler._attached is not None:
+            raise ValueError('A profiler is already attached')
+
+        Profiler._attached = self
+
+        self._originals = {'notify': Publisher.notify,
+                           'notify_many': Publisher.notify_many}
+
+        instrumented = {'notify': self._build_notify(),
+                        'notify_many': self._build_notify_many()}
+
+        self._replace(self._originals, instrumented)
+
+    def detach(self) -> None:
+        """ Stop profiling and restore the notification methods """
+        if Profiler._attached is not self:
+            return
+
+        instrumented = {'notify': Publisher.notify,
+                        'notify_many': Publisher.notify_many
+                        }  # type: Dict[str, Callable]
+
+        self._replace(instrumented, self._originals)
+
+        for cls, name, previous in reversed(self._patched):
+            if previous is _MISSING:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, previous)
+
+        self._instrumented.clear()
+        self._patched.clear()
+        self._timed.clear()
+        Profiler._attached = None
+
+    @staticmethod
+    def _replace(current: Dict[str, Callable],
+                 replacement: Dict[str, Callable]) -> None:
+        # subclasses like Value are using ``notify = Publisher.notify``
+        for cls in _publisher_classes():
+            for name in ('notify', 'notify_many'):
+                if cls.__dict__.get(name, None) is current[name]:
+                    setattr(cls, name, replacement[name])
+
+    def __enter__(self) -> 'Profiler':
+        self.attach()
+        return self
+
+    def __exit__(self, _type, _value, _traceback) -> None:
+        self.detach()
+
+    def reset(self) -> None:
+        """ Clear the collected statistics """
+        self.publishers.clear()
+        self.subscribers.clear()
+
+    def top(self, count: int = 10, key: str = 'own_time'
+            ) -> List[SubscriberStats]:
+        """ Return the statistics of the subscribers with the highest values
+
+        :param count: number of subscribers to return
+        :param key: attribute of SubscriberStats used for sorting
+        """
+        return sorted(self.subscribers.values(),
+                      key=lambda stats: getattr(stats, key),
+                      reverse=True)[:count]
+
+    def _publisher_stats(self, publisher: Publisher) -> PublisherStats:
+        stats = self.publishers.get(id(publisher), None)
+
+        if stats is None or not _belongs_to(stats.reference, publisher):
+            stats = self.publishers[id(publisher)] = PublisherStats(publisher)
+
+        return stats
+
+    def _subscriber_stats(self, subscriber: Subscriber) -> SubscriberStats:
+        stats = self.subscribers.get(id(subscriber), None)
+
+        if stats is None or not _belongs_to(stats.reference, subscriber):
+            stats = self.subscribers[id(subscriber)] = \
+                SubscriberStats(subscriber)
+
+        return stats
+
+    def _call(self, subscriber: Any, function: Callable, value: Any,
+              who: Optional[Publisher]) -> Any:
+        """ Call function(subscriber, value, who=who) and measure the time """
+        running = self._running
+
+        if running and running[-1] is subscriber:
+            # e.g. .emit_batch calling .emit or .emit calling the base class
+            return function(subscriber, value, who=who)
+
+        stats = self._subscriber_stats(subscriber)
+        stack = self._stack
+        running.append(subscriber)
+        stack.append(0.0)
+        start = self._clock()
+
+        try:
+            return function(subscriber, value, who=who)
+        except Exception:
+            stats.exceptions += 1
+            raise
+        finally:
+            elapsed = self._clock() - start
+            stats.calls += 1
+            stats.total_time += elapsed
+            stats.own_time += elapsed - stack.pop()
+            stats.max_time = max(stats.max_time, elapsed)
+            running.pop()
+
+            if stack:
+                stack[-1] += elapsed
+
+    def _time(self, function: Callable) -> Callable:
+        """ Return a timed version of the .emit or .emit_batch function """
+        function = self._timed.get(function, function)  # already timed
+
+        def timed(subscriber: Any, value: Any,
+                  who: Optional[Publisher] = None) -> Any:
+            return self._call(subscriber, function, value, who)
+
+        self._timed[timed] = function
+        return timed
+
+    def _instrument(self, publisher: Publisher) -> None:
+        """ Time .emit and .emit_batch of the classes of all subscribers """
+        # pylint: disable=protected-access
+        for subscriber in publisher._subscriptions.get_snapshot():
+            if isinstance(subscriber, WeakSubscription):
+                # the weak subscription is forwarding to the subscriber
+                subscriber = subscriber.subscriber
+
+            cls = type(subscriber)
+
+            if cls in self._instrumented:
+                continue
+
+            self._instrumented.add(cls)
+            emit = getattr(cls, 'emit', None)
+
+            if emit is None:
+                continue
+
+            # subscribers without .emit_batch are timed once for a batch
+            functions = (('emit', emit),
+                         ('emit_batch', getattr(cls, 'emit_batch',
+                                                _emit_values)))
+
+            for name, function in functions:
+                previous = cls.__dict__.get(name, _MISSING)
+
+                try:
+                    setattr(cls, name, self._time(function))
+                except (AttributeError, TypeError):
+                    break  # e.g. builtin types
+
+                self._patched.append((cls, name, previous))
+
+    def _build_notify(self) -> Callable:
+        original = self._originals['notify']
+
+        @wraps(original)
+        def notify(publisher: Publisher, value: Any) -> None:
+            stats = self._publisher_stats(publisher)
+            stats.notifications += 1
+            stats.values += 1
+
+            self._instrument(publisher)
+            original(publisher, value)
+
+        return notify
+
+    def _build_notify_many(self) -> Callable:
+        original = self._originals['notify_many']
+
+        @wraps(original)
+        def notify_many(publisher: Publisher, values: Sequence[Any]) -> None:
+            if values:
+                stats = self._publisher_stats(publisher)
+                stats.notifications += 1
+                stats.values += len(values)
+
+                self._instrument(publisher)
+
+            original(publisher, values)
+
+        return notify_many
+
+
+def _emit_values(subscriber: Any, values: Sequence[Any],
+                 who: Optional[Publisher] = None) -> None:
+    """ .emit_batch for subscribers without it, emitting the values one by
+    one """
+    for value in values:
+        subscriber.emit(value, who=who)
@@ -0,0 +1,150 @@
+"""
+Index for projections of one publisher on many keys or attributes.
+
+Projections like ``d[key]`` or ``p.attribute`` on a publisher are built as one
+operator for each projection and each emit of the publisher is notifying all
+of them. When ``Publisher.index_projections`` is True, projections with a
+constant key (``d['a']``) and attribute accesses (``p.a``) built by operator
+overloading are registered in an index shared by all projections of the same
+publisher. An emit is only notifying the projections with a changed result:
+
+>>> from broqer import Publisher, Sink
+>>> Publisher.index_projections = True
+>>> state = Publisher({'a': 1, 'b': 2})
+>>> _d = state['a'].subscribe(Sink(print, 'a:'))
+a: 1
+>>> _d = state['b'].subscribe(Sink(print, 'b:'))
+b: 2
+>>> state.notify({'a': 1, 'b': 3})
+b: 3
+
+For large containers the keys changed by an emit can be given as hint, so only
+the projections on these keys are evaluated:
+
+>>> notify_changes(state, {'a': 5, 'b': 3}, ['a'])
+a: 5
+>>> Publisher.index_projections = False
+"""
+import operator
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from broqer import Publisher, NONE
+from broqer.constant_index import ConstantIndex, IndexedMapConstant
+from broqer.operator_overloading import _GetAttr
+
+_KeyT = Tuple[Callable, Any]
+
+
+def is_indexable(key: Any) -> bool:
+    """ Check if a projection with the given key can be indexed.
+
+    :param key: key (or attribute name) of the projection
+    """
+    try:
+        hash(key)
+    except TypeError:
+        return False
+    return True
+
+
+class ProjectionIndex(ConstantIndex):
+    """ Index subscribing a publisher on behalf of all its subscribed
+    ``IndexedProjection`` operators.
+
+    Use ``ProjectionIndex.of(publisher)`` to get the index shared by all
+    projections of a publisher.
+
+    :param publisher: the publisher being projected
+    """
+    __slots__ = ('_projections', '_hint')
+
+    def __init__(self, publisher: Publisher) -> None:
+        ConstantIndex.__init__(self, publisher)
+        self._projections = \
+            {}  # type: Dict[_KeyT, List[IndexedMapConstant]]
+        self._hint = None  # type: Optional[Iterable[Any]]
+
+    def _insert(self, projection: IndexedMapConstant) -> None:
+        # pylint: disable=protected-access
+        key = (projection._operation, projection._value)
+        self._projections.setdefault(key, []).append(projection)
+
+    def _discard(self, projection: IndexedMapConstant) -> None:
+        # pylint: disable=protected-access
+        key = (projection._operation, projection._value)
+        projections = self._projections[key]
+        projections[:] = [p for p in projections if p is not projection]
+
+        if not projections:
+            del self._projections[key]
+
+    def _all(self) -> List[IndexedMapConstant]:
+        projections = []  # type: List[IndexedMapConstant]
+
+        for group in self._projections.values():
+            projections.extend(group)
+
+        return projections
+
+    def _candidates(self, previous: Any, value: Any
+                    ) -> List[IndexedMapConstant]:
+        if self._hint is None or previous is NONE:
+            return self._all()
+
+        candidates = []  # type: List[IndexedMapConstant]
+
+        for key in self._hint:
+            for operation in (operator.getitem, getattr):
+                candidates.extend(self._projections.get((operation, key), ()))
+
+        return candidates
+
+
+def notify_changes(publisher: Publisher, value: Any,
+                   keys: Iterable[Any]) -> None:
+    """ Notify the value on the publisher with a hint about the changed keys
+    (or attribute names). Indexed projections on other keys are not evaluated,
+    so the caller has to make sure that only the given keys changed.
+
+    Without a projection index (or with an active propagation engine) this is
+    the same as ``publisher.notify(value)``.
+
+    :param publisher: publisher to notify
+    :param value: the new value (e.g. a container)
+    :param keys: keys or attribute names changed compared to the last value
+    """
+    # pylint: disable=protected-access
+    index = ProjectionIndex._indices.get(id(publisher), None)
+
+    if index is None or Publisher._propagation is not None:
+        publisher.notify(value)
+        return
+
+    index._hint = keys
+
+    try:
+        publisher.notify(value)
+    finally:
+        index._hint = None
+
+
+class IndexedProjection(IndexedMapConstant):
+    """ Projection of a publisher on a key (``operator.getitem``) or an
+    attribute (``getattr``) evaluated via the ``ProjectionIndex`` of the
+    publisher. Only emitting when the result is changing.
+
+    :param publisher: publisher to be projected
+    :param value: key or attribute name
+    :param operation: ``operator.getitem`` or ``getattr``
+    """
+    __slots__ = ()
+
+    _index_type = ProjectionIndex
+
+    def __call__(self, *args, **kwargs):
+        # calling an attribute is building the call on a new operator, as
+        # the indexed attribute may be shared
+        if self._operation is not getattr:
+            raise TypeError('Projection is not callable')
+
+        return _GetAttr(self._originator, self._value)(*args, **kwargs)
@@ -0,0 +1,364 @@
+"""
+TopologicalPropagation is an optional propagation engine. When enabled,
+``Publisher.notify`` is not calling the subscribers directly. Instead the
+notifications are queued and delivered ordered by the rank of the publishers
+(their height in the dependency graph). Operators with multiple sources (like
+``CombineLatest``) are evaluated once per propagation after all their sources
+are updated. This avoids glitches (inconsistent intermediate values) in
+diamond shaped graphs.
+
+Without propagation engine ``c`` is evaluated twice, the first time with an
+inconsistent state:
+
+>>> from broqer import Value, Sink
+>>> x = Value(1)
+>>> a = x + 1
+>>> b = x * 2
+>>> c = a + b
+>>> _d = c.subscribe(Sink(print))
+4
+>>> x.emit(2)
+5
+7
+
+With enabled propagation engine every node is evaluated once:
+
+>>> with TopologicalPropagation():
+...     x.emit(3)
+10
+
+The engine is processing the notifications in a loop, so the depth of the call
+stack is independent of the depth of the pipeline.
+
+Use ``batch()`` to update multiple publishers at once. Notifications are
+deferred until the batch is left, then every changed publisher is propagated
+once with its final state:
+
+>>> y = Value(0)
+>>> d = c + y
+>>> _d = d.subscribe(Sink(print, 'd:'))
+d: 10
+>>> with batch():
+...     x.emit(4)
+...     y.emit(1)
+...     x.emit(5)
+16
+d: 17
+"""
+from contextlib import contextmanager
+from heapq import heappush, heappop
+from itertools import count
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Set, Tuple
+
+from broqer import Publisher, default_error_handler
+from broqer.publisher import next_version
+from broqer.subscription_store import WeakSubscription
+
+if TYPE_CHECKING:
+    # pylint: disable=cyclic-import
+    from broqer import Subscriber
+
+
+# kind of queued entries
+_NOTIFY = 0  # deliver value to subscribers of the publisher
+_NOTIFY_MANY = 1  # deliver a batch of values to subscribers of the publisher
+_EVALUATE = 2  # evaluate a multi source operator
+
+
+class TopologicalPropagation:
+    """ Propagation engine delivering notifications in topological order.
+
+    Publishers are ranked by their dependencies (see
+    ``Publisher.add_dependencies``): a publisher has a higher rank than all the
+    publishers it depends on. When a subscription is delivering a value to a
+    publisher with a lower or equal rank (e.g. a ``Value`` subscribed directly
+    to another publisher) the rank of the subscriber and of the publishers
+    downstream of it is raised, so already this propagation is in order.
+
+    Operators with multiple sources are implementing ``._collect(value, who)``
+    and ``._evaluate()``. The engine is collecting all values for such an
+    operator and evaluates it once, after all publishers with a lower rank are
+    processed.
+
+    The engine can be used as context manager, enabling it while the context
+    is active.
+
+    Transactions are started via ``.begin()`` and finished via ``.commit()``
+    or ``.rollback()`` (see ``batch()``). While a transaction is active,
+    notifications are not delivered. The state of a notified publisher is
+    updated immediately, the publisher is marked as dirty. When the outermost
+    transaction is committed, all dirty publishers are propagated once with
+    their final state. A rollback is restoring the state of all publishers
+    notified in this transaction and drops their notifications.
+    """
+    def __init__(self) -> None:
+        # heap with entries (rank, sequence number, publisher, value, kind)
+        self._queue = []  # type: List[Tuple[int, int, Any, Any, int]]
+        self._sequence = count()
+        self._scheduled = set()  # type: Set[int]
+        self._running = False
+
+        # publishers notified during transactions (id -> (publisher, value))
+        self._dirty = {}  # type: Dict[int, Tuple[Publisher, Any]]
+
+        # for each active transaction the publishers notified the first time
+        # in this transaction (id -> (publisher, previous state, was dirty))
+        self._transactions = \
+            []  # type: List[Dict[int, Tuple[Publisher, Any, bool]]]
+
+    def enable(self) -> None:
+        """ Use this engine for the propagation of all publishers
+
+        :raises ValueError: when a propagation engine is already enabled
+        """
+        if Publisher._propagation is not None:
+            raise ValueError('A propagation engine is already enabled')
+
+        Publisher._propagation = self
+
+    def disable(self) -> None:
+        """ Return to direct dispatching of notifications """
+        if Publisher._propagation is self:
+            Publisher._propagation = None
+
+    def __enter__(self) -> 'TopologicalPropagation':
+        self.enable()
+        return self
+
+    def __exit__(self, _type, _value, _traceback) -> None:
+        self.disable()
+
+    def schedule(self, publisher: Publisher, value: Any,
+                 batch: bool = False) -> None:
+        """ Queue the notification of a publisher. The queue is processed
+        when no propagation is running at the moment.
+
+        :param publisher: notifying publisher
+        :param value: value (or sequence of values when batch is True)
+        :param batch: True if called by Publisher.notify_many
+        """
+        if self._transactions:
+            key = id(publisher)
+            saved = self._transactions[-1]
+
+            if key not in saved:
+                saved[key] = (publisher, publisher._state, key in self._dirty)
+
+            if batch:
+                value = value[-1]
+
+            publisher._state = value
+            self._dirty[key] = (publisher, value)
+            return
+
+        publisher._state = value[-1] if batch else value
+
+        heappush(self._queue, (publisher._rank, next(self._sequence),
+                               publisher, value,
+                               _NOTIFY_MANY if batch else _NOTIFY))
+
+        if not self._running:
+            self._run()
+
+    def begin(self) -> None:
+        """ Start a (nested) transaction """
+        self._transactions.append({})
+
+    def commit(self) -> None:
+        """ Finish the innermost transaction. When it is the outermost
+        transaction all dirty publishers are propagated.
+        """
+        saved = self._transactions.pop()
+
+        if self._transactions:
+            # keep the states before the inner transaction for a rollback of
+            # the outer transaction
+            outer = self._transactions[-1]
+            for key, entry in saved.items():
+                outer.setdefault(key, entry)
+            return
+
+        for publisher, value in self._dirty.values():
+            heappush(self._queue, (publisher._rank, next(self._sequence),
+                                   publisher, value, _NOTIFY))
+
+        self._dirty.clear()
+
+        if not self._running:
+            self._run()
+
+    def rollback(self) -> None:
+        """ Finish the innermost transaction and restore the states of all
+        publishers notified in this transaction.
+        """
+        saved = self._transactions.pop()
+
+        for key, (publisher, state, was_dirty) in saved.items():
+            publisher._state = state
+            publisher._version = next_version()
+
+            if was_dirty:
+                self._dirty[key] = (publisher, state)
+            else:
+                del self._dirty[key]
+
+    def _run(self) -> None:
+        """ Process the queue until it is empty """
+        self._running = True
+
+        try:
+            while self._queue:
+                rank, sequence, publisher, value, kind = \
+                    heappop(self._queue)
+
+                if rank < publisher._rank:
+                    # the rank was raised after queueing (see _raise_rank)
+                    heappush(self._queue, (publisher._rank, sequence,
+                                           publisher, value, kind))
+                    continue
+
+                if kind == _EVALUATE:
+                    self._scheduled.discard(id(publisher))
+                    try:
+                        publisher._evaluate()
+                    except Exception:  # pylint: disable=broad-except
+                        default_error_handler(*sys.exc_info())
+                    continue
+
+                for subscriber in publisher._subscriptions.get_snapshot():
+                    try:
+                        self._deliver(publisher, subscriber, value, kind)
+                    except Exception:  # pylint: disable=broad-except
+                        default_error_handler(*sys.exc_info())
+        except BaseException:
+            # drop the propagation when the error handler is raising
+            self._queue.clear()
+            self._scheduled.clear()
+            raise
+        finally:
+            self._running = False
+
+    def _deliver(self, publisher: Publisher, subscriber: 'Subscriber',
+                 value: Any, kind: int) -> None:
+        if isinstance(subscriber, WeakSubscription):
+            subscriber = subscriber.subscriber
+
+            if subscriber is None:
+                return
+
+        rank = getattr(subscriber, '_rank', None)
+
+        if rank is not None and rank <= publisher._rank:
+            # subscribing publisher was not ranked by its dependencies
+            _raise_rank(subscriber, publisher._rank + 1)  # type: ignore
+            rank = subscriber._rank  # type: ignore
+
+        collect = getattr(type(subscriber), '_collect', None)
+
+        if collect is None:
+            _emit(publisher, subscriber, value, kind)
+            return
+
+        if kind == _NOTIFY:
+            evaluate = collect(subscriber, value, publisher)
+        else:
+            evaluate = False
+            for _value in value:
+                evaluate = collect(subscriber, _value, publisher) or evaluate
+
+        if evaluate and id(subscriber) not in self._scheduled:
+            self._scheduled.add(id(subscriber))
+            heappush(self._queue, (rank, next(self._sequence),
+                                   subscriber, None, _EVALUATE))
+
+
+def _raise_rank(publisher: Publisher, rank: int) -> None:
+    """ Raise the rank of the publisher to the given rank and the ranks of
+    the publishers subscribed downstream, so every subscribed publisher is
+    ranked higher than its source. Cycles are not followed. """
+    if publisher._rank >= rank:
+        return
+
+    publisher._rank = rank
+    on_path = {id(publisher)}
+    stack = [(publisher, _subscribed_publishers(publisher))]
+
+    while stack:
+        node, successors = stack[-1]
+
+        for successor in successors:
+            if successor._rank <= node._rank and \
+                    id(successor) not in on_path:
+                successor._rank = node._rank + 1
+                on_path.add(id(successor))
+                stack.append((successor, _subscribed_publishers(successor)))
+                break
+        else:
+            stack.pop()
+            on_path.discard(id(node))
+
+
+def _subscribed_publishers(publisher: Publisher) -> Iterator[Publisher]:
+    """ Iterate over the subscribers of the publisher being publishers """
+    for subscriber in publisher._subscriptions.get_snapshot():
+        if isinstance(subscriber, WeakSubscription):
+            subscriber = subscriber.subscriber
+
+        if isinstance(subscriber, Publisher):
+            yield subscriber
+
+
+def _emit(publisher: Publisher, subscriber: 'Subscriber', value: Any,
+          kind: int) -> None:
+    """ Emit the value (or batch of values) to a single source subscriber """
+    if kind == _NOTIFY:
+        subscriber.emit(value, who=publisher)
+        return
+
+    emit_batch = getattr(subscriber, 'emit_batch', None)
+    if emit_batch is None:
+        for _value in value:
+            subscriber.emit(_value, who=publisher)
+    else:
+        emit_batch(value, who=publisher)
+
+
+@contextmanager
+def batch(rollback: bool = True) -> Iterator[None]:
+    """ Context manager deferring all notifications until the context is left.
+    Each publisher notified in this context is propagated once with its final
+    state (see TopologicalPropagation). When no propagation engine is enabled
+    a TopologicalPropagation is used temporarily.
+
+    Batches can be nested. Only leaving the outermost batch is propagating
+    the changes.
+
+    :param rollback: when an exception is raised inside the context, the
+        states of the publishers notified in this context are restored and
+        their notifications are dropped. If rollback is False the changes are
+        kept like on a regular exit of the context.
+    """
+    engine = Publisher._propagation
+    temporary = engine is None
+
+    if engine is None:
+        engine = TopologicalPropagation()
+        engine.enable()
+
+    try:
+        engine.begin()
+
+        try:
+            yield
+        except BaseException:
+            if rollback:
+                engine.rollback()
+            else:
+                engine.commit()
+            raise
+
+        engine.commit()
+    finally:
+        if temporary:
+            engine.disable()
@@ -1,16 +1,17 @@
 """ Implementing Publisher """
 import sys
 from typing import (TYPE_CHECKING, TypeVar, Type, Tuple, Callable, Optional,
-                    overload)
+                    Sequence, overload)
 
 from broqer import NONE, Disposable, default_error_handler
+from broqer.subscription_store import SubscriptionStore, WeakSubscription
 import broqer
 
 if TYPE_CHECKING:
     # pylint: disable=cyclic-import
-    from typing import List
     from broqer import Subscriber
     from broqer.operator import Operator
+    from broqer.propagation import TopologicalPropagation
 
 
 class SubscriptionError(ValueError):
@@ -22,6 +23,18 @@ class SubscriptionError(ValueError):
 ValueT = TypeVar('ValueT')  # Type of publisher state and emitted value
 SubscriptionCBT = Callable[[bool], None]
 
+# global counter of state changes. The version of a publisher is the value of
+# this counter at its last change, so an unchanged counter is proving that no
+# publisher changed (see .version and broqer.operator.memoized_get)
+CHANGES = [0]
+
+
+def next_version() -> int:
+    """ Increment the global counter of state changes and return it as version
+    for the changed publisher """
+    CHANGES[0] += 1
+    return CHANGES[0]
+
 
 class Publisher:
     """ In broqer a subscriber can subscribe to a publisher. After subscription
@@ -43,17 +56,56 @@ class Publisher:
     When implementing a Publisher use the following methods:
 
     - ``.notify(value)`` calls .emit(value) on all subscribers
+    - ``.notify_many(values)`` calls .emit_batch(values) on all subscribers
 
     :param init: the initial state.
 
     :ivar _state: state of the publisher
     :ivar _inherited_type: type class for method lookup
-    :ivar _subscriptions: holding a list of subscribers
+    :ivar _subscriptions: SubscriptionStore holding the subscribers
     :ivar _on_subscription_cb: callback with boolean as argument, telling
                                 if at least one subscription exists
     :ivar _dependencies: list with publishers this publisher is (directly or
                          indirectly) dependent on.
+    :ivar _rank: height of this publisher in the dependency graph (used by
+                 TopologicalPropagation)
+    :ivar _version: value of the global change counter at the last change
+                    of the state (see ``.version``)
+
+    Publisher and the operators shipped with broqer are using ``__slots__`` to
+    keep the memory footprint of large graphs small. Instances still support
+    setting arbitrary attributes (e.g. replacing ``.get`` by a mock), but the
+    ``__dict__`` is only allocated on the first assignment of such an
+    attribute.
     """
+    __slots__ = ('_state', '_inherited_type', '_subscriptions',
+                 '_on_subscription_cb', '_dependencies', '_rank',
+                 '_version', '__weakref__', '__dict__')
+
+    # propagation engine used by .notify() - None for direct dispatching (see
+    # broqer.propagation.TopologicalPropagation)
+    _propagation = None  # type: Optional[TopologicalPropagation]
+
+    # when True, operators without subscriptions are memoizing the result of
+    # .get() as long as the version of their sources is unchanged (see
+    # broqer.operator.memoized_get)
+    memoize_get = False
+
+    # when True, operator overloading is returning the existing publisher for
+    # the same operation on the same operands (as long as it is alive) instead
+    # of building a new one (see broqer.operator_overloading.intern)
+    intern_expressions = False
+
+    # when True, comparisons of a publisher with constants built by operator
+    # overloading are evaluated via a shared index, only emitting on changed
+    # results (see broqer.predicate_index)
+    index_comparisons = False
+
+    # when True, projections on constant keys and attributes built by
+    # operator overloading are evaluated via a shared index, only emitting on
+    # changed results (see broqer.projection_index)
+    index_projections = False
+
     @overload  # noqa: F811
     def __init__(self, *, type_: Type[ValueT] = None):
         pass
@@ -72,12 +124,14 @@ class Publisher:
         else:
             self._inherited_type = None
 
-        self._subscriptions = []  # type: List[Subscriber]
+        self._subscriptions = SubscriptionStore()
         self._on_subscription_cb = None  # type: Optional[SubscriptionCBT]
         self._dependencies = ()  # type: Tuple[Publisher, ...]
+        self._rank = 0
+        self._version = 0
 
-    def subscribe(self, subscriber: 'Subscriber',
-                  prepend: bool = False) -> 'SubscriptionDisposable':
+    def subscribe(self, subscriber: 'Subscriber', prepend: bool = False,
+                  weak: bool = False) -> 'SubscriptionDisposable':
         """ Subscribing the given subscriber.
 
         :param subscriber: subscriber to add
@@ -85,24 +139,28 @@ class Publisher:
             added at the end of a list. When prepend is True, it will be added
             in front of the list. This will habe an effect in the order the
             subscribers are called.
+        :param weak: when True the subscriber is only referenced weakly and
+            gets unsubscribed automatically when it is garbage collected. The
+            returned disposable is not keeping the subscriber alive.
         :raises SubscriptionError: if subscriber already subscribed
         """
 
-        # `subscriber in self._subscriptions` is not working because
-        # tuple.__contains__ is using __eq__ which is overwritten and returns
-        # a new publisher - not helpful here
-        if any(subscriber is s for s in self._subscriptions):
+        # SubscriptionStore is comparing subscribers by identity, because
+        # __eq__ is overwritten for publishers and returns a new publisher
+        if subscriber in self._subscriptions:
             raise SubscriptionError('Subscriber already registered')
 
         if not self._subscriptions and self._on_subscription_cb:
             self._on_subscription_cb(True)
 
-        if prepend:
-            self._subscriptions.insert(0, subscriber)
+        if weak:
+            entry = WeakSubscription(subscriber, self)  # type: Subscriber
         else:
-            self._subscriptions.append(subscriber)
+            entry = subscriber
+
+        self._subscriptions.add(entry, prepend)
 
-        disposable_obj = SubscriptionDisposable(self, subscriber)
+        disposable_obj = SubscriptionDisposable(self, entry)
 
         if self._state is not NONE:
             subscriber.emit(self._state, who=self)
@@ -112,48 +170,98 @@ class Publisher:
     def unsubscribe(self, subscriber: 'Subscriber') -> None:
         """ Unsubscribe the given subscriber
 
-        :param subscriber: subscriber to unsubscribe
+        :param subscriber: subscriber to unsubscribe (also a weakly subscribed
+            subscriber can be unsubscribed directly)
         :raises SubscriptionError: if subscriber is not subscribed (anymore)
         """
-        # here is a special implementation which is replacing the more
-        # obvious one: self._subscriptions.remove(subscriber) - this will not
-        # work because list.remove(x) is doing comparison for equality.
-        # Applied to publishers this will return another publisher instead of
-        # a boolean result
-        for i, _s in enumerate(self._subscriptions):
-            if _s is subscriber:
-                self._subscriptions.pop(i)
+        if not self._subscriptions.remove(subscriber):
+            raise SubscriptionError('Subscriber is not registered')
 
-                if not self._subscriptions and self._on_subscription_cb:
-                    self._on_subscription_cb(False)
-
-                return
-
-        raise SubscriptionError('Subscriber is not registered')
+        if not self._subscriptions and self._on_subscription_cb:
+            self._on_subscription_cb(False)
 
     def get(self) -> ValueT:
         """ Return the state of the publisher. """
         return self._state
 
+    @property
+    def version(self) -> int:
+        """ Version of the state. The version is increasing whenever the
+        state of this publisher (or of a publisher it is derived from) may have
+        changed. Publishers changing the result of .get() without .notify()
+        have to set ``self._version = next_version()`` on each change to use
+        memoization (see memoize_get).
+        """
+        return self._version
+
     def notify(self, value: ValueT) -> None:
         """ Calling .emit(value) on all subscribers and store state.
 
         :param value: value to be emitted to subscribers
         """
+        CHANGES[0] = self._version = CHANGES[0] + 1
+
+        if self._propagation is not None:
+            # the propagation engine is taking care of the state
+            self._propagation.schedule(self, value)
+            return
+
         self._state = value
-        for subscriber in tuple(self._subscriptions):
+
+        subscribers = self._subscriptions.snapshot
+        if subscribers is None:
+            subscribers = self._subscriptions.get_snapshot()
+
+        for subscriber in subscribers:
             try:
                 subscriber.emit(value, who=self)
             except Exception:  # pylint: disable=broad-except
                 default_error_handler(*sys.exc_info())
 
+    def notify_many(self, values: Sequence[ValueT]) -> None:
+        """ Notify a batch of values. Each subscriber is receiving the whole
+        batch via .emit_batch(values) (subscribers not implementing
+        .emit_batch get .emit(value) called for each value). The state will
+        be the last value of the batch.
+
+        Compared to calling .notify(value) for each value, the order of calls
+        differs: the first subscriber is processing all values before the next
+        subscriber is receiving the batch.
+
+        :param values: sequence of values to be emitted to subscribers
+        """
+        if not values:
+            return
+
+        CHANGES[0] = self._version = CHANGES[0] + 1
+
+        if self._propagation is not None:
+            # the propagation engine is taking care of the state
+            self._propagation.schedule(self, values, batch=True)
+            return
+
+        self._state = values[-1]
+
+        for subscriber in self._subscriptions.get_snapshot():
+            try:
+                emit_batch = getattr(subscriber, 'emit_batch', None)
+                if emit_batch is None:
+                    for value in values:
+                        subscriber.emit(value, who=self)
+                else:
+                    emit_batch(values, who=self)
+            except Exception:  # pylint: disable=broad-except
+                default_error_handler(*sys.exc_info())
+
     def reset_state(self) -> None:
         """ Resets the state. Calling this method will not trigger a
         notification, but will call .reset_state for all subscribers
 
         """
         self._state = NONE
-        for subscriber in tuple(self._subscriptions):
+        self._version = next_version()
+
+        for subscriber in self._subscriptions.get_snapshot():
             try:
                 subscriber.reset_state()
             except Exception:  # pylint: disable=broad-except
@@ -161,8 +269,15 @@ class Publisher:
 
     @property
     def subscriptions(self) -> Tuple['Subscriber', ...]:
-        """ Property returning a tuple with all current subscribers """
-        return tuple(self._subscriptions)
+        """ Property returning a tuple with all current subscribers. Weakly
+        subscribed subscribers are included as the subscriber itself. """
+        snapshot = self._subscriptions.get_snapshot()
+
+        if not any(isinstance(s, WeakSubscription) for s in snapshot):
+            return snapshot
+
+        return tuple(s.subscriber if isinstance(s, WeakSubscription) else s
+                     for s in snapshot)
 
     def register_on_subscription_callback(self,
                                           callback: SubscriptionCBT) -> None:
@@ -246,6 +361,10 @@ class Publisher:
         """
         self._dependencies = self._dependencies + publishers
 
+        for publisher in publishers:
+            if publisher._rank >= self._rank:
+                self._rank = publisher._rank + 1
+
     def __or__(self, operator: 'Operator'):
         operator.originator = self
         return operator
@@ -263,6 +382,8 @@ class SubscriptionDisposable(Disposable):
         :param publisher: publisher the subscription is made to
         :param subscriber: subscriber used for subscription
     """
+    __slots__ = ('_publisher', '_subscriber')
+
     def __init__(self, publisher: 'Publisher', subscriber: 'Subscriber') \
             -> None:
         self._publisher = publisher
@@ -278,5 +399,8 @@ class SubscriptionDisposable(Disposable):
 
     @property
     def subscriber(self) -> 'Subscriber':
-        """ Subscriber used in this subscription """
+        """ Subscriber used in this subscription (None when a weakly subscribed
+        subscriber was collected) """
+        if isinstance(self._subscriber, WeakSubscription):
+            return self._subscriber.subscriber
         return self._subscriber
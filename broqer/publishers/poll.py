@@ -1,9 +1,11 @@
 """ Implementing PollPublisher """
 import asyncio
-from typing import Callable, Type, Any, Optional
+from typing import Callable, Type, Any, Optional, Union
 
-from broqer.publisher import Publisher, ValueT, SubscriptionDisposable
+from broqer.publisher import Publisher, ValueT, SubscriptionDisposable, \
+    next_version
 from broqer.subscriber import Subscriber
+from broqer.timer import Timer, TimerWheel
 
 
 class PollPublisher(Publisher):
@@ -13,24 +15,34 @@ class PollPublisher(Publisher):
 
     :param poll_cb: Function to be called
     :param interval: Time in seconds between polling calls
+    :param wheel: optional TimerWheel used to schedule the polling calls
     """
+    __slots__ = ('poll_cb', 'interval', '_poll_handler', '_wheel')
+
     def __init__(self, poll_cb: Callable[[], Any], interval: float, *,
-                 type_: Type[ValueT] = None):
+                 type_: Type[ValueT] = None,
+                 wheel: Optional[TimerWheel] = None):
         Publisher.__init__(self, type_=type_)
         self.poll_cb = poll_cb
         self.interval = interval
-        self._poll_handler = None  # type: Optional[asyncio.TimerHandle]
+        self._poll_handler = \
+            None  # type: Optional[Union[asyncio.TimerHandle, Timer]]
+        self._wheel = wheel
 
-    def subscribe(self, subscriber: Subscriber,
-                  prepend: bool = False) -> SubscriptionDisposable:
+    def subscribe(self, subscriber: Subscriber, prepend: bool = False,
+                  weak: bool = False) -> SubscriptionDisposable:
         if not self._subscriptions:
             # call poll_cb once to set internal state and schedule a _poll call
             self._state = self.poll_cb()
-            loop = asyncio.get_running_loop()
+            self._version = next_version()
             assert self._poll_handler is None, '_poll_handler already assigned'
-            self._poll_handler = loop.call_later(self.interval, self._poll)
 
-        return Publisher.subscribe(self, subscriber, prepend)
+            if self._wheel is not None:
+                self._poll_handler = Timer(self._poll, wheel=self._wheel)
+
+            self._schedule_poll()
+
+        return Publisher.subscribe(self, subscriber, prepend, weak)
 
     def unsubscribe(self, subscriber: 'Subscriber') -> None:
         Publisher.unsubscribe(self, subscriber)
@@ -46,8 +58,18 @@ class PollPublisher(Publisher):
         value = self.poll_cb()
         Publisher.notify(self, value)
 
-        loop = asyncio.get_running_loop()
-        self._poll_handler = loop.call_later(self.interval, self._poll)
+        if self._poll_handler is not None:  # a subscriber may unsubscribe
+            self._schedule_poll()
+
+    def _schedule_poll(self):
+        if self._wheel is None:
+            loop = asyncio.get_running_loop()
+            self._poll_handler = loop.call_later(self.interval, self._poll)
+        else:
+            # an interval of 0 is scheduled to the next tick (Timer.start
+            # would call the callback immediately)
+            assert isinstance(self._poll_handler, Timer)
+            self._wheel.start(self._poll_handler, self.interval)
 
     def notify(self, value: ValueT) -> None:
         """ PollPublisher does not support .notify calls """
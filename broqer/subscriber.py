@@ -1,5 +1,5 @@
 """ Implementing the Subscriber class """
-from typing import Any, TYPE_CHECKING
+from typing import Any, Sequence, TYPE_CHECKING
 
 if TYPE_CHECKING:
     # pylint: disable=cyclic-import
@@ -9,7 +9,12 @@ if TYPE_CHECKING:
 class Subscriber():  # pylint: disable=too-few-public-methods
     """ A Subscriber is listening to changes of a publisher. As soon as the
     publisher is emitting a value .emit(value) will be called.
+
+    Like publishers, subscribers are using ``__slots__`` but still support
+    setting arbitrary attributes. The ``__dict__`` is only allocated on the
+    first assignment of such an attribute.
     """
+    __slots__ = ('__dict__',)
 
     def emit(self, value: Any, who: 'Publisher') -> None:
         """ Send new value to the subscriber
@@ -18,6 +23,21 @@ class Subscriber():  # pylint: disable=too-few-public-methods
         """
         raise NotImplementedError('.emit not implemented')
 
+    def emit_batch(self, values: Sequence[Any], who: 'Publisher') -> None:
+        """ Send a batch of values to the subscriber. This is called by
+        publisher.notify_many(values). The default implementation is calling
+        .emit(value) for each value. Subscribers can overwrite it to process
+        the batch at once.
+
+        An exception raised while processing the batch is aborting the
+        processing of the remaining values of this batch.
+
+        :param values: sequence of values to be send
+        :param who: reference to which publisher is emitting
+        """
+        for value in values:
+            self.emit(value, who=who)
+
     def reset_state(self) -> None:
         """ Will be called by assigned publisher, when publisher was called
         to reset its state
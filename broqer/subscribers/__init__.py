@@ -1,12 +1,31 @@
 """ Module containing Subscribers """
-from ..coro_queue import MaxQueueException
-from .on_emit_future import OnEmitFuture
+from typing import TYPE_CHECKING
+
+from ..lazy_import import lazy_import
 from .sink import Sink, build_sink, build_sink_factory, sink_property
-from .sink_async import SinkAsync, build_sink_async, \
-                        build_sink_async_factory, sink_async_property
-from .trace import Trace
+
+# subscribers depending on asyncio (or less often used) are loaded on first
+# access
+__getattr__, __dir__ = lazy_import(__name__, {
+    'MaxQueueException': 'broqer.coro_queue',
+    'OnEmitFuture': '.on_emit_future',
+    'SinkAsync': '.sink_async',
+    'build_sink_async': '.sink_async',
+    'build_sink_async_factory': '.sink_async',
+    'sink_async_property': '.sink_async',
+    'Trace': '.trace',
+    'TraceBuffer': '.trace',
+})
+
+if TYPE_CHECKING:
+    from ..coro_queue import MaxQueueException
+    from .on_emit_future import OnEmitFuture
+    from .sink_async import SinkAsync, build_sink_async, \
+                            build_sink_async_factory, sink_async_property
+    from .trace import Trace, TraceBuffer
 
 __all__ = ['OnEmitFuture', 'Sink', 'build_sink',
            'build_sink_factory', 'sink_property', 'SinkAsync',
            'build_sink_async', 'build_sink_async_factory',
-           'sink_async_property', 'Trace', 'MaxQueueException']
+           'sink_async_property', 'Trace', 'TraceBuffer',
+           'MaxQueueException']
@@ -1,20 +1,23 @@
 """
 Build a future able to await for
 
-Usage:
+Usage (on virtual time, so the timeout is not delaying the example):
 
 >>> import asyncio
->>> from broqer import Value, op, OnEmitFuture
->>> s = Value()
-
->>> _ = asyncio.get_running_loop().call_later(0.05, s.emit, 1)
-
->>> asyncio.get_running_loop().run_until_complete(OnEmitFuture(s) )
+>>> from broqer import Value, OnEmitFuture
+>>> from broqer.virtual_time import run
+>>> async def main():
+...     loop = asyncio.get_running_loop()
+...     s = Value()
+...     _ = loop.call_later(0.05, s.emit, 1)
+...     print(await OnEmitFuture(s))
+...     try:
+...         await OnEmitFuture(s, timeout=10, omit_subscription=True)
+...     except asyncio.TimeoutError:
+...         print(f'timeout at {loop.time():.2f}s')
+>>> run(main())
 1
-
-#>>> _ = asyncio.get_running_loop().call_later(0.05, s.emit, (1, 2))
-#>>> asyncio.get_running_loop().run_until_complete(s)
-(1, 2)
+timeout at 10.05s
 """
 import asyncio
 from typing import Any, Optional, TYPE_CHECKING
@@ -23,7 +23,7 @@ Sink:(1, 2)
 0
 """
 from functools import partial, wraps
-from typing import Any, Callable, Optional, TYPE_CHECKING
+from typing import Any, Callable, Optional, Sequence, TYPE_CHECKING
 
 from broqer import Subscriber
 
@@ -42,6 +42,8 @@ class Sink(Subscriber):  # pylint: disable=too-few-public-methods
     :param unpack: value from emits will be unpacked (\\*value)
     :param \\*\\*kwargs: keyword arguments to be used for calling function
     """
+    __slots__ = ('_function', '_unpack', '__weakref__')
+
     def __init__(self,  # pylint: disable=keyword-arg-before-vararg
                  function: Optional[Callable[..., None]] = None,
                  *args, unpack=False, **kwargs) -> None:
@@ -62,6 +64,19 @@ class Sink(Subscriber):  # pylint: disable=too-few-public-methods
             else:
                 self._function(value)
 
+    def emit_batch(self, values: Sequence[Any], who: 'Publisher'):
+        function = self._function
+
+        if function is None:
+            return
+
+        if self._unpack:
+            for value in values:
+                function(*value)
+        else:
+            for value in values:
+                function(value)
+
 
 def build_sink(function: Callable[..., None] = None, *,
                unpack: bool = False):
@@ -2,10 +2,13 @@
 Apply ``coro(*args, value, **kwargs)`` to each emitted value allowing async
 processing.
 
-Usage:
+Usage (on virtual time, see broqer.virtual_time):
 
 >>> import asyncio
 >>> from broqer import Value, op
+>>> from broqer.virtual_time import VirtualTimeLoop
+>>> loop = VirtualTimeLoop()
+>>> asyncio.set_event_loop(loop)
 >>> s = Value()
 
 >>> async def delay_add(a):
@@ -20,12 +23,14 @@ MODE: CONCURRENT (is default)
 >>> _d = s.subscribe(SinkAsync(delay_add))
 >>> s.emit(0)
 >>> s.emit(1)
->>> asyncio.run(asyncio.sleep(0.02))
+>>> loop.run_until_complete(asyncio.sleep(0.02))
 Starting with argument 0
 Starting with argument 1
 Finished with argument 0
 Finished with argument 1
 >>> _d.dispose()
+>>> asyncio.set_event_loop(None)
+>>> loop.close()
 """
 
 import asyncio
@@ -51,6 +56,8 @@ class SinkAsync(Subscriber):  # pylint: disable=too-few-public-methods
                                 used with AsyncMode.QUEUE
     :param \\*\\*kwargs: keyword arguments to be used for calling coro
     """
+    __slots__ = ('_coro_queue', '_error_callback', '__weakref__')
+
     def __init__(self, coro, *args, mode=AsyncMode.CONCURRENT,
                  error_callback=default_error_handler,
                  unpack: bool = False,
@@ -62,6 +69,11 @@ class SinkAsync(Subscriber):  # pylint: disable=too-few-public-methods
         )
         self._error_callback = error_callback
 
+    @property
+    def backlog(self) -> int:
+        """ Number of values being processed or waiting to be processed """
+        return len(self._coro_queue)
+
     def emit(self, value: Any, who: Publisher):
         future = self._coro_queue.schedule(value)
         future.add_done_callback(self._done)
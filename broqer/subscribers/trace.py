@@ -1,6 +1,13 @@
 """ Implements Trace subscriber """
-from time import time
-from typing import TYPE_CHECKING, Any, Callable, Optional
+from itertools import chain
+import json
+import struct
+from time import monotonic_ns, time
+from typing import TYPE_CHECKING, IO, Any, Callable, Dict, Iterable, \
+    Iterator, List, Optional, Tuple
+
+from broqer.error_handler import default_error_handler
+from broqer.subscriber import Subscriber
 
 from .sink import Sink
 
@@ -19,6 +26,8 @@ class Trace(Sink):
     :param label: string to be used on output
     :param \\*\\*kwargs: keyword arguments used when calling callback
     """
+    __slots__ = ('_label',)
+
     def __init__(self,  # pylint: disable=keyword-arg-before-vararg
                  function: Optional[Callable[..., None]] = None,
                  *args, unpack=False, label=None, **kwargs) -> None:
@@ -29,11 +38,32 @@ class Trace(Sink):
         self._trace_handler(who, value, label=self._label)
         Sink.emit(self, value, who=who)
 
+    # trace every single value of a batch
+    emit_batch = Subscriber.emit_batch
+
     @classmethod
     def set_handler(cls, handler):
-        """ Setting the handler for tracing information """
+        """ Setting the handler for tracing information (e.g. a TraceBuffer).
+        Callable objects are called with the publisher, the value and the
+        label (as keyword argument). Plain functions are bound to the Trace
+        instance, which is passed as additional first argument (see
+        set_function_handler).
+        """
         cls._trace_handler = handler
 
+    @classmethod
+    def set_function_handler(cls, handler):
+        """ Setting a plain function as handler for tracing information. It is
+        called with the publisher, the value and the label (as keyword
+        argument) like a callable object.
+        """
+        cls._trace_handler = staticmethod(handler)
+
+    @classmethod
+    def reset_handler(cls):
+        """ Restore the default handler printing the emitted values """
+        cls._trace_handler = staticmethod(Trace._print_trace)
+
     _timestamp_start = time()
 
     @staticmethod
@@ -46,3 +76,195 @@ class Trace(Sink):
         line += repr(publisher) if label is None else label
         line += f' {value!r}'
         print(line)
+
+    # default handler (to be restored by reset_handler)
+    _print_trace = _trace_handler
+
+
+# record of the binary dump: timestamp in ns, publisher id, length of value
+_RECORD = struct.Struct('<QQI')
+_MAGIC = b'BRQT\x01'
+
+
+class TraceBuffer:
+    """ Trace handler keeping the latest traced emits in a preallocated ring
+    buffer. Recording is only storing the timestamp (``time.monotonic_ns()``),
+    the id of the publisher and the value (or a summary of it), so tracing
+    can stay enabled on paths with high emit rates. The buffer can be dumped
+    to a JSONL or binary file on demand or on error.
+
+    >>> buffer = TraceBuffer(size=2)
+    >>> Trace.set_handler(buffer)
+    >>> from broqer import Publisher
+    >>> publisher = Publisher()
+    >>> _d = publisher.subscribe(Trace(label='p'))
+    >>> for value in range(3):
+    ...     publisher.notify(value)
+    >>> [value for _, _, value in buffer.entries()]
+    [1, 2]
+    >>> Trace.reset_handler()
+
+    Stored values are referenced until they are overwritten. Use ``summary``
+    to store e.g. ``type`` or a truncated representation instead.
+
+    :param size: number of entries kept in the buffer
+    :param sample: only record every n-th emit (1 to record all emits)
+    :param summary: optional function applied to the value before storing it
+    """
+    __slots__ = ('_size', '_sample', '_skip', '_summary', '_timestamps',
+                 '_ids', '_values', '_labels', '_index', '_count',
+                 '_error_callback')
+
+    def __init__(self, size: int = 65536, sample: int = 1,
+                 summary: Optional[Callable[[Any], Any]] = None) -> None:
+        if size < 1 or sample < 1:
+            raise ValueError('size and sample have to be positive')
+
+        self._size = size
+        self._sample = sample
+        self._skip = 1
+        self._summary = summary
+        self._timestamps = [0] * size
+        self._ids = [0] * size
+        self._values = [None] * size  # type: List[Any]
+
+        # labels of traced publishers by id
+        self._labels = {}  # type: Dict[int, str]
+
+        self._index = 0
+        self._count = 0
+        self._error_callback = None  # type: Optional[Callable]
+
+    def __call__(self, publisher: 'Publisher', value: Any,
+                 label: Optional[str] = None) -> None:
+        self._skip -= 1
+
+        if self._skip:
+            return
+
+        self._skip = self._sample
+        index = self._index
+
+        self._timestamps[index] = monotonic_ns()
+        self._ids[index] = id(publisher)
+        self._values[index] = value if self._summary is None \
+            else self._summary(value)
+
+        if label is not None:
+            self._labels[id(publisher)] = label
+
+        self._index = index + 1 if index + 1 < self._size else 0
+        self._count += 1
+
+    def __len__(self) -> int:
+        return min(self._count, self._size)
+
+    @property
+    def recorded(self) -> int:
+        """ Number of recorded emits (including overwritten ones) """
+        return self._count
+
+    def clear(self) -> None:
+        """ Remove all entries """
+        self._values = [None] * self._size
+        self._index = 0
+        self._count = 0
+        self._skip = 1
+
+    def entries(self) -> List[Tuple[int, int, Any]]:
+        """ Return the entries (timestamp in ns, publisher id, value) from
+        oldest to newest """
+        if self._count <= self._size:
+            indices = range(self._count)  # type: Iterable[int]
+        else:
+            indices = chain(range(self._index, self._size),
+                            range(self._index))
+
+        return [(self._timestamps[i], self._ids[i], self._values[i])
+                for i in indices]
+
+    def label(self, publisher_id: int) -> Optional[str]:
+        """ Return the label used for the publisher with the given id """
+        return self._labels.get(publisher_id, None)
+
+    def dump_jsonl(self, file: IO[str]) -> None:
+        """ Write one JSON object per entry with the keys ``timestamp``,
+        ``publisher``, ``label`` and ``value`` (as repr string)
+
+        :param file: text file opened for writing
+        """
+        for timestamp, publisher_id, value in self.entries():
+            file.write(json.dumps({'timestamp': timestamp,
+                                   'publisher': publisher_id,
+                                   'label': self.label(publisher_id),
+                                   'value': repr(value)}) + '\n')
+
+    def dump_binary(self, file: IO[bytes]) -> None:
+        """ Write the entries in a compact binary format: a header followed
+        by records with timestamp, publisher id and the UTF-8 encoded repr of
+        the value (see load_binary)
+
+        :param file: binary file opened for writing
+        """
+        file.write(_MAGIC)
+
+        for timestamp, publisher_id, value in self.entries():
+            data = repr(value).encode('utf-8')
+            file.write(_RECORD.pack(timestamp, publisher_id, len(data)))
+            file.write(data)
+
+    def dump(self, path: str, binary: bool = False) -> None:
+        """ Dump the entries to a file (see dump_jsonl and dump_binary)
+
+        :param path: path of the file to be written
+        :param binary: use the binary format instead of JSONL
+        """
+        if binary:
+            with open(path, 'wb') as binary_file:
+                self.dump_binary(binary_file)
+        else:
+            with open(path, 'w', encoding='utf-8') as text_file:
+                self.dump_jsonl(text_file)
+
+    def dump_on_error(self, path: str, binary: bool = False) -> None:
+        """ Register a callback on the default error handler dumping the
+        entries to the given file before calling the previous callback.
+
+        :param path: path of the file to be written on error
+        :param binary: use the binary format instead of JSONL
+        """
+        # pylint: disable=protected-access
+        previous = default_error_handler._error_callback
+
+        def _callback(*exc_info):
+            self.dump(path, binary)
+            previous(*exc_info)
+
+        self._error_callback = previous
+        default_error_handler.set(_callback)
+
+    def remove_dump_on_error(self) -> None:
+        """ Restore the error callback replaced by dump_on_error """
+        if self._error_callback is not None:
+            default_error_handler.set(self._error_callback)
+            self._error_callback = None
+
+
+def load_binary(file: IO[bytes]) -> Iterator[Tuple[int, int, str]]:
+    """ Read entries (timestamp in ns, publisher id, repr of the value) from
+    a file written by TraceBuffer.dump_binary
+
+    :param file: binary file opened for reading
+    :raises ValueError: if the file is not a trace dump
+    """
+    if file.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError('Not a trace dump')
+
+    while True:
+        header = file.read(_RECORD.size)
+
+        if not header:
+            return
+
+        timestamp, publisher_id, length = _RECORD.unpack(header)
+        yield timestamp, publisher_id, file.read(length).decode('utf-8')
@@ -0,0 +1,233 @@
+""" Implementing SubscriptionStore used by Publisher to keep its subscribers
+and WeakSubscription used for weak subscriptions
+"""
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional, Sequence, \
+    Tuple
+import weakref
+
+from broqer.subscriber import Subscriber
+
+if TYPE_CHECKING:
+    # pylint: disable=cyclic-import
+    from broqer import Publisher
+
+
+class WeakSubscription(Subscriber):
+    """ Subscriber forwarding all calls to a weakly referenced subscriber.
+    It is created by ``publisher.subscribe(subscriber, weak=True)``. When the
+    subscriber is garbage collected, it gets unsubscribed from the publisher.
+
+    The callback of the weak reference is only referencing the publisher and
+    this object weakly, so no reference cycle is created.
+
+    :param subscriber: subscriber to be referenced weakly
+    :param publisher: publisher the subscription is made to
+
+    :ivar key: identity of the referenced subscriber (used by
+               SubscriptionStore)
+    """
+    __slots__ = ('_reference', 'key', '__weakref__')
+
+    def __init__(self, subscriber: Subscriber, publisher: 'Publisher') \
+            -> None:
+        publisher_reference = weakref.ref(publisher)
+        self_reference = weakref.ref(self)
+
+        def _collected(_reference):
+            publisher = publisher_reference()
+            subscription = self_reference()
+
+            if publisher is not None and subscription is not None and \
+                    subscription in publisher._subscriptions:
+                publisher.unsubscribe(subscription)
+
+        self._reference = weakref.ref(subscriber, _collected)
+        self.key = id(subscriber)
+
+    @property
+    def subscriber(self) -> Optional[Subscriber]:
+        """ The referenced subscriber or None when it was collected """
+        return self._reference()
+
+    def emit(self, value: Any, who: 'Publisher') -> None:
+        subscriber = self._reference()
+
+        if subscriber is not None:
+            subscriber.emit(value, who=who)
+
+    def emit_batch(self, values: Sequence[Any], who: 'Publisher') -> None:
+        subscriber = self._reference()
+
+        if subscriber is None:
+            return
+
+        emit_batch = getattr(subscriber, 'emit_batch', None)
+        if emit_batch is None:
+            for value in values:
+                subscriber.emit(value, who=who)
+        else:
+            emit_batch(values, who=who)
+
+    def reset_state(self) -> None:
+        subscriber = self._reference()
+
+        if subscriber is not None:
+            subscriber.reset_state()
+
+
+def _key(subscriber: Subscriber) -> int:
+    """ Identity used to store the subscriber. A weak subscription is stored
+    with the identity of the referenced subscriber, so it can be found by the
+    subscriber itself. """
+    if isinstance(subscriber, WeakSubscription):
+        return subscriber.key
+    return id(subscriber)
+
+
+def _matches(entry: Subscriber, subscriber: Subscriber) -> bool:
+    """ Check if the stored entry is the given subscriber (or a weak
+    subscription of it) """
+    return entry is subscriber or (isinstance(entry, WeakSubscription)
+                                   and entry.key == id(subscriber))
+
+
+class SubscriptionStore:
+    """ Ordered container of subscribers, using the identity of subscribers
+    for lookups.
+
+    Subscribers (especially publishers) are not compared with ``==``, because
+    ``__eq__`` is overloaded for publishers and returns a new publisher instead
+    of a boolean. Therefore ``id(subscriber)`` is used as key. A
+    WeakSubscription is stored with the identity of the referenced subscriber,
+    so the membership test, ``.remove()`` and ``.find()`` are accepting the
+    subscriber as well as its WeakSubscription.
+
+    Most publishers have only a few subscribers. Up to ``THRESHOLD``
+    subscribers are kept in a tuple, which is the cheapest representation
+    regarding memory. Above that, the subscribers are stored in two
+    dictionaries keyed by identity: ``_back`` for appended subscribers and
+    ``_front`` for prepended subscribers (in reversed order). This keeps adding
+    (also prepending), removing and the membership test O(1) for publishers
+    with a high fan-out.
+
+    ``.snapshot`` is an immutable tuple of all subscribers used for
+    dispatching. It is only rebuilt after the subscribers changed, so
+    notifying subscribers is not allocating a new container on each call.
+    Changing the subscriptions while iterating over a snapshot is safe.
+
+    :ivar snapshot: tuple of all subscribers or None when the dictionary based
+                    representation was changed (use ``.get_snapshot()`` to
+                    rebuild it)
+    :ivar _front: dictionary with prepended subscribers (in reversed order)
+                  or None when the tuple representation is used
+    :ivar _back: dictionary with appended subscribers or None when the tuple
+                 representation is used
+    """
+    __slots__ = ('snapshot', '_front', '_back')
+
+    THRESHOLD = 32
+
+    def __init__(self) -> None:
+        self.snapshot = ()  # type: Optional[Tuple[Subscriber, ...]]
+        self._front = None  # type: Optional[Dict[int, Subscriber]]
+        self._back = None  # type: Optional[Dict[int, Subscriber]]
+
+    def __len__(self) -> int:
+        if self._back is None:
+            return len(self.snapshot)
+
+        return len(self._front) + len(self._back)
+
+    def __contains__(self, subscriber: 'Subscriber') -> bool:
+        return self.find(subscriber) is not None
+
+    def __iter__(self) -> Iterator['Subscriber']:
+        return iter(self.get_snapshot())
+
+    def find(self, subscriber: 'Subscriber') -> Optional['Subscriber']:
+        """ Return the stored entry for the subscriber (the subscriber itself
+        or its WeakSubscription) or None if it is not stored """
+        if self._back is None:
+            for entry in self.snapshot:
+                if _matches(entry, subscriber):
+                    return entry
+            return None
+
+        key = _key(subscriber)
+
+        for entries in (self._back, self._front):
+            entry = entries.get(key, None)
+            if entry is not None and _matches(entry, subscriber):
+                return entry
+
+        return None
+
+    def get_snapshot(self) -> Tuple['Subscriber', ...]:
+        """ Return the snapshot, rebuild it if necessary """
+        snapshot = self.snapshot
+
+        if snapshot is None:
+            snapshot = self.snapshot = \
+                tuple(reversed(self._front.values())) + \
+                tuple(self._back.values())
+
+        return snapshot
+
+    def add(self, subscriber: 'Subscriber', prepend: bool = False) -> None:
+        """ Add the subscriber at the end (or in front when prepend is set).
+        The caller has to take care that the subscriber is not already added.
+        """
+        if self._back is None:
+            subscribers = self.snapshot
+
+            if len(subscribers) < self.THRESHOLD:
+                if prepend:
+                    self.snapshot = (subscriber,) + subscribers
+                else:
+                    self.snapshot = subscribers + (subscriber,)
+                return
+
+            # switch to dictionary based representation
+            self._front = {}
+            self._back = {_key(s): s for s in subscribers}
+
+        self.snapshot = None
+
+        if prepend:
+            self._front[_key(subscriber)] = subscriber
+        else:
+            self._back[_key(subscriber)] = subscriber
+
+    def remove(self, subscriber: 'Subscriber') -> bool:
+        """ Remove the subscriber.
+
+        :returns: False if the subscriber was not found, otherwise True
+        """
+        if self._back is None:
+            subscribers = self.snapshot
+
+            for index, _s in enumerate(subscribers):
+                if _matches(_s, subscriber):
+                    self.snapshot = \
+                        subscribers[:index] + subscribers[index + 1:]
+                    return True
+            return False
+
+        key = _key(subscriber)
+
+        for entries in (self._back, self._front):
+            entry = entries.get(key, None)
+            if entry is not None and _matches(entry, subscriber):
+                del entries[key]
+                break
+        else:
+            return False
+
+        if not self._back and not self._front:
+            # switch back to the tuple based representation
+            self.snapshot = ()
+            self._front = self._back = None
+        else:
+            self.snapshot = None
+
+        return True
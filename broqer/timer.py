@@ -1,6 +1,233 @@
-""" Asynchronous timer object """
+""" Asynchronous timer object and a timer wheel driving many timers
+
+By default each running ``Timer`` is using its own handle of the event loop
+(via ``loop.call_later``). With many timers (e.g. thousands of ``Throttle``
+operators) the timer heap of the event loop and the allocation of the handles
+on each (re-)start are getting expensive. A ``TimerWheel`` is driving all its
+timers by a single callback of the event loop per tick. Starting and
+cancelling a timer on a wheel is O(1) and is not allocating any objects, while
+the timeouts are rounded up to the resolution of the wheel (on virtual time,
+see broqer.virtual_time):
+
+>>> from broqer.virtual_time import run
+>>> async def main():
+...     loop = asyncio.get_running_loop()
+...     wheel = TimerWheel(resolution=0.01)
+...     timer = Timer(lambda: print('done at', loop.time()), wheel=wheel)
+...     timer.start(0.02)
+...     await asyncio.sleep(0.05)
+>>> run(main())
+done at 0.02
+"""
 import asyncio
-from typing import Callable, Optional
+import math
+from typing import Any, Callable, List, Optional
+import weakref
+
+# Timers of the event loop may expire slightly before the requested time (by
+# the clock resolution of the loop or by rounding). The TimerWheel and
+# operators comparing their deadlines with loop.time() are regarding a deadline
+# within this tolerance as reached, instead of waiting a tiny remaining time.
+TOLERANCE = 1e-6
+
+
+class _SlotHead:
+    """ Sentinel of the circular doubly linked list of timers in a slot """
+    __slots__ = ('_previous', '_next')
+
+    def __init__(self) -> None:
+        self._previous = self  # type: Any
+        self._next = self  # type: Any
+
+
+class TimerWheel:
+    """ Hashed timer wheel driving the timers started on it by a single
+    callback of the event loop. Timers are linked into the slot of their
+    deadline tick, so starting and cancelling a timer is O(1) without
+    allocation. The loop callback is only scheduled while timers are running
+    and is skipping ticks without a timer: it is scheduled for the next
+    occupied slot, where the slots passed since the last callback are checked
+    for expired timers.
+
+    :param resolution: duration of a tick in seconds. Timeouts are rounded up
+        to full ticks
+    :param slots: number of slots. Timeouts longer than ``slots`` ticks are
+        staying in their slot for multiple turns of the wheel
+    :param loop: optional asyncio event loop (default is the running loop
+        when the first timer is started)
+    """
+    __slots__ = ('_resolution', '_slots', '_loop', '_origin', '_tick',
+                 '_handle', '_scheduled', '_count')
+
+    def __init__(self, resolution: float = 0.01, slots: int = 512,
+                 loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        if resolution <= 0:
+            raise ValueError('Resolution has to be bigger than zero')
+
+        if slots < 1:
+            raise ValueError('At least one slot is needed')
+
+        self._resolution = resolution
+        self._slots = [_SlotHead() for _ in range(slots)]
+        self._loop = loop
+        self._origin = 0.0  # loop time of tick 0
+        self._tick = 0  # last processed tick
+        self._handle = None  # type: Optional[asyncio.TimerHandle]
+        self._scheduled = 0  # tick of the scheduled loop callback
+        self._count = 0  # number of linked timers
+
+    @property
+    def resolution(self) -> float:
+        """ Duration of a tick in seconds """
+        return self._resolution
+
+    def __len__(self) -> int:
+        """ Number of running timers """
+        return self._count
+
+    def _current_tick(self) -> int:
+        assert self._loop is not None
+        elapsed = self._loop.time() - self._origin + TOLERANCE
+        return int(elapsed / self._resolution)
+
+    def start(self, timer: 'Timer', timeout: float) -> None:
+        """ Start (or restart) the timer to expire after ``timeout`` seconds
+        (rounded up to the next tick)
+
+        :param timer: the timer to be started
+        :param timeout: time in seconds
+        """
+        # pylint: disable=protected-access
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._origin = self._loop.time()
+
+        if timer._next is not None:
+            self._unlink(timer)
+
+        if self._handle is None:
+            # the wheel was idle, so no timer is missed by skipping ticks
+            self._tick = self._current_tick()
+
+        deadline = math.ceil(
+            (self._loop.time() + timeout - self._origin) / self._resolution)
+        deadline = max(deadline, self._tick + 1)
+        timer._deadline = deadline
+
+        if self._handle is None:
+            self._schedule(deadline)
+        elif deadline < self._scheduled:
+            self._handle.cancel()
+            self._schedule(deadline)
+
+        head = self._slots[deadline % len(self._slots)]
+        last = head._previous
+        timer._previous = last
+        timer._next = head
+        last._next = timer
+        head._previous = timer
+        self._count += 1
+
+    def cancel(self, timer: 'Timer') -> None:
+        """ Cancel the timer. Cancelling a timer not running is ignored.
+
+        :param timer: the timer to be cancelled
+        """
+        # pylint: disable=protected-access
+        if timer._next is not None:
+            self._unlink(timer)
+
+            if not self._count and self._handle is not None:
+                # stop ticking when the last timer is cancelled
+                self._handle.cancel()
+                self._handle = None
+
+        timer._deadline = None
+
+    def _unlink(self, timer: 'Timer') -> None:
+        # pylint: disable=protected-access
+        timer._previous._next = timer._next
+        timer._next._previous = timer._previous
+        timer._previous = timer._next = None
+        self._count -= 1
+
+    def _schedule(self, tick: int) -> None:
+        assert self._loop is not None
+        self._scheduled = tick
+        self._handle = self._loop.call_at(
+            self._origin + tick * self._resolution, self._on_tick)
+
+    def _next_occupied(self) -> int:
+        """ Return the next tick with a timer linked into its slot (the timer
+        may expire in a later turn of the wheel) """
+        # pylint: disable=protected-access
+        slots = self._slots
+
+        for tick in range(self._tick + 1, self._tick + len(slots)):
+            head = slots[tick % len(slots)]
+
+            if head._next is not head:
+                return tick
+
+        return self._tick + len(slots)
+
+    def _on_tick(self) -> None:
+        """ Trigger the timers expired since the last tick """
+        # pylint: disable=protected-access
+        # the loop may call back slightly before the scheduled time
+        now = max(self._current_tick(), self._tick + 1)
+        slots = self._slots
+
+        # callbacks starting timers on the idle wheel are scheduling again
+        self._handle = None
+
+        if now - self._tick >= len(slots):
+            heads = slots  # a full turn has passed
+        else:
+            heads = [slots[tick % len(slots)]
+                     for tick in range(self._tick + 1, now + 1)]
+
+        self._tick = now
+
+        # expired timers are unlinked first, as the callbacks may start or
+        # cancel other timers
+        expired = []  # type: List[Timer]
+
+        for head in heads:
+            timer = head._next
+
+            while timer is not head:
+                following = timer._next
+
+                if timer._deadline <= now:
+                    self._unlink(timer)
+                    expired.append(timer)
+
+                timer = following
+
+        for timer in expired:
+            # skip timers cancelled or restarted by a previous callback
+            if timer._next is not None or timer._deadline is None:
+                continue
+
+            timer._deadline = None
+
+            try:
+                timer._trigger()
+            except Exception as exc:  # pylint: disable=broad-except
+                assert self._loop is not None
+                self._loop.call_exception_handler({
+                    'message': 'Exception in timer callback',
+                    'exception': exc,
+                })
+
+        if self._handle is not None:
+            self._handle.cancel()
+
+        if self._count:
+            self._schedule(self._next_occupied())
+        else:
+            self._handle = None
 
 
 class Timer:
@@ -11,13 +238,29 @@ class Timer:
                      `timeout` has passed after calling `.start()` or when
                      calling `.end_early()`
     :param loop: optional asyncio event loop
+    :param wheel: optional TimerWheel used instead of a handle of the event
+                  loop for each start
     """
+    __slots__ = ('_callback', '_handle', '_loop', '_args', '_wheel',
+                 '_previous', '_next', '_deadline')
+
     def __init__(self, callback: Optional[Callable[[], None]] = None,
-                 loop: Optional[asyncio.BaseEventLoop] = None):
+                 loop: Optional[asyncio.AbstractEventLoop] = None,
+                 wheel: Optional[TimerWheel] = None):
         self._callback = callback
         self._handle = None  # type: Optional[asyncio.Handle]
-        self._loop = loop or asyncio.get_running_loop()
-        self._args = None
+        self._args = ()  # type: Any
+        self._wheel = wheel
+
+        if wheel is None:
+            loop = loop or asyncio.get_running_loop()
+
+        self._loop = loop
+
+        # links and deadline tick used by the TimerWheel
+        self._previous = None  # type: Any
+        self._next = None  # type: Any
+        self._deadline = None  # type: Optional[int]
 
     def start(self, timeout: float, args=()) -> None:
         """ start the timer with given timeout. Optional arguments for the
@@ -27,11 +270,19 @@ class Timer:
         :param timeout: time in seconds to the end of the timer
         :param args: optional tuple with arguments for the callback
         """
+        self._args = args
+
+        if self._wheel is not None:
+            if timeout > 0:
+                self._wheel.start(self, timeout)
+            else:
+                self._wheel.cancel(self)
+                self._trigger()
+            return
+
         if self._handle:
             self._handle.cancel()
 
-        self._args = args
-
         if timeout > 0:
             self._handle = self._loop.call_later(timeout, self._trigger)
         else:
@@ -46,6 +297,8 @@ class Timer:
 
     def cancel(self) -> None:
         """ Cancel the timer. An optional callback will not be called. """
+        if self._wheel is not None:
+            self._wheel.cancel(self)
 
         if self._handle:
             self._handle.cancel()
@@ -53,18 +306,36 @@ class Timer:
 
     def end_early(self) -> None:
         """ immediate stopping the timer and call optional callback """
-        self._handle = None
-        if self._handle and self._callback:
-            self._callback(*self._args)
+        if self.is_running():
+            self.cancel()
+            self._trigger()
 
     def is_running(self) -> bool:
         """ tells if the timer is currently running
         :returns: boolean, True when timer is running
         """
-        return self._handle is not None
+        return self._handle is not None or self._deadline is not None
 
     def _trigger(self):
         """ internal method called when timer is finished """
         self._handle = None
         if self._callback:
             self._callback(*self._args)
+
+
+def weak_callback(method: Callable) -> Callable:
+    """ Return a timer callback calling the bound method while its object is
+    alive. Using the bound method directly would create a reference cycle
+    between an operator and its timer.
+
+    :param method: bound method to be called
+    """
+    reference = weakref.WeakMethod(method)
+
+    def _callback(*args):
+        _method = reference()
+
+        if _method is not None:
+            _method(*args)
+
+    return _callback
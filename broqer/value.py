@@ -1,6 +1,7 @@
 """ Implementing Value """
 
-from typing import Any
+from typing import Any, Sequence
+import weakref
 
 # pylint: disable=cyclic-import
 from broqer import Publisher, NONE
@@ -19,6 +20,8 @@ class Value(Operator):
     >>> s.emit(1)
     1
     """
+    __slots__ = ()
+
     def __init__(self, init=NONE):
         Operator.__init__(self)
         self._state = init
@@ -30,7 +33,15 @@ class Value(Operator):
 
         return Publisher.notify(self, value)
 
+    def emit_batch(self, values: Sequence[Any],
+                   who: Publisher = None) -> None:
+        if self._originator is not None and self._originator is not who:
+            raise ValueError('Emit from non assigned publisher')
+
+        return Publisher.notify_many(self, values)
+
     notify = Publisher.notify
+    notify_many = Publisher.notify_many
 
 
 def dependent_subscribe(publisher: Publisher, value: Value):
@@ -39,10 +50,19 @@ def dependent_subscribe(publisher: Publisher, value: Value):
     :param publisher: publisher to be subscribed, when value is subscribed
     :param value: value, which will receive .emit calls from `publisher`
     """
+    # the callback is stored in value, so value is referenced weakly to avoid
+    # a reference cycle
+    value_reference = weakref.ref(value)
+
     def _on_subscription(existing_subscription: bool):
+        _value = value_reference()
+
+        if _value is None:
+            return
+
         if existing_subscription:
-            publisher.subscribe(value)
+            publisher.subscribe(_value)
         else:
-            publisher.unsubscribe(value)
+            publisher.unsubscribe(_value)
 
     value.register_on_subscription_callback(_on_subscription)
@@ -0,0 +1,170 @@
+""" Event loop running on virtual time
+
+All time based parts of broqer (``Timer``, ``TimerWheel``, ``Throttle``,
+``Debounce``, ``Sample``, ``Delay``, ``RateLimit``, ``PollPublisher`` and the
+timeout of ``OnEmitFuture``) are using the clock and the timers of the asyncio
+event loop. The ``VirtualTimeLoop`` is not waiting for its timers: when no
+callback is ready, the clock jumps to the next scheduled timer. Hours of
+simulated time are running in milliseconds and the order of callbacks is
+deterministic and reproducible (the clock is starting at 0):
+
+>>> from broqer import Value, op, Sink
+>>> from broqer.publishers import PollPublisher
+>>> async def main():
+...     loop = asyncio.get_running_loop()
+...     count = iter(range(10**6))
+...     telemetry = PollPublisher(lambda: next(count), 1)  # poll every second
+...     values = []
+...     _d = (telemetry | op.Throttle(60)).subscribe(Sink(values.append))
+...     await asyncio.sleep(24 * 3600)  # one day
+...     return loop.time(), len(values)
+>>> run(main())
+(86400.0, 1441)
+
+``VirtualTimeLoop`` can be used as ``loop_factory`` of ``asyncio.Runner``
+(Python 3.11+). To run the asyncio based tests of a project on virtual time
+with pytest-asyncio, the ``EventLoopPolicy`` can be used in ``conftest.py``::
+
+    @pytest.fixture
+    def event_loop_policy():
+        return broqer.virtual_time.EventLoopPolicy()
+
+The asyncio policy system is deprecated since Python 3.14, so
+``EventLoopPolicy`` is only built on first access and importing this module
+is not depending on it.
+
+File descriptors (sockets, pipes, ...) can still be used, but the loop is
+only waiting for them in real time when no timer is scheduled.
+"""
+import asyncio
+import selectors
+import sys
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class _VirtualTimeSelector(selectors.DefaultSelector):  # type: ignore
+    """ Selector polling the registered file descriptors without blocking
+    and advancing the clock instead of waiting for a timeout """
+    def __init__(self, advance: Callable[[float], None]) -> None:
+        super().__init__()
+        self._advance = advance
+
+    def select(self, timeout: Optional[float] = None
+               ) -> List[Tuple[selectors.SelectorKey, int]]:
+        events = super().select(0)
+
+        if events or timeout == 0:
+            return events
+
+        if timeout is None:
+            # no timer is scheduled, so only file descriptors can wake up
+            return super().select(None)
+
+        self._advance(timeout)
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):  # type: ignore
+    """ Asyncio event loop with a virtual clock. Instead of waiting for the
+    next scheduled timer the clock is advanced to its deadline.
+
+    The clock is counting integer ticks of ``resolution`` seconds, so no
+    rounding errors are accumulated over long simulated durations. Timers
+    due within one tick are regarded as expired.
+
+    :param start: initial value of the clock in seconds
+    :param resolution: duration of a tick of the clock in seconds
+    """
+    def __init__(self, start: float = 0.0, resolution: float = 1e-6) -> None:
+        super().__init__(selector=_VirtualTimeSelector(self._advance))
+
+        if resolution <= 0:
+            self.close()
+            raise ValueError('Resolution has to be bigger than zero')
+
+        self._resolution = resolution
+        self._ticks = round(start / resolution)
+        self._clock_resolution = resolution
+
+    def time(self) -> float:
+        return self._ticks * self._resolution
+
+    def _advance(self, duration: float) -> None:
+        self._ticks += round(duration / self._resolution)
+
+    def advance(self, duration: float) -> None:
+        """ Move the clock forward. Timers expired meanwhile are called on the
+        next iteration of the loop.
+
+        :param duration: time in seconds to be added to the clock
+        """
+        if duration < 0:
+            raise ValueError('Duration has to be positive')
+
+        self._advance(duration)
+
+
+def _build_policy() -> type:
+    class EventLoopPolicy(asyncio.DefaultEventLoopPolicy):  # type: ignore
+        """ Event loop policy creating VirtualTimeLoop instances """
+        def new_event_loop(self) -> VirtualTimeLoop:
+            return VirtualTimeLoop()
+
+    EventLoopPolicy.__module__ = __name__
+    return EventLoopPolicy
+
+
+def __getattr__(name: str) -> Any:
+    if name == 'EventLoopPolicy':
+        policy = globals()[name] = _build_policy()
+        return policy
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def run(main: Awaitable[T], start: float = 0.0,
+        resolution: float = 1e-6) -> T:
+    """ Run the awaitable on a new VirtualTimeLoop and close the loop
+    afterwards (like ``asyncio.run``).
+
+    :param main: awaitable to be run until complete
+    :param start: initial value of the clock in seconds
+    :param resolution: duration of a tick of the clock in seconds
+    """
+    def _loop_factory() -> VirtualTimeLoop:
+        return VirtualTimeLoop(start, resolution)
+
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=_loop_factory) as runner:
+            return runner.run(_as_coroutine(main))
+
+    loop = _loop_factory()
+
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            _cancel_all_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
+async def _as_coroutine(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+
+
+def _cancel_all_tasks(loop: asyncio.AbstractEventLoop) -> None:
+    tasks = [task for task in asyncio.all_tasks(loop)
+             if not task.done()]  # type: List[Any]
+
+    for task in tasks:
+        task.cancel()
+
+    if tasks:
+        loop.run_until_complete(
+            asyncio.gather(*tasks, return_exceptions=True))
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+from benchmarks import suite
+
+
+def test_run_and_compare(tmp_path, capsys):
+    report = suite.run('notify_fanout*', repeat=1, min_time=0.001)
+    assert list(report['results']) == ['notify_fanout[1]',
+                                       'notify_fanout[10]',
+                                       'notify_fanout[1000]',
+                                       'notify_fanout[10000]']
+    assert all(r['ns_per_op'] > 0 for r in report['results'].values())
+
+    baseline = {'results': {
+        'notify_fanout[1]': {'ns_per_op': 1e9},
+        'notify_fanout[10]': {'ns_per_op': 1e-3},
+    }}
+    lines, regressions = suite.compare(report, baseline, threshold=1.5)
+    assert regressions == ['notify_fanout[10]']
+    assert lines[1].startswith('notify_fanout[1] ')
+    assert lines[3].split()[-1] == 'new'
+
+    path = tmp_path / 'baseline.json'
+    path.write_text(json.dumps(baseline))
+    output = tmp_path / 'report.json'
+    assert suite.main(['-k', 'notify_fanout?1?', '-r', '1',
+                       '--min-time', '0.001', '-o', str(output),
+                       '-c', str(path)]) == 0
+    assert 'notify_fanout[1]' in json.loads(output.read_text())['results']
+
+
+def test_cases_build():
+    # every case can be built and executed once
+    for name, build in suite._CASES:
+        with suite.event_loop() as loop:
+            function, operations = build(loop)
+            function()
+            assert operations > 0, name
+
+        assert loop.is_closed()
+
+
+def test_list(capsys):
+    assert suite.main(['--list', '-k', 'coro_queue*']) == 0
+    assert capsys.readouterr().out.split() == [
+        f'coro_queue[{mode.name}]' for mode in suite.AsyncMode]
+
+
+def test_event_loop():
+    previous = asyncio.new_event_loop()
+    asyncio.set_event_loop(previous)
+
+    try:
+        with suite.event_loop() as loop:
+            # the loop is passed explicitly to the cases
+            assert loop is not previous
+            assert asyncio.get_event_loop() is previous
+            task = loop.create_task(asyncio.sleep(10))
+
+        assert task.cancelled() and loop.is_closed()
+        assert asyncio.get_event_loop() is previous
+    finally:
+        asyncio.set_event_loop(None)
+        previous.close()
@@ -0,0 +1,107 @@
+import operator
+from unittest import mock
+
+import pytest
+
+from broqer import Value, Publisher, Sink, NONE, compile_expression, op
+from broqer.operator_overloading import MapConstant
+
+
+expressions = [
+    lambda a, b, c: (a * 3 + b) > c,
+    lambda a, b, c: -a + abs(b) - 1,
+    lambda a, b, c: 10 - a // (c + 1),
+    lambda a, b, c: (a + b) * (a - b) + c ** 2,
+    lambda a, b, c: (a == b) & (b != c),
+    lambda a, b, c: round(a / (abs(c) + 1)),
+    lambda a, b, c: a.bit_length() + (b + 1).real - c.conjugate(),
+]
+
+
+@pytest.mark.parametrize('expression', expressions)
+def test_same_result(expression):
+    leaves = [Value(1), Value(2), Value(3)]
+    for leaf in leaves:
+        leaf.inherit_type(int)
+
+    tree = expression(*leaves)
+    compiled = compile_expression(tree)
+
+    assert len(compiled.dependencies) <= 3
+    assert all(isinstance(d, Value) for d in compiled.dependencies)
+    assert compiled.get() == tree.get()
+
+    mock_tree, mock_compiled = mock.Mock(), mock.Mock()
+    tree.subscribe(Sink(mock_tree))
+    compiled.subscribe(Sink(mock_compiled))
+
+    for index, value in enumerate([5, -2, 0, 7, 7, 13]):
+        leaves[index % 3].emit(value)
+        assert compiled.get() == tree.get()
+        assert mock_compiled.call_args == mock_tree.call_args
+
+
+def test_glitch_free():
+    a = Value(1)
+    mock_sink = mock.Mock()
+    compile_expression((a + 1) * (a - 1)).subscribe(Sink(mock_sink))
+    mock_sink.assert_called_once_with(0)
+
+    mock_sink.reset_mock()
+    a.emit(2)
+    mock_sink.assert_called_once_with(3)
+
+
+def test_shared_subexpression():
+    a = Value(1)
+    operation = mock.Mock(side_effect=operator.add)
+    shared = MapConstant(a, 1, operation)
+
+    compiled = compile_expression(shared * shared)
+    assert compiled.get() == 4
+    operation.assert_called_once_with(1, 1)
+
+
+def test_leaves():
+    a, b = Value(1), Value(2)
+
+    # not an expression
+    assert compile_expression(a) is a
+
+    # operators not built by operator overloading are leaves
+    custom = op.CombineLatest(a, b, map_=lambda x, y: NONE if x > y else x)
+    mapped = a | op.Map(lambda v: v * 10)
+    compiled = compile_expression(custom + mapped + 1)
+    assert compiled.dependencies[:2] == (custom, mapped)
+    assert compiled.get() == 12
+
+    # an incremental CombineLatest is calling map_ with (index, value)
+    incremental = op.CombineLatest(a, b, map_=operator.mul, incremental=True)
+    expected = (incremental + 0).get()
+    compiled = compile_expression(incremental + 0)
+    assert compiled.dependencies[0] is incremental
+    assert compiled.get() == expected
+
+
+def test_long_expression():
+    values = [Value(i) for i in range(500)]
+    expression = values[0]
+
+    for value in values[1:]:
+        expression = expression + value
+
+    compiled = compile_expression(expression)
+    assert compiled.get() == sum(range(500))
+
+    values[0].emit(1000)
+    assert compiled.get() == sum(range(500)) + 1000
+
+
+def test_inherited_type():
+    source = Publisher('abc')
+    compiled = compile_expression(source + 'def')
+
+    assert compiled.inherited_type is str
+    assert compiled.upper().get() == 'ABCDEF'
+    assert compile_expression(source.upper()).get() == 'ABC'
+    assert compile_expression(source.replace('b', 'x')).get() == 'axc'
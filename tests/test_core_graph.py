@@ -0,0 +1,139 @@
+import json
+
+from broqer import Publisher, Value, Sink, op
+from broqer.graph import Graph, Edge, label
+from broqer.profiler import Profiler
+
+
+def build_diamond():
+    x = Value(1)
+    a = x | op.Map(lambda v: v + 1)
+    b = x | op.Map(lambda v: v * 2)
+    c = op.CombineLatest(a, b)
+    sink = Sink()
+    c.subscribe(sink)
+    return x, a, b, c, sink
+
+
+def test_discovery():
+    x, a, b, c, sink = build_diamond()
+
+    # the graph is discovered from every node
+    for root in (x, c):
+        nodes = Graph(root).nodes
+        assert {id(n) for n in nodes} >= {id(x), id(a), id(b), id(c)}
+
+    graph = Graph(x)
+    assert len(graph.nodes) == 5
+    index = {id(n): i for i, n in enumerate(graph.nodes)}
+    assert Edge(index[id(a)], index[id(c)], True) in graph.edges
+    assert Edge(index[id(c)], index[id(sink)], True) in graph.edges
+    assert len(graph.edges) == 5
+
+
+def test_statistics():
+    x, a, b, c, sink = build_diamond()
+    dead = x | op.Map(str) | op.Filter(bool)
+    graph = Graph(dead)
+
+    assert 'diamonds' not in graph.statistics()
+
+    statistics = graph.statistics(diamonds=True)
+    assert statistics == {
+        'nodes': 7,
+        'edges': 7,
+        'types': {'Value': 1, 'Map': 3, 'CombineLatest': 1, 'Sink': 1,
+                  'Filter': 1},
+        'max_depth': 3,
+        'fan_in': {0: 1, 1: 5, 2: 1},
+        'fan_out': {0: 2, 1: 4, 3: 1},
+        'diamonds': 1,
+        'dead': 2,
+    }
+
+    diamond, = graph.diamonds()
+    assert diamond.join is c and diamond.fork is x
+
+    dead_branches = graph.dead_branches()
+    assert {id(n) for n in dead_branches} == {id(dead), id(dead.originator)}
+
+    # unsubscribed edges are part of the graph
+    assert sum(not edge.subscribed for edge in graph.edges) == 2
+
+
+def test_closest_fork():
+    x = Value(1)
+    y = x + 1
+    z = op.CombineLatest(y + 1, y * 2, x)
+    diamond, = Graph(z).diamonds()
+    assert diamond.fork is y
+
+
+def test_diamond_without_dominator():
+    # x is forking to a and b, but b is also depending on y
+    x, y = Value(1), Value(2)
+    a = x + 1
+    b = x + y
+    c = op.CombineLatest(a, b)
+    diamond, = Graph(c).diamonds()
+    assert diamond.join is c and diamond.fork is x
+
+    # independent sources are not forming a diamond
+    assert not Graph(op.CombineLatest(x + 1, y + 1)).diamonds()
+
+
+def test_labels():
+    def double(value):
+        return value * 2
+
+    assert label(Value()) == 'Value'
+    assert label(op.Map(double)) == 'Map(double)'
+    assert label(op.Filter(bool)) == 'Filter(bool)'
+    assert label(Publisher(1) + 1) == 'MapConstant(add)'
+
+    # attributes of the inherited type are not mistaken for operator functions
+    source = Publisher('abc')
+    assert label(source) == 'Publisher'
+
+
+def test_export():
+    x, a, b, c, sink = build_diamond()
+    unused = x | op.Map(str)
+
+    with Profiler() as profiler:
+        x.emit(2)
+
+    graph = Graph(x, unused)
+    data = json.loads(graph.to_json(profiler))
+
+    assert data['statistics'] == json.loads(json.dumps(graph.statistics()))
+    assert len(data['nodes']) == 6
+    assert data['edges'][0].keys() == {'source', 'target', 'subscribed'}
+
+    nodes = {node['id']: node for node in data['nodes']}
+    index = {id(n): i for i, n in enumerate(graph.nodes)}
+    assert nodes[index[id(x)]]['notifications'] == 1
+    assert nodes[index[id(c)]]['calls'] == 2
+    assert nodes[index[id(c)]]['depth'] == 2
+    assert nodes[index[id(unused)]]['dead'] is True
+    assert 'calls' not in nodes[index[id(unused)]]
+
+    dot = graph.to_dot(profiler)
+    assert dot.startswith('digraph broqer {')
+    assert dot.endswith('}')
+    assert f'n{index[id(unused)]} [label="Map(str)", color=gray' in dot
+    assert f'n{index[id(x)]} -> n{index[id(unused)]} [style=dashed];' in dot
+    assert 'notifications: 1' in dot
+
+    assert 'notifications' not in graph.to_dot()
+
+
+def test_cycle():
+    # a Value subscribed to its own (indirect) subscriber
+    first = Value()
+    second = first | op.Map(lambda v: v)
+    second.subscribe(first)
+
+    graph = Graph(first)
+    assert graph.statistics()['nodes'] == 2
+    assert len(graph.dead_branches()) == 2
@@ -0,0 +1,74 @@
+import subprocess
+import sys
+
+import pytest
+
+# budget for the self time of all broqer modules loaded by ``import broqer``
+# (in microseconds, generous to be stable on slow CI machines)
+IMPORT_BUDGET_US = 50000
+
+
+def import_times(statement):
+    """ Run the statement in a new interpreter with ``-X importtime`` and
+    return a dictionary with the self time (in microseconds) by module """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, check=True)
+
+    times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_time, _cumulative, module = line[12:].split('|')
+        times[module.strip()] = int(self_time)
+
+    return times
+
+
+def test_import_time():
+    times = import_times('import broqer')
+
+    # asyncio, logging and the operators are loaded on first use
+    for module in ('asyncio', 'logging', 'broqer.op.map_', 'broqer.coro_queue',
+                   'broqer.subscribers.sink_async', 'broqer.propagation'):
+        assert module not in times
+
+    broqer_time = sum(t for m, t in times.items() if m.startswith('broqer'))
+    assert broqer_time < IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize('statement, modules', [
+    ('from broqer import op; op.Map', ['broqer.op.map_']),
+    ('from broqer.op import Throttle', ['broqer.op.throttle', 'asyncio']),
+    ('from broqer import SinkAsync', ['broqer.coro_queue', 'asyncio']),
+    ('import broqer; broqer.Value(1) + broqer.Value(2)',
+     ['broqer.op.combine_latest']),
+])
+def test_lazy_loading(statement, modules):
+    # modules imported via importlib are not reported by ``-X importtime``
+    statement += '; import sys; print(*sys.modules)'
+    result = subprocess.run([sys.executable, '-c', statement],
+                            capture_output=True, text=True, check=True)
+    loaded = result.stdout.split()
+
+    for module in modules:
+        assert module in loaded
+
+    assert 'broqer.op.map_async' not in loaded
+
+
+def test_lazy_attributes():
+    import broqer
+    from broqer import op, subscribers
+
+    assert broqer.SinkAsync is subscribers.SinkAsync
+    assert callable(op.fuse)
+    assert 'Throttle' in dir(op) and 'TraceBuffer' in dir(broqer)
+
+    with pytest.raises(AttributeError):
+        broqer.not_existing
+
+    with pytest.raises(ImportError):
+        from broqer.op import not_existing  # noqa: F401
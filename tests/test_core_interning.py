@@ -0,0 +1,145 @@
+from decimal import Decimal
+import gc
+import operator
+from unittest import mock
+import weakref
+
+import pytest
+
+from broqer import Publisher, Value, Sink
+from broqer.operator_overloading import _interned
+
+
+@pytest.fixture
+def interning():
+    Publisher.intern_expressions = True
+    try:
+        yield
+    finally:
+        Publisher.intern_expressions = False
+
+
+def test_same_publisher(interning):
+    a, b = Value(1), Value(2)
+    a.inherit_type(int)
+
+    assert (a + b) is (a + b)
+    assert (a + 1) is (a + 1)
+    assert (1 - a) is (1 - a)
+    assert -a is -a
+    assert a[0] is a[0]
+    assert a.real is a.real
+    assert a.to_bytes(2, 'big') is a.to_bytes(2, 'big')
+
+    assert (a + b) is not (b + a)
+    assert (a + 1) is not (a - 1)
+    assert (a + 1) is not (1 + a)
+    assert (a + 1) is not (a + 1.0)
+    assert a.to_bytes(2, 'big') is not a.to_bytes(2, 'little')
+    assert a.to_bytes(2, 'big') is not a.to_bytes
+
+
+def test_getattr(interning):
+    source = Publisher('abc')
+    upper = source.upper
+    called = upper()
+
+    assert source.upper is upper
+    assert called.get() == 'ABC'
+
+    # the interned attribute is not changed by the call
+    assert upper.get()() == 'ABC'
+
+
+def test_shared_subscription(interning):
+    a, b = Value(1), Value(2)
+    mock_sink = mock.Mock()
+
+    (a + b).subscribe(Sink(mock_sink, 'first'))
+    (a + b).subscribe(Sink(mock_sink, 'second'))
+
+    assert len(a.subscriptions) == 1
+
+    a.emit(2)
+    mock_sink.assert_any_call('first', 4)
+    mock_sink.assert_any_call('second', 4)
+
+
+def test_unhashable_constant(interning):
+    source = Publisher([1])
+    assert (source + [2]) is not (source + [2])
+    assert (source + [2]).get() == [1, 2]
+
+
+def test_released(interning):
+    gc.collect()
+    gc.disable()
+    try:
+        a = Value(1)
+        entries = len(_interned)
+        expression = a * 2
+        reference = weakref.ref(expression)
+        assert len(_interned) == entries + 1
+
+        del expression
+        assert reference() is None
+        assert len(_interned) == entries
+    finally:
+        gc.enable()
+
+
+def test_disabled():
+    a = Value(1)
+    assert (a + 1) is not (a + 1)
+
+
+
+@pytest.mark.parametrize('source, first, second, operation', [
+    ((0,), (1, 1.0), (1.0, 1), operator.add),
+    ((0,), ((1,), 2), ((1.0,), 2), operator.add),
+    (1.0, 0.0, -0.0, operator.add),
+    (1.0, complex(0.0, 0.0), complex(0.0, -0.0), operator.add),
+    (1, True, 1, operator.add),
+    (frozenset([2]), frozenset([1]), frozenset([1.0]), operator.xor),
+    ('a', 'b', 'b', operator.add),
+])
+def test_equal_constants(interning, source, first, second, operation):
+    """ equal constants with different content are not interned together """
+    source = Value(source)
+    assert first == second
+
+    if repr(first) == repr(second):
+        assert operation(source, first) is operation(source, second)
+    else:
+        assert operation(source, first) is operation(source, first)
+        assert operation(source, first) is not operation(source, second)
+
+    for constant in (first, second):
+        assert repr(operation(source, constant).get()) == \
+            repr(operation(source.get(), constant))
+
+
+def test_unknown_constant_type(interning):
+    source = Value(Decimal('1'))
+    assert (source + Decimal('1.0')) is not (source + Decimal('1.0'))
+    assert str((source + Decimal('1.00')).get()) == '2.00'
+
+
+@pytest.mark.parametrize('flag,build', [
+    ('index_comparisons', lambda v: v > 1),
+    ('index_projections', lambda v: v['key']),
+    ('index_projections', lambda v: v.values),
+])
+def test_index_modes(interning, flag, build):
+    v = Publisher({})
+    plain = build(v)
+
+    setattr(Publisher, flag, True)
+    try:
+        indexed = build(v)
+        assert indexed is not plain
+        assert build(v) is indexed
+    finally:
+        setattr(Publisher, flag, False)
+
+    assert build(v) is plain
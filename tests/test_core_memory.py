@@ -0,0 +1,93 @@
+import sys
+
+import pytest
+
+from broqer import Publisher, Value, Sink, SubscriptionDisposable, op
+from broqer.operator_overloading import MapConstant, MapUnary, _GetAttr
+
+
+class DictBased:
+    """ Class storing its attributes in a __dict__ """
+
+
+def dict_based(node):
+    """ Return an object with the slots of node stored in a __dict__ """
+    obj = DictBased()
+
+    for cls in type(node).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            if name in ('__dict__', '__weakref__'):
+                continue
+
+            try:
+                obj.__dict__[name] = object.__getattribute__(node, name)
+            except AttributeError:  # slot not assigned
+                pass
+
+    return obj
+
+
+source = Publisher('abc')
+
+nodes = {
+    'Publisher': Publisher,
+    'Value': lambda: Value(0),
+    'MapConstant': lambda: source + 1,
+    'MapUnary': lambda: abs(source),
+    '_GetAttr': lambda: source.upper,
+    'Map': lambda: source | op.Map(abs),
+    'CombineLatest': lambda: op.CombineLatest(source, source),
+    'Sink': Sink,
+    'SubscriptionDisposable': lambda: SubscriptionDisposable(source, None),
+}
+
+
+@pytest.mark.parametrize('name', nodes)
+def test_instance_dict(name):
+    node = nodes[name]()
+
+    if name == 'SubscriptionDisposable':
+        # hasattr(node, '__dict__') would use the overloaded __getattr__
+        assert type(node).__dictoffset__ == 0
+        return
+
+    # publishers and subscribers are supporting instance attributes (e.g. to
+    # mock .get), the __dict__ is only allocated on first use
+    node.get = lambda: 'patched'
+    assert node.get() == 'patched'
+
+
+@pytest.mark.parametrize('name', ['Publisher', 'Value', 'MapConstant',
+                                  'Map', 'Sink'])
+def test_memory_per_node(name):
+    node = nodes[name]()
+    obj = dict_based(node)
+
+    # the instance including its attribute storage is using at most two
+    # thirds of the memory of an equivalent dict based instance
+    used = sys.getsizeof(node)
+    dict_used = sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+    assert used <= dict_used * 2 / 3, \
+        f'{name} is using {used} bytes ({dict_used} bytes with __dict__)'
+
+
+def test_subclassing():
+    """ Subclasses without __slots__ are getting a __dict__ """
+    class MyPublisher(Publisher):
+        def __init__(self):
+            Publisher.__init__(self, 0)
+            self.my_attribute = 1
+
+    class MyConstant(MapConstant):
+        pass
+
+    publisher = MyPublisher()
+    assert publisher.my_attribute == 1
+    assert publisher.get() == 0
+
+    constant = MyConstant(publisher, 2, lambda a, b: a + b)
+    constant.extra = 'extra'
+    assert constant.get() == 2
+
+    assert isinstance(MapUnary(publisher, abs), Publisher)
+    assert isinstance(_GetAttr(publisher, 'real'), Publisher)
@@ -0,0 +1,109 @@
+from unittest import mock
+
+import pytest
+
+from broqer import Publisher, Value, Sink, Subscriber, Trace, NONE, op
+
+
+def build_pipelines(source):
+    return [
+        source | op.Map(lambda v: v * 2),
+        source | op.Map(lambda v: NONE if v % 3 else v),
+        source | op.Filter(lambda v: v > 2),
+        source | op.Cache(),
+        source | op.Map(lambda v: v // 2) | op.Cache() | op.Filter(bool),
+        source | op.Map(lambda v: (v, v)) | op.Map(max, unpack=True),
+        source | op.Map(lambda v: (v, 1)) | op.Filter(lambda a, b: a > b,
+                                                     unpack=True),
+        source | op.EvalTrue(),
+        op.CombineLatest(source | op.Map(lambda v: -v)),
+        source + 1,
+    ]
+
+
+@pytest.mark.parametrize('values', [[], [1], [1, 1, 2, 3, 3, 3, 4, 0, 5]])
+def test_same_result_as_notify(values):
+    """ .notify_many(values) is emitting the same values as calling .notify()
+    for each value """
+    results = []
+
+    for batch in (False, True):
+        source = Publisher()
+        mock_sink = mock.Mock()
+
+        for index, pipeline in enumerate(build_pipelines(source)):
+            pipeline.subscribe(Sink(mock_sink, index))
+
+        if batch:
+            source.notify_many(values)
+        else:
+            for value in values:
+                source.notify(value)
+
+        results.append(sorted(mock_sink.call_args_list, key=lambda c: c[0][0]))
+
+        if values:
+            assert source.get() == values[-1]
+        else:
+            assert source.get() is NONE
+
+    assert results[0] == results[1]
+
+
+def test_emit_batch_called_once():
+    source = Value()
+    mock_batch = mock.Mock()
+
+    class BatchSubscriber(Subscriber):
+        def emit_batch(self, values, who):
+            mock_batch(values, who)
+
+    (source | op.Map(lambda v: v + 1)).subscribe(BatchSubscriber())
+    source.notify_many([1, 2, 3])
+
+    mock_batch.assert_called_once_with([2, 3, 4], mock.ANY)
+
+    # filtered out batches are not emitted
+    (source | op.Filter(lambda v: False)).subscribe(BatchSubscriber())
+    mock_batch.reset_mock()
+    source.notify_many([1, 2, 3])
+    assert mock_batch.call_count == 1
+
+
+def test_fallback_to_emit():
+    """ subscribers not implementing .emit_batch get each value emitted """
+    mock_emit = mock.Mock()
+
+    class DuckSubscriber:
+        def emit(self, value, who):
+            mock_emit(value)
+
+    source = Publisher()
+    source.subscribe(DuckSubscriber())
+    source.subscribe(Trace(mock_emit))
+
+    with mock.patch.object(Trace, '_trace_handler') as mock_trace:
+        source.notify_many([1, 2])
+        assert mock_trace.call_count == 2
+
+    assert mock_emit.call_args_list == [mock.call(1), mock.call(2),
+                                        mock.call(1), mock.call(2)]
+
+
+def test_operator_notify_many():
+    operator = Publisher() | op.Map(lambda v: v)
+
+    with pytest.raises(ValueError):
+        operator.notify_many([1])
+
+    value = Value()
+    with pytest.raises(ValueError):
+        (value | Value()).emit_batch([1], who=None)
+
+
+def test_sink_unpack():
+    mock_sink = mock.Mock()
+    source = Publisher()
+    source.subscribe(Sink(mock_sink, unpack=True))
+    source.notify_many([(1, 2), (3, 4)])
+    assert mock_sink.call_args_list == [mock.call(1, 2), mock.call(3, 4)]
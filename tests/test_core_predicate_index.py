@@ -0,0 +1,177 @@
+import operator
+import random
+from unittest import mock
+
+import pytest
+
+from broqer import Publisher, Sink
+from broqer.operator_overloading import MapConstant
+from broqer.predicate_index import IndexedComparison, PredicateIndex
+
+
+@pytest.fixture
+def indexing():
+    Publisher.index_comparisons = True
+    try:
+        yield
+    finally:
+        Publisher.index_comparisons = False
+
+
+COMPARISONS = [operator.lt, operator.le, operator.gt, operator.ge,
+               operator.eq, operator.ne]
+
+
+def test_same_results(indexing):
+    random_ = random.Random(0)
+    domain = [-2, -1, 0, 0.5, 1, 2, 3.5, 4, 10]
+    source = Publisher(0)
+
+    comparisons = [(function, random_.choice(domain))
+                   for function in COMPARISONS for _ in range(20)]
+    publishers = [function(source, k) for function, k in comparisons]
+    sinks = [mock.Mock() for _ in publishers]
+
+    assert all(isinstance(p, IndexedComparison) for p in publishers)
+
+    for publisher, sink in zip(publishers, sinks):
+        publisher.subscribe(Sink(sink))
+
+    results = [function(0, k) for function, k in comparisons]
+
+    for _ in range(200):
+        value = random_.choice(domain)
+
+        for sink in sinks:
+            sink.reset_mock()
+
+        source.notify(value)
+
+        for index, (function, k) in enumerate(comparisons):
+            result = function(value, k)
+
+            if result != results[index]:
+                sinks[index].assert_called_once_with(result)
+            else:
+                sinks[index].assert_not_called()
+
+            results[index] = result
+            assert publishers[index].get() == result
+
+
+def test_only_flips_evaluated(indexing):
+    source = Publisher(0)
+    operation = mock.Mock(side_effect=operator.gt)
+    publishers = [IndexedComparison(source, k, operator.gt)
+                  for k in range(1000)]
+
+    for publisher in publishers:
+        publisher._operation = operation  # count the evaluations
+        publisher.subscribe(Sink())
+
+    operation.reset_mock()
+    source.notify(10)
+    assert operation.call_count == 10  # thresholds 0 .. 9 are flipping
+
+    operation.reset_mock()
+    source.notify(5.5)
+    assert operation.call_count == 5  # thresholds 5 .. 9 are flipping
+
+
+def test_equality(indexing):
+    state = Publisher('idle')
+    mock_sink = mock.Mock()
+
+    for name in ('idle', 'running', 'error'):
+        (state == name).subscribe(Sink(mock_sink, name))
+        (state != name).subscribe(Sink(mock_sink, 'not ' + name))
+
+    mock_sink.reset_mock()
+    state.notify('running')
+    assert sorted(mock_sink.call_args_list) == sorted([
+        mock.call('idle', False), mock.call('not idle', True),
+        mock.call('running', True), mock.call('not running', False)])
+
+    # unhashable values are evaluating all comparisons
+    mock_sink.reset_mock()
+    state.notify(['error'])
+    assert sorted(mock_sink.call_args_list) == sorted([
+        mock.call('running', False), mock.call('not running', True)])
+
+
+def test_failing_comparison(indexing):
+    source = Publisher(1)
+    mock_gt, mock_eq = mock.Mock(), mock.Mock()
+    (source > 0).subscribe(Sink(mock_gt))
+    (source == 1).subscribe(Sink(mock_eq))
+    mock_gt.reset_mock()
+    mock_eq.reset_mock()
+
+    # a failing comparison is not disturbing the other comparisons
+    with mock.patch('broqer.constant_index.default_error_handler') as \
+            error_handler:
+        source.notify('x')
+        error_handler.assert_called_once()
+
+    mock_gt.assert_not_called()
+    mock_eq.assert_called_once_with(False)
+
+
+def test_not_indexable(indexing):
+    source = Publisher(1)
+
+    assert type(source > 'a') is MapConstant
+    assert type(source > float('nan')) is MapConstant
+    assert type(source == [1]) is MapConstant
+    assert type(source + 1) is MapConstant
+    assert type(source > 1) is IndexedComparison
+
+    Publisher.index_comparisons = False
+    assert type(source > 1) is MapConstant
+
+
+def test_subscriptions(indexing):
+    source = Publisher()
+    first, second = source > 1, source < 5
+
+    source.notify(3)
+    assert first.get() is True
+
+    # the index is shared and subscribed once
+    disposable_first = first.subscribe(Sink())
+    disposable_second = second.subscribe(Sink())
+    assert len(source.subscriptions) == 1
+    assert first.get() is True and second.get() is True
+
+    disposable_first.dispose()
+    assert len(source.subscriptions) == 1
+    disposable_second.dispose()
+    assert len(source.subscriptions) == 0
+    assert second.get() is True
+
+    with pytest.raises(ValueError):
+        first.emit(1, who=Publisher())
+
+    with pytest.raises(ValueError):
+        PredicateIndex.of(source).emit(1, who=Publisher())
+
+
+def test_reset_state(indexing):
+    source = Publisher(3)
+    mock_sink = mock.Mock()
+    (source > 1).subscribe(Sink(mock_sink))
+    mock_sink.assert_called_once_with(True)
+
+    source.reset_state()
+    source.notify(3)
+    assert mock_sink.call_args_list == [mock.call(True), mock.call(True)]
+
+
+def test_released(indexing):
+    source = Publisher(3)
+    comparison = source > 1
+    index = PredicateIndex.of(source)
+    assert PredicateIndex.of(source) is index
+
+    del comparison, index
+    assert id(source) not in PredicateIndex._indices
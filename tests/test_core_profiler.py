@@ -0,0 +1,157 @@
+from itertools import count
+from unittest import mock
+
+import pytest
+
+from broqer import Publisher, Value, Sink, TopologicalPropagation, op
+from broqer import propagation
+from broqer.profiler import Profiler
+
+
+def build_clock():
+    """ clock advancing by one second on each call """
+    return count().__next__
+
+
+def test_zero_cost_when_detached():
+    originals = (Publisher.notify, Value.notify, Publisher.notify_many,
+                 propagation._emit, Sink.emit, Sink.emit_batch)
+    source = Value(0)
+    source.subscribe(Sink())
+
+    with Profiler():
+        assert Publisher.notify is not originals[0]
+        assert Value.notify is Publisher.notify
+        source.emit(1)
+        assert Sink.emit is not originals[4]
+
+    assert (Publisher.notify, Value.notify, Publisher.notify_many,
+            propagation._emit, Sink.emit, Sink.emit_batch) == originals
+
+
+def test_only_one_profiler():
+    with Profiler():
+        with pytest.raises(ValueError):
+            Profiler().attach()
+
+    profiler = Profiler()
+    profiler.detach()  # not attached
+    profiler.attach()
+    profiler.detach()
+
+
+def test_statistics():
+    source = Value(0)
+    mapped = source | op.Map(lambda v: v + 1)
+    sink = Sink()
+    mapped.subscribe(sink)
+
+    with Profiler(clock=build_clock()) as profiler:
+        source.emit(1)
+        source.emit_batch([2, 3])
+
+    # source is notified twice with 3 values, mapped is notified for each
+    assert profiler.publishers[id(source)].notifications == 2
+    assert profiler.publishers[id(source)].values == 3
+    assert profiler.publishers[id(mapped)].values == 3
+
+    stats_map = profiler.subscribers[id(mapped)]
+    stats_sink = profiler.subscribers[id(sink)]
+
+    assert stats_map.calls == 2
+    assert stats_sink.calls == 2
+    assert stats_map.reference() is mapped
+
+    # each call is taking one tick of the clock
+    assert stats_sink.total_time == stats_sink.own_time == 2
+    assert stats_map.total_time == 6
+    assert stats_map.own_time == 4
+    assert stats_map.max_time == 3
+
+    assert profiler.top(1) == [stats_map]
+    assert profiler.top(1, key='calls')[0].calls == 2
+    assert 'calls=2' in repr(stats_map)
+    assert 'notifications=2' in repr(profiler.publishers[id(source)])
+
+    profiler.reset()
+    assert not profiler.subscribers
+
+
+def test_exceptions():
+    source = Publisher()
+    failing = mock.Mock(side_effect=ZeroDivisionError)
+    source.subscribe(Sink(failing))
+    source.subscribe(Sink(), weak=False)
+
+    with mock.patch('broqer.publisher.default_error_handler') as handler:
+        with Profiler() as profiler:
+            source.notify(1)
+            source.notify_many([2, 3])
+
+    assert handler.call_count == 2
+    stats = [s for s in profiler.subscribers.values() if s.exceptions]
+    assert len(stats) == 1 and stats[0].exceptions == 2
+
+
+def test_weak_subscription():
+    source = Publisher()
+    sink = Sink()
+    source.subscribe(sink, weak=True)
+
+    class Subscriber:
+        __slots__ = ('values',)
+
+        def __init__(self):
+            self.values = []
+
+        def emit(self, value, who):
+            self.values.append(value)
+
+    plain = Subscriber()
+    source.subscribe(plain)
+
+    with Profiler() as profiler:
+        source.notify_many([1, 2])
+
+    assert profiler.subscribers[id(sink)].calls == 1
+    assert profiler.subscribers[id(plain)].calls == 1
+    assert profiler.subscribers[id(plain)].reference() is None
+    assert plain.values == [1, 2]
+
+
+def test_not_weak_referenceable():
+    source = Publisher()
+
+    class Subscriber:
+        __slots__ = ()
+
+        def emit(self, value, who):
+            pass
+
+    plain = Subscriber()
+    source.subscribe(plain)
+
+    with Profiler() as profiler:
+        source.notify(1)
+        stats = profiler.subscribers[id(plain)]
+        source.notify(2)
+
+    assert profiler.subscribers[id(plain)] is stats
+    assert stats.calls == 2
+    assert 'emit' in Subscriber.__dict__
+    assert 'emit_batch' not in Subscriber.__dict__
+
+
+def test_propagation_engine():
+    source = Value(0)
+    combined = op.CombineLatest(source + 1, source * 2)
+    mock_sink = mock.Mock()
+    combined.subscribe(Sink(mock_sink))
+
+    with Profiler() as profiler, TopologicalPropagation():
+        source.emit(1)
+        source.emit_batch([2, 3])
+
+    mock_sink.assert_called_with((4, 6))
+    assert profiler.publishers[id(source)].notifications == 2
+    assert profiler.publishers[id(combined)].notifications == 2
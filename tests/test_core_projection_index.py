@@ -0,0 +1,153 @@
+from collections import namedtuple
+from unittest import mock
+
+import pytest
+
+from broqer import Publisher, Sink, TopologicalPropagation
+from broqer.operator_overloading import MapConstant, _GetAttr
+from broqer.projection_index import IndexedProjection, ProjectionIndex, \
+    notify_changes
+
+
+@pytest.fixture
+def indexing():
+    Publisher.index_projections = True
+    try:
+        yield
+    finally:
+        Publisher.index_projections = False
+
+
+def test_items(indexing):
+    state = Publisher({key: 0 for key in range(1000)})
+    projections = [state[key] for key in range(0, 1000, 10)]
+    sinks = [mock.Mock() for _ in projections]
+
+    assert all(isinstance(p, IndexedProjection) for p in projections)
+
+    for projection, sink in zip(projections, sinks):
+        projection.subscribe(Sink(sink))
+        sink.assert_called_once_with(0)
+        sink.reset_mock()
+
+    assert len(state.subscriptions) == 1
+
+    new_state = dict(state.get())
+    new_state.update({10: 1, 11: 1, 500: 2})
+    state.notify(new_state)
+
+    for index, sink in enumerate(sinks):
+        if index == 1:
+            sink.assert_called_once_with(1)
+        elif index == 50:
+            sink.assert_called_once_with(2)
+        else:
+            sink.assert_not_called()
+
+    assert projections[50].get() == 2
+
+
+def test_hint(indexing):
+    state = Publisher({'a': 1, 'b': 2})
+    mock_a, mock_b = mock.Mock(), mock.Mock()
+    state['a'].subscribe(Sink(mock_a))
+    state['b'].subscribe(Sink(mock_b))
+
+    # the hint is restricting the evaluation to the given keys
+    with mock.patch.object(IndexedProjection, 'update',
+                           autospec=True) as update:
+        notify_changes(state, {'a': 3, 'b': 2}, ['a'])
+        assert update.call_count == 1
+
+    notify_changes(state, {'a': 4, 'b': 5}, ['a', 'b'])
+    mock_a.assert_called_with(4)
+    mock_b.assert_called_with(5)
+
+    # without index the hint is ignored
+    other = Publisher()
+    notify_changes(other, 1, ['a'])
+    assert other.get() == 1
+
+    # with an active propagation engine all projections are evaluated
+    with TopologicalPropagation():
+        notify_changes(state, {'a': 6, 'b': 7}, ['a'])
+
+    mock_b.assert_called_with(7)
+
+
+def test_attributes(indexing):
+    Point = namedtuple('Point', 'x y')
+    source = Publisher(Point(1, 2))
+    mock_x, mock_y = mock.Mock(), mock.Mock()
+
+    x = source.x
+    assert isinstance(x, IndexedProjection)
+    x.subscribe(Sink(mock_x))
+    source.y.subscribe(Sink(mock_y))
+
+    source.notify(Point(1, 3))
+    mock_x.assert_called_once_with(1)
+    assert mock_y.call_args_list == [mock.call(2), mock.call(3)]
+
+    # calls are building a new operator
+    call = source.count(3)
+    assert isinstance(call, _GetAttr)
+    assert call.get() == 1
+
+    with pytest.raises(TypeError):
+        Publisher({'a': 1})['a']()
+
+
+def test_missing_key(indexing):
+    state = Publisher({'a': 1, 'b': 1})
+    mock_a, mock_b = mock.Mock(), mock.Mock()
+    state['a'].subscribe(Sink(mock_a))
+    state['b'].subscribe(Sink(mock_b))
+    mock_b.reset_mock()
+
+    with mock.patch('broqer.constant_index.default_error_handler') as \
+            error_handler:
+        state.notify({'a': 2})
+        error_handler.assert_called_once()
+
+    mock_a.assert_called_with(2)
+    mock_b.assert_not_called()
+
+
+def test_not_indexable(indexing):
+    source = Publisher({})
+    assert type(source[[1]]) is MapConstant
+    assert type(source + 1) is MapConstant
+
+    Publisher.index_projections = False
+    assert type(source['a']) is MapConstant
+
+
+def test_subscriptions(indexing):
+    state = Publisher({'a': 1, 'b': 2})
+    projection_a, projection_b = state['a'], state['b']
+
+    disposable_a = projection_a.subscribe(Sink())
+    disposable_b = projection_b.subscribe(Sink())
+    assert projection_b.get() == 2
+
+    disposable_a.dispose()
+    assert len(state.subscriptions) == 1
+    disposable_b.dispose()
+    assert len(state.subscriptions) == 0
+
+    with pytest.raises(ValueError):
+        projection_a.emit({}, who=Publisher())
+
+    with pytest.raises(ValueError):
+        ProjectionIndex.of(state).emit({}, who=Publisher())
+
+
+def test_reset_state(indexing):
+    state = Publisher({'a': 1})
+    mock_sink = mock.Mock()
+    state['a'].subscribe(Sink(mock_sink))
+
+    state.reset_state()
+    state.notify({'a': 1})
+    assert mock_sink.call_args_list == [mock.call(1), mock.call(1)]
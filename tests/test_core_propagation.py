@@ -0,0 +1,300 @@
+import sys
+from unittest import mock
+
+import pytest
+
+from broqer import Value, Publisher, Sink, TopologicalPropagation, batch, op, \
+    NONE, default_error_handler
+from broqer.value import dependent_subscribe
+
+
+@pytest.fixture
+def propagation():
+    with TopologicalPropagation() as engine:
+        yield engine
+
+
+def test_diamond(propagation):
+    x = Value(1)
+    a = x + 1
+    b = x * 2
+    c = a + b
+
+    mock_sink = mock.Mock()
+    mock_map = mock.Mock(side_effect=lambda *v: v)
+    d = op.CombineLatest(c, x, map_=mock_map)
+
+    c.subscribe(Sink(mock_sink))
+    d.subscribe(Sink())
+    mock_sink.assert_called_once_with(4)
+    mock_map.reset_mock()
+    mock_sink.reset_mock()
+
+    for value in range(2, 10):
+        x.emit(value)
+        mock_sink.assert_called_once_with(3 * value + 1)
+        mock_map.assert_called_once_with(3 * value + 1, value)
+        mock_sink.reset_mock()
+        mock_map.reset_mock()
+
+
+def test_enable_disable():
+    engine = TopologicalPropagation()
+    engine.enable()
+
+    with pytest.raises(ValueError):
+        TopologicalPropagation().enable()
+
+    engine.disable()
+
+    assert Publisher._propagation is None
+
+
+def stack_depth():
+    frame, depth = sys._getframe(), 0
+    while frame is not None:
+        frame, depth = frame.f_back, depth + 1
+    return depth
+
+
+@pytest.mark.parametrize('engine', [False, True])
+def test_deep_pipeline(engine):
+    """ the propagation is not recursive, so the stack depth is independent
+    of the depth of the pipeline """
+    depths = []
+
+    for length in (10, 200):
+        source = Value()
+        publisher = source
+
+        for _ in range(length):
+            publisher = publisher | op.Map(lambda v: v + 1)
+
+        publisher.subscribe(Sink(lambda v: depths.append(stack_depth())))
+
+        if engine:
+            with TopologicalPropagation():
+                source.emit(1)
+        else:
+            source.emit(1)
+
+    assert len(depths) == 2
+    assert (depths[0] == depths[1]) == engine
+
+
+def test_unranked_subscription(propagation):
+    """ publishers subscribed without dependency (e.g. dependent_subscribe)
+    are getting ranked on the first propagation """
+    x = Value(0)
+    a = x | op.Map(lambda v: v + 1) | op.Map(lambda v: v + 1)
+    b = Value()
+    dependent_subscribe(x, b)
+
+    mock_map = mock.Mock(side_effect=lambda *v: v)
+    c = op.CombineLatest(a, b, map_=mock_map)
+    c.subscribe(Sink())
+
+    x.emit(1)  # in this propagation the rank of b gets raised
+    mock_map.reset_mock()
+
+    x.emit(2)
+    mock_map.assert_called_once_with(4, 2)
+
+
+def test_unranked_diamond(propagation):
+    """ raising the rank of an unranked subscriber is raising the ranks of its
+    downstream nodes, so already the first propagation is glitch free """
+    x = Value(0)
+    y = Value()
+    b = x * 2
+    a = y + 1
+    mock_map = mock.Mock(side_effect=lambda *v: v)
+    c = op.CombineLatest(a, b, map_=mock_map)
+    c.subscribe(Sink())
+    x.subscribe(y)  # y is not depending on x, so it is not ranked
+    mock_map.reset_mock()
+
+    x.emit(1)
+    mock_map.assert_called_once_with(2, 2)
+
+    assert y._rank > x._rank and a._rank > y._rank and c._rank > a._rank
+
+
+def test_unranked_cycle(propagation):
+    """ ranks are raised only once per delivery in cyclic subscriptions """
+    first = Value(0)
+    second = first | op.Filter(lambda v: v < 3) | op.Map(lambda v: v + 1)
+    second.subscribe(first)
+    first.emit(1)
+    assert first.get() == 3
+
+
+def test_emit_on(propagation):
+    x = Value(0)
+    a = x | op.Map(lambda v: v + 1)
+    b = x | op.Map(lambda v: v * 2)
+    c = Value(0)
+
+    mock_sink = mock.Mock()
+    op.CombineLatest(a, b, c, emit_on=c).subscribe(Sink(mock_sink))
+    mock_sink.assert_called_once_with((1, 0, 0))
+    mock_sink.reset_mock()
+
+    x.emit(1)
+    mock_sink.assert_not_called()
+
+    c.emit(1)
+    mock_sink.assert_called_once_with((2, 2, 1))
+
+
+def test_notify_many(propagation):
+    x = Publisher()
+    mock_sink = mock.Mock()
+    mock_batch = mock.Mock()
+
+    (x | op.Map(lambda v: v + 1)).subscribe(Sink(mock_batch))
+    op.CombineLatest(x, x | op.Filter(lambda v: v > 1)).subscribe(
+        Sink(mock_sink))
+
+    x.notify_many([1, 2, 3])
+
+    # multi source operators are evaluated once per propagation
+    mock_sink.assert_called_once_with((3, 3))
+    assert mock_batch.call_args_list == [mock.call(2), mock.call(3),
+                                         mock.call(4)]
+
+
+def test_error_handling(propagation):
+    x = Value()
+    mock_sink = mock.Mock(side_effect=[ZeroDivisionError, None])
+    mock_second = mock.Mock()
+
+    (x | op.Map(lambda v: v)).subscribe(Sink(mock_sink))
+    x.subscribe(Sink(mock_second))
+
+    with pytest.raises(ZeroDivisionError):
+        x.emit(1)
+
+    mock_second.assert_called_once_with(1)
+
+    # queue is cleared and engine is usable again
+    mock_second.reset_mock()
+    x.emit(2)
+    mock_sink.assert_called_with(2)
+    mock_second.assert_called_once_with(2)
+
+    mock_error_handler = mock.Mock()
+    default_error_handler.set(mock_error_handler)
+    try:
+        mock_sink.side_effect = ValueError
+        x.emit(3)
+    finally:
+        default_error_handler.reset()
+
+    mock_error_handler.assert_called_once_with(ValueError, mock.ANY, mock.ANY)
+    mock_second.assert_called_with(3)
+
+
+@pytest.mark.parametrize('engine', [False, True])
+def test_batch(engine):
+    values = [Value(0) for _ in range(10)]
+    mock_map = mock.Mock(side_effect=lambda *v: sum(v))
+    mock_sink = mock.Mock()
+
+    op.CombineLatest(*values, map_=mock_map).subscribe(Sink(mock_sink))
+    mock_sink.reset_mock()
+    mock_map.reset_mock()
+
+    propagation = TopologicalPropagation()
+    if engine:
+        propagation.enable()
+
+    try:
+        with batch():
+            for index, value in enumerate(values):
+                value.emit(index)
+                value.emit(index + 1)
+
+            # states are updated, notifications are deferred
+            assert values[0].get() == 1
+            mock_sink.assert_not_called()
+    finally:
+        propagation.disable()
+
+    mock_map.assert_called_once_with(*range(1, 11))
+    mock_sink.assert_called_once_with(55)
+
+    assert Publisher._propagation is None
+
+
+def test_nested_batch():
+    a, b = Value(0), Value(0)
+    mock_sink = mock.Mock()
+    op.CombineLatest(a, b).subscribe(Sink(mock_sink))
+    mock_sink.reset_mock()
+
+    with batch():
+        a.emit(1)
+
+        with batch():
+            b.emit(1)
+
+        mock_sink.assert_not_called()
+
+        with pytest.raises(ZeroDivisionError):
+            with batch():
+                a.emit(2)
+                b.emit(2)
+                1 / 0
+
+        # inner batch is rolled back
+        assert a.get() == 1
+        assert b.get() == 1
+
+        with batch():
+            with pytest.raises(ZeroDivisionError):
+                with batch(rollback=False):
+                    b.emit(3)
+                    1 / 0
+
+        assert b.get() == 3
+
+    mock_sink.assert_called_once_with((1, 3))
+
+
+def test_batch_rollback():
+    a, b = Value(0), Value()
+    mock_sink = mock.Mock()
+    a.subscribe(Sink(mock_sink))
+    b.subscribe(Sink(mock_sink))
+    mock_sink.reset_mock()
+
+    with pytest.raises(ZeroDivisionError):
+        with batch():
+            a.emit(1)
+            b.emit(1)
+            1 / 0
+
+    assert a.get() == 0
+    assert b.get() is NONE
+    mock_sink.assert_not_called()
+
+    # the outermost batch decides
+    with pytest.raises(ZeroDivisionError):
+        with batch(rollback=False):
+            a.emit(2)
+            with batch():
+                b.emit(2)
+            1 / 0
+
+    assert mock_sink.call_args_list == [mock.call(2), mock.call(2)]
+
+    # states are restored to the values before the rolled back batch
+    with batch():
+        a.emit(3)
+        with pytest.raises(ZeroDivisionError):
+            with batch():
+                a.emit(4)
+                1 / 0
+        assert a.get() == 3
+    mock_sink.assert_called_with(3)
@@ -1,5 +1,7 @@
 from unittest import mock
 import pytest
+from functools import reduce
+import random
 
 from broqer import Value, Publisher, Subscriber, Sink, op
 import operator
@@ -402,8 +404,47 @@ def test_getattr_without_inherit():
     (op.BitwiseOr, (0, 5, 8), 13),
     (op.BitwiseOr, (7, 14, 255), 255),
     (op.BitwiseOr, (3,), 3),
+    (op.BitwiseOr, (True, False), True),
+    (op.BitwiseOr, ({1}, {2}), {1, 2}),
+    (op.BitwiseAnd, (-1, 6, 3), 2),
+    (op.Count, (0, 5, 3), 2),
+    (op.Sum, (1, 2, 3), 6),
+    (op.Min, (3, 1, 2), 1),
+    (op.Max, (3, 1, 2), 3),
+    (op.Max, ('a', 'c', 'b'), 'c'),
 ])
 def test_multi_operators(operator, values, result):
     sources = [Publisher(v) for v in values]
     dut = operator(*sources)
     assert dut.get() == result
+
+
+@pytest.mark.parametrize('operator, reference, domain', [
+    (op.All, all, [0, 1, 2]),
+    (op.Any, any, [0, 1, 2]),
+    (op.Count, lambda values: sum(map(bool, values)), [0, 1, 2]),
+    (op.BitwiseAnd, lambda values: reduce(operator.and_, values),
+     [0, 1, 6, 7, 255, True, False, -2]),
+    (op.BitwiseOr, lambda values: reduce(operator.or_, values),
+     [0, 1, 6, 8, 1024, True, False, -3]),
+    (op.Sum, sum, range(-5, 5)),
+    (op.Min, min, range(10)),
+    (op.Max, max, range(10)),
+])
+def test_incremental_aggregation(operator, reference, domain):
+    random_ = random.Random(0)
+    domain = list(domain)
+    values = [random_.choice(domain) for _ in range(20)]
+    sources = [Publisher(v) for v in values]
+    dut = operator(*sources)
+    mock_sink = mock.Mock()
+    dut.subscribe(Sink(mock_sink))
+    mock_sink.assert_called_once_with(reference(values))
+
+    for _ in range(500):
+        index = random_.randrange(len(sources))
+        values[index] = random_.choice(domain)
+        sources[index].notify(values[index])
+        result = mock_sink.call_args[0][0]
+        assert result == reference(values)
+        assert type(result) is type(reference(values))
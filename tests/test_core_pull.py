@@ -0,0 +1,182 @@
+from unittest import mock
+
+import pytest
+
+from broqer import Publisher, Value, Sink, NONE, batch, op
+
+
+@pytest.fixture
+def memoize():
+    Publisher.memoize_get = True
+    try:
+        yield
+    finally:
+        Publisher.memoize_get = False
+
+
+def counting(function):
+    return mock.Mock(side_effect=function)
+
+
+def test_recompute_only_on_change(memoize):
+    source = Value(1)
+    first = counting(lambda v: v + 1)
+    second = counting(lambda v: v * 2)
+    pipeline = source | op.Map(first) | op.Map(second)
+
+    assert pipeline.get() == 4
+    assert pipeline.get() == 4
+    assert first.call_count == second.call_count == 1
+
+    for value in range(1000):
+        source.emit(value)
+
+    # emits are not evaluating the pipeline
+    assert first.call_count == second.call_count == 1
+
+    assert pipeline.get() == 2000
+    assert first.call_count == second.call_count == 2
+
+
+def test_only_stale_nodes(memoize):
+    a, b = Value(1), Value(2)
+    map_a = counting(lambda v: v + 1)
+    map_b = counting(lambda v: v + 1)
+    combine = counting(lambda *v: sum(v))
+
+    result = op.CombineLatest(a | op.Map(map_a), b | op.Map(map_b),
+                              map_=combine)
+    assert result.get() == 5
+
+    a.emit(2)
+    assert result.get() == 6
+    assert map_a.call_count == 2
+    assert map_b.call_count == 1
+    assert combine.call_count == 2
+
+
+@pytest.mark.parametrize('build', [
+    lambda s: s | op.Filter(lambda v: v > 1),
+    lambda s: s | op.EvalTrue(),
+    lambda s: s | op.EvalFalse(),
+    lambda s: s + 1,
+    lambda s: 1 - s,
+    lambda s: -s,
+    lambda s: s.bit_length(),
+    lambda s: op.BitwiseCombineLatest({s: 0, s | op.Map(bool): 1}),
+])
+def test_same_result(memoize, build):
+    source = Value(0)
+    source.inherit_type(int)
+    pipeline = build(source)
+
+    for value in [0, 1, 2, 2, 0, 3]:
+        source.emit(value)
+        result = pipeline.get()
+
+        Publisher.memoize_get = False
+        assert pipeline.get() == result
+        Publisher.memoize_get = True
+
+        assert pipeline.get() == result
+
+
+def test_subscribed_operator(memoize):
+    """ operators with subscriptions are returning their state, memoized
+    results are not used after unsubscription when the state changed """
+    source = Value(1)
+    function = counting(lambda v: v + 1)
+    operator = source | op.Map(function)
+    pipeline = operator | op.Map(lambda v: v * 10)
+
+    assert pipeline.get() == 20
+
+    disposable = operator.subscribe(Sink())
+    source.emit(2)
+    assert pipeline.get() == 30
+    disposable.dispose()
+
+    assert pipeline.get() == 30
+    source.emit(3)
+    assert pipeline.get() == 40
+
+
+def test_getattr_call(memoize):
+    source = Publisher('abc')
+    attribute = source.upper
+    assert attribute.get()() == 'ABC'
+
+    # calling the attribute publisher is changing the result
+    assert attribute().get() == 'ABC'
+
+
+def test_rollback(memoize):
+    source = Value(1)
+    pipeline = source | op.Map(lambda v: v + 1)
+
+    with pytest.raises(ZeroDivisionError):
+        with batch():
+            source.emit(2)
+            assert pipeline.get() == 3
+            1 / 0
+
+    assert pipeline.get() == 2
+
+
+def test_version():
+    source = Value()
+    operator = source | op.Map(lambda v: v)
+    versions = [operator.version]
+
+    source.emit(1)
+    versions.append(operator.version)
+
+    operator.subscribe(Sink())
+    versions.append(operator.version)
+
+    source.emit(2)
+    versions.append(operator.version)
+
+    source.reset_state()
+    versions.append(operator.version)
+
+    assert versions == sorted(set(versions))
+    assert operator.get() is NONE
+
+
+def test_disabled():
+    source = Value(1)
+    function = counting(lambda v: v)
+    pipeline = source | op.Map(function)
+
+    pipeline.get()
+    pipeline.get()
+    assert function.call_count == 2
+
+
+def test_deep_diamond(memoize):
+    """ each node is evaluated once per change, not once per path """
+    class CountingValue(Value):
+        accesses = 0
+
+        @property
+        def version(self):
+            CountingValue.accesses += 1
+            return Value.version.fget(self)
+
+    source = CountingValue(1)
+    pipeline = source
+
+    for _ in range(40):  # 2**40 paths from pipeline to source
+        pipeline = pipeline + pipeline
+
+    assert pipeline.get() == 2**40
+    assert CountingValue.accesses == 2
+
+    # reading an unchanged graph is not visiting the sources
+    assert pipeline.get() == 2**40
+    assert CountingValue.accesses == 2
+
+    source.emit(2)
+    assert pipeline.get() == 2**41
+    assert CountingValue.accesses == 4
@@ -0,0 +1,143 @@
+import time
+import tracemalloc
+from unittest import mock
+
+import pytest
+
+from broqer import Publisher, Value, Sink, SubscriptionError
+from broqer.subscription_store import SubscriptionStore
+
+
+@pytest.mark.parametrize('count', [0, 1, SubscriptionStore.THRESHOLD,
+                                   SubscriptionStore.THRESHOLD + 1, 100])
+def test_order(count):
+    """ Appended and prepended subscribers keep their order independent of
+    the used representation """
+    store = SubscriptionStore()
+    appended = [Sink() for _ in range(count)]
+    prepended = [Sink() for _ in range(count)]
+
+    for subscriber_back, subscriber_front in zip(appended, prepended):
+        store.add(subscriber_back)
+        store.add(subscriber_front, prepend=True)
+
+    assert len(store) == 2 * count
+    assert tuple(store) == tuple(reversed(prepended)) + tuple(appended)
+
+    for subscriber in appended + prepended:
+        assert subscriber in store
+
+    assert Sink() not in store
+
+    for subscriber in appended[::2] + prepended[::3]:
+        assert store.remove(subscriber)
+        assert subscriber not in store
+        assert not store.remove(subscriber)
+
+    expected = [s for s in reversed(prepended) if s not in prepended[::3]] + \
+        appended[1::2]
+    assert list(store) == expected
+
+    for subscriber in expected:
+        store.remove(subscriber)
+
+    assert not store
+    assert tuple(store) == ()
+
+
+def test_publishers_as_subscribers():
+    """ Publishers are overloading __eq__ - identity has to be used """
+    store = SubscriptionStore()
+    values = [Value(0) for _ in range(SubscriptionStore.THRESHOLD * 2)]
+
+    for value in values:
+        store.add(value)
+        assert value in store
+
+    assert Value(0) not in store
+
+    for value in values:
+        assert store.remove(value)
+
+    assert len(store) == 0
+
+
+def test_high_fan_out():
+    """ Subscribing and unsubscribing 10000 subscribers is not quadratic """
+    publisher = Publisher(0)
+    mock_sink = mock.Mock()
+    subscribers = [Sink(mock_sink) for _ in range(10000)]
+
+    start = time.perf_counter()
+    disposables = [publisher.subscribe(s) for s in subscribers]
+    publisher.subscribe(Sink(mock_sink, 'first'), prepend=True)
+
+    with pytest.raises(SubscriptionError):
+        publisher.subscribe(subscribers[5000])
+
+    for disposable in disposables:
+        disposable.dispose()
+    duration = time.perf_counter() - start
+
+    assert len(publisher.subscriptions) == 1
+    # a quadratic implementation takes seconds here
+    assert duration < 1
+
+    mock_sink.reset_mock()
+    publisher.notify(1)
+    mock_sink.assert_called_once_with('first', 1)
+
+
+@pytest.mark.parametrize('count', [200, 1000])
+def test_notify_without_allocation(count):
+    """ .notify() is using the cached snapshot instead of copying the
+    subscriptions into a new tuple on each call """
+    publisher = Publisher()
+    for _ in range(count):
+        publisher.subscribe(Sink())
+
+    publisher.notify(0)  # build the snapshot
+    snapshot = publisher.subscriptions
+
+    tracemalloc.start()
+    try:
+        for value in range(100):
+            publisher.notify(value)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # copying the subscriptions would allocate 8 bytes per subscriber
+    assert peak - current < 8 * count
+    assert publisher.subscriptions is snapshot
+
+
+def test_change_subscriptions_during_notify():
+    publisher = Publisher()
+    mock_sink = mock.Mock()
+
+    for count in range(50):
+        publisher.subscribe(Sink(mock_sink, count))
+
+    disposables = []
+
+    def _subscribe_unsubscribe(value):
+        if value == 1:
+            disposables.append(publisher.subscribe(Sink(mock_sink, 'new')))
+            publisher.unsubscribe(late_subscriber)
+
+    late_subscriber = Sink(mock_sink, 'late')
+    publisher.subscribe(Sink(_subscribe_unsubscribe), prepend=True)
+    publisher.subscribe(late_subscriber)
+
+    # all subscribers of the snapshot are notified (the new subscriber only
+    # on subscription)
+    publisher.notify(1)
+    assert mock_sink.call_count == 52
+    mock_sink.assert_any_call('new', 1)
+    mock_sink.assert_called_with('late', 1)
+
+    mock_sink.reset_mock()
+    publisher.notify(2)
+    assert mock_sink.call_count == 51
+    mock_sink.assert_called_with('new', 2)
@@ -0,0 +1,176 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from broqer.timer import Timer, TimerWheel
+
+
+@pytest.mark.asyncio
+async def test_timer_wheel():
+    loop = asyncio.get_running_loop()
+    wheel = TimerWheel(resolution=0.01, slots=8)
+    calls = []
+
+    def _callback(name):
+        calls.append((name, round(loop.time() - start, 3)))
+
+    timers = {name: Timer(_callback, wheel=wheel) for name in 'abcd'}
+    start = loop.time()
+
+    timers['a'].start(0.025, args=('a',))  # rounded up to 0.03
+    timers['b'].start(0.01, args=('b',))
+    timers['c'].start(0.2, args=('c',))  # multiple turns of the wheel
+    timers['d'].start(0.05, args=('d',))
+    assert len(wheel) == 4
+    assert all(timer.is_running() for timer in timers.values())
+
+    timers['d'].cancel()
+    timers['d'].cancel()
+    assert not timers['d'].is_running()
+    assert len(wheel) == 3
+
+    # restart is moving the timer
+    timers['b'].start(0.04, args=('b',))
+
+    await asyncio.sleep(0.5)
+    assert calls == [('a', 0.03), ('b', 0.04), ('c', 0.2)]
+    assert len(wheel) == 0
+    assert not any(timer.is_running() for timer in timers.values())
+
+    # timeout 0 is triggering immediately
+    timers['a'].start(0, args=('a',))
+    assert calls[-1][0] == 'a'
+
+
+@pytest.mark.asyncio
+async def test_callbacks_changing_timers():
+    wheel = TimerWheel(resolution=0.01)
+    second_callback = mock.Mock()
+    second = Timer(second_callback, wheel=wheel)
+
+    def _restart():
+        second.start(0.1)
+
+    first = Timer(_restart, wheel=wheel)
+    first.start(0.01)
+    second.start(0.01)
+
+    # the second timer expires in the same tick but is restarted by the first
+    await asyncio.sleep(0.015)
+    second_callback.assert_not_called()
+    assert second.is_running()
+
+    await asyncio.sleep(0.1)
+    second_callback.assert_called_once_with()
+
+    # cancelling a timer expired in the same tick
+    first = Timer(second.cancel, wheel=wheel)
+    first.start(0.01)
+    second.start(0.01)
+    await asyncio.sleep(0.02)
+    second_callback.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_callback_exception():
+    loop = asyncio.get_running_loop()
+    handler = mock.Mock()
+    loop.set_exception_handler(handler)
+
+    wheel = TimerWheel()
+    callback = mock.Mock()
+    Timer(mock.Mock(side_effect=ValueError), wheel=wheel).start(0.01)
+    Timer(callback, wheel=wheel).start(0.01)
+
+    await asyncio.sleep(0.1)
+    callback.assert_called_once_with()
+    handler.assert_called_once()
+    assert isinstance(handler.call_args[0][1]['exception'], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_idle_wheel():
+    wheel = TimerWheel(resolution=0.1, slots=4)
+    callback = mock.Mock()
+    timer = Timer(callback, wheel=wheel)
+
+    for _ in range(3):
+        timer.start(0.1)
+        await asyncio.sleep(0.15)
+        callback.assert_called_once_with()
+        callback.reset_mock()
+
+        # the idle wheel is not scheduling ticks
+        await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_skipping_ticks():
+    loop = asyncio.get_running_loop()
+    wheel = TimerWheel(resolution=0.01)
+    calls = []
+    late = Timer(lambda: calls.append(('late', loop.time() - start)),
+                 wheel=wheel)
+    early = Timer(lambda: calls.append(('early', loop.time() - start)),
+                  wheel=wheel)
+
+    with mock.patch.object(TimerWheel, '_on_tick', autospec=True,
+                           side_effect=TimerWheel._on_tick) as on_tick:
+        start = loop.time()
+        late.start(1)
+        early.start(0.02)  # earlier than the scheduled tick
+        await asyncio.sleep(2)
+
+    # only the ticks with a due timer are scheduled
+    assert on_tick.call_count == 2
+    assert [(name, round(t, 3)) for name, t in calls] == [('early', 0.02),
+                                                          ('late', 1)]
+
+
+@pytest.mark.asyncio
+async def test_end_early():
+    callback = mock.Mock()
+    wheel = TimerWheel(resolution=0.01)
+
+    for timer in (Timer(callback, wheel=wheel), Timer(callback)):
+        timer.start(0.05, args=(1,))
+        timer.end_early()
+        callback.assert_called_once_with(1)
+        assert not timer.is_running()
+        assert len(wheel) == 0
+
+        # the timer is not expiring later
+        await asyncio.sleep(0.1)
+        callback.assert_called_once_with(1)
+        callback.reset_mock()
+
+        # a timer not running is not calling the callback
+        timer.end_early()
+        callback.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_many_timers():
+    wheel = TimerWheel(resolution=0.01)
+    callback = mock.Mock()
+    timers = [Timer(callback, wheel=wheel) for _ in range(10000)]
+
+    for index, timer in enumerate(timers):
+        timer.start(0.01 + index * 0.0001)
+
+    for timer in timers[::2]:
+        timer.cancel()
+
+    await asyncio.sleep(2)
+    assert callback.call_count == 5000
+
+
+def test_argument_check():
+    with pytest.raises(ValueError):
+        TimerWheel(resolution=0)
+
+    with pytest.raises(ValueError):
+        TimerWheel(slots=0)
+
+    assert TimerWheel(resolution=0.5).resolution == 0.5
@@ -0,0 +1,147 @@
+import asyncio
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from broqer import OnEmitFuture, Sink, Value, op
+from broqer.publishers import PollPublisher
+from broqer.timer import TimerWheel
+from broqer.virtual_time import EventLoopPolicy, VirtualTimeLoop, run
+
+
+def test_run():
+    async def _main():
+        loop = asyncio.get_running_loop()
+        assert isinstance(loop, VirtualTimeLoop)
+        start = loop.time()
+        await asyncio.sleep(3600)
+        return start, loop.time()
+
+    assert run(_main()) == (0, 3600)
+    assert run(_main(), start=100) == (100, 3700)
+
+
+def test_run_cancels_pending_tasks():
+    cancelled = []
+
+    async def _forever():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def _main():
+        asyncio.ensure_future(_forever())
+        await asyncio.sleep(1)
+
+    run(_main())
+    assert cancelled == [True]
+
+
+def test_resolution():
+    async def _main():
+        loop = asyncio.get_running_loop()
+
+        for _ in range(1000):
+            await asyncio.sleep(0.1)
+
+        return loop.time()
+
+    # integer ticks are not accumulating rounding errors
+    assert run(_main()) == 100
+    assert run(_main(), resolution=0.25) == 0
+
+    with pytest.raises(ValueError):
+        VirtualTimeLoop(resolution=0)
+
+
+def test_advance():
+    loop = VirtualTimeLoop()
+    fired = []
+
+    try:
+        loop.call_later(5, fired.append, 5)
+        loop.call_later(20, fired.append, 20)
+        loop.advance(10)
+        assert loop.time() == 10
+
+        loop.run_until_complete(asyncio.sleep(0))
+        assert fired == [5]
+        assert loop.time() == 10
+
+        with pytest.raises(ValueError):
+            loop.advance(-1)
+    finally:
+        loop.close()
+
+
+def test_policy():
+    loop = EventLoopPolicy().new_event_loop()
+    assert isinstance(loop, VirtualTimeLoop)
+    loop.close()
+
+
+def test_without_policy_system():
+    # importing and run() are not depending on the deprecated policy system
+    statement = ('import asyncio; del asyncio.DefaultEventLoopPolicy; '
+                 'from broqer.virtual_time import run; '
+                 'print(run(asyncio.sleep(10, result=1)))')
+    result = subprocess.run([sys.executable, '-c', statement],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout == '1\n'
+
+
+def test_socket():
+    reader, writer = socket.socketpair()
+    reader.setblocking(False)
+
+    async def _main():
+        loop = asyncio.get_running_loop()
+        loop.call_later(1, writer.send, b'data')
+
+        # the clock is advanced to the timer, then the socket is polled
+        data = await loop.sock_recv(reader, 4)
+        return data, loop.time()
+
+    try:
+        assert run(_main()) == (b'data', 1)
+    finally:
+        reader.close()
+        writer.close()
+
+
+@pytest.mark.parametrize('wheel', [False, True])
+def test_hours_of_telemetry(wheel):
+    async def _main():
+        loop = asyncio.get_running_loop()
+        timer_wheel = TimerWheel(resolution=1) if wheel else None
+        samples = iter(range(10**6))
+        telemetry = PollPublisher(lambda: next(samples), 1, wheel=timer_wheel)
+        emits = []
+
+        throttled = telemetry | op.Throttle(60, wheel=timer_wheel)
+        throttled.subscribe(Sink(lambda v: emits.append((loop.time(), v))))
+        await asyncio.sleep(4 * 3600)
+        return emits
+
+    emits = run(_main())
+    assert len(emits) == 4 * 60 + 1
+    assert emits[:2] == [(0, 0), (60, 59)]
+
+    # deterministic
+    assert run(_main()) == emits
+
+
+def test_on_emit_future_timeout():
+    async def _main():
+        loop = asyncio.get_running_loop()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await OnEmitFuture(Value(), timeout=3600)
+
+        return loop.time()
+
+    assert run(_main()) == 3600
@@ -0,0 +1,139 @@
+import asyncio
+import gc
+from unittest import mock
+import weakref
+
+import pytest
+
+from broqer import Publisher, Value, Sink, SubscriptionError, \
+    TopologicalPropagation, op
+from broqer.subscription_store import SubscriptionStore
+from broqer.value import dependent_subscribe
+
+
+@pytest.fixture
+def no_gc():
+    """ objects have to be reclaimed by reference counting only """
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+@pytest.mark.parametrize('count', [1, SubscriptionStore.THRESHOLD + 1])
+def test_weak_subscription(no_gc, count):
+    publisher = Publisher(0)
+    mock_sink = mock.Mock()
+    others = [Sink() for _ in range(count - 1)]
+    for other in others:
+        publisher.subscribe(other)
+
+    sink = Sink(mock_sink)
+    disposable = publisher.subscribe(sink, weak=True)
+    mock_sink.assert_called_once_with(0)
+
+    assert publisher.subscriptions == tuple(others) + (sink,)
+    assert disposable.subscriber is sink
+
+    with pytest.raises(SubscriptionError):
+        publisher.subscribe(sink)
+
+    publisher.notify(1)
+    mock_sink.assert_called_with(1)
+
+    reference = weakref.ref(sink)
+    del sink
+    assert reference() is None
+
+    # unsubscribed automatically
+    assert len(publisher.subscriptions) == count - 1
+    assert disposable.subscriber is None
+
+    with pytest.raises(SubscriptionError):
+        disposable.dispose()
+
+
+def test_unsubscribe_weak():
+    publisher = Publisher()
+    sink = Sink()
+
+    disposable = publisher.subscribe(sink, weak=True)
+    publisher.unsubscribe(sink)
+    assert not publisher.subscriptions
+
+    disposable = publisher.subscribe(sink, weak=True)
+    disposable.dispose()
+    assert not publisher.subscriptions
+
+    # a disposed weak subscription is not affecting a new one
+    publisher.subscribe(sink, weak=True)
+    with pytest.raises(SubscriptionError):
+        disposable.dispose()
+    assert publisher.subscriptions == (sink,)
+
+    publisher.unsubscribe(sink)
+    with pytest.raises(SubscriptionError):
+        publisher.unsubscribe(sink)
+
+
+def test_weak_sink_in_pipeline(no_gc):
+    source = Value(1)
+    combined = op.CombineLatest(source, source + 1)
+    mock_sink = mock.Mock()
+    sink = Sink(mock_sink)
+
+    combined.subscribe(sink, weak=True)
+    mock_sink.assert_called_once_with((1, 2))
+
+    with TopologicalPropagation():
+        source.emit(2)
+    mock_sink.assert_called_with((2, 3))
+
+    del sink
+
+    # last subscription is gone, so the whole pipeline is unsubscribed
+    assert not combined.subscriptions
+    assert not source.subscriptions
+
+
+def test_notify_many_weak():
+    source = Publisher()
+    mock_sink = mock.Mock()
+    sink = Sink(mock_sink)
+    source.subscribe(sink, weak=True)
+
+    source.notify_many([1, 2])
+    assert mock_sink.call_args_list == [mock.call(1), mock.call(2)]
+
+
+def test_teardown_without_gc(no_gc):
+    """ a pipeline is reclaimed by reference counting after disposal """
+    source = Value(0)
+    pipelines = []
+
+    pipelines.append(Value())
+    dependent_subscribe(source, pipelines[-1])
+
+    pipelines.append(source | op.Map(lambda v: v) | op.Filter(bool))
+    pipelines.append(op.CombineLatest(source, source * 2))
+    pipelines.append(op.BitwiseCombineLatest({source: 0}))
+    pipelines.append(Publisher(1).real)
+
+    loop = asyncio.new_event_loop()
+    pipelines.append(source | op.Throttle(0.1, loop=loop))
+
+    references = []
+    try:
+        for pipeline in pipelines:
+            disposable = pipeline.subscribe(Sink())
+            disposable.dispose()
+            references.append(weakref.ref(pipeline))
+    finally:
+        loop.close()
+
+    del pipeline, pipelines, disposable
+
+    assert all(reference() is None for reference in references)
+    assert not source.subscriptions
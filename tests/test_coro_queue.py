@@ -288,4 +288,35 @@ async def test_skip(wait):
 
     # make a non-concurrent call
     event.set()
-    assert (await coro_queue.schedule(3)) == 3
\ No newline at end of file
+    assert (await coro_queue.schedule(3)) == 3
+
+@pytest.mark.parametrize('mode', AsyncMode)
+@pytest.mark.asyncio
+async def test_len(mode):
+    async def _coro(value):
+        await asyncio.sleep(0.1)
+        return value
+
+    coro_queue = CoroQueue(coro=_coro, mode=mode)
+    assert len(coro_queue) == 0
+
+    coro_queue.schedule(1)
+    assert len(coro_queue) == 1
+
+    coro_queue.schedule(2)
+    coro_queue.schedule(3)
+
+    if mode in (AsyncMode.CONCURRENT, AsyncMode.QUEUE):
+        assert len(coro_queue) == 3
+    elif mode in (AsyncMode.LAST, AsyncMode.LAST_DISTINCT):
+        assert len(coro_queue) == 2
+    elif mode == AsyncMode.INTERRUPT:
+        # cancelled runs are counted until they are finished
+        assert len(coro_queue) == 3
+        await asyncio.sleep(0.01)
+        assert len(coro_queue) == 1
+    else:
+        assert len(coro_queue) == 1
+
+    await asyncio.sleep(1)
+    assert len(coro_queue) == 0
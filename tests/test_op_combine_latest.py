@@ -1,5 +1,6 @@
 from unittest import mock
 from itertools import product
+import time
 
 import pytest
 
@@ -99,3 +100,125 @@ def test_unsubscibe(subscribe):
 
     p2.notify(2)
     assert operator.get() == (1, 2)
+
+
+class Sum:
+    """ incremental sum of all sources (counting the calls of all copies) """
+    calls = 0
+
+    def __init__(self, count):
+        self.values = [0] * count
+        self.total = 0
+
+    def __call__(self, index, value):
+        Sum.calls += 1
+        self.total += value - self.values[index]
+        self.values[index] = value
+        return self.total
+
+
+def test_incremental():
+    publishers = [Publisher(i) for i in range(10)]
+    function = Sum(10)
+    operator = op.CombineLatest(*publishers, map_=function, incremental=True,
+                                emit_on=publishers[5:])
+
+    assert operator.get() == 45
+
+    m = mock.Mock()
+    disposable = operator.subscribe(Sink(m))
+    m.assert_called_once_with(45)
+
+    Sum.calls = 0
+    publishers[0].notify(10)
+    publishers[9].notify(19)
+    assert m.call_args_list == [mock.call(45), mock.call(65)]
+    assert Sum.calls == 2
+    assert operator.get() == 65
+
+    disposable.dispose()
+    publishers[9].notify(9)
+    assert operator.get() == 55
+
+
+class Accumulate:
+    """ not idempotent: summing up every call """
+    def __init__(self):
+        self.total = 0
+
+    def __call__(self, index, value):
+        self.total += value
+        return self.total
+
+
+def test_incremental_resubscribe():
+    publishers = [Publisher(1), Publisher(2)]
+    operator = op.CombineLatest(*publishers, map_=Accumulate(),
+                                incremental=True)
+
+    m = mock.Mock()
+    disposable = operator.subscribe(Sink(m))
+    m.assert_called_once_with(3)
+    disposable.dispose()
+
+    # the state of the first subscription is not carried over
+    m.reset_mock()
+    operator.subscribe(Sink(m))
+    m.assert_called_once_with(3)
+
+    publishers[0].notify(10)
+    m.assert_called_with(13)
+
+
+def test_incremental_get_before_subscribe():
+    publishers = [Publisher(1), Publisher(2)]
+    operator = op.CombineLatest(*publishers, map_=Accumulate(),
+                                incremental=True)
+
+    # each .get() is evaluated on a fresh state
+    assert operator.get() == 3
+    assert operator.get() == 3
+
+    m = mock.Mock()
+    operator.subscribe(Sink(m))
+    m.assert_called_once_with(3)
+
+
+def test_incremental_build():
+    @op.build_combine_latest(incremental=True)
+    def last_change(index, value):
+        return (index, value)
+
+    p1, p2 = Publisher(1), Publisher(2)
+    m = mock.Mock()
+    last_change(p1, p2).subscribe(Sink(m))
+    m.assert_called_once_with((1, 2))
+
+    p1.notify(3)
+    m.assert_called_with((0, 3))
+
+
+@pytest.mark.parametrize('operator_factory', [
+    lambda p: op.CombineLatest(*p, map_=Sum(len(p)), incremental=True,
+                               emit_on=p[::2]),
+    lambda p: op.BitwiseCombineLatest({s: i for i, s in enumerate(p)}),
+])
+def test_many_sources(operator_factory):
+    """ the cost of an emit is not depending on the number of sources """
+    durations = []
+
+    for count in (10, 5000):
+        publishers = [Publisher(0) for _ in range(count)]
+        operator = operator_factory(publishers)
+        operator.subscribe(Sink())
+
+        start = time.perf_counter()
+        for value in range(1000):
+            publishers[-2].notify(value & 1)
+        durations.append(time.perf_counter() - start)
+
+        with pytest.raises(ValueError):
+            operator.emit(1, who=Publisher())
+
+    # a linear implementation takes about 100 times longer
+    assert durations[1] < durations[0] * 10
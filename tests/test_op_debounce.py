@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from unittest import mock
+
+from broqer import NONE, Sink, Publisher, Value, op
+from broqer.op import Debounce
+from broqer.timer import TimerWheel
+
+
+async def run_sequence(operator, emit_sequence, publisher=None):
+    """ Emit the (delay, value) sequence and return the emitted values with
+    the time of the emit """
+    loop = asyncio.get_running_loop()
+    publisher = publisher or Publisher()
+    start = loop.time()
+    emits = []
+
+    disposable = (publisher | operator).subscribe(
+        Sink(lambda v: emits.append((round(loop.time() - start, 3), v))))
+
+    for delay, value in emit_sequence:
+        await asyncio.sleep(delay)
+        publisher.notify(value)
+
+    await asyncio.sleep(1)
+    disposable.dispose()
+    return emits
+
+
+@pytest.mark.parametrize('wheel', [None, 0.001])
+@pytest.mark.parametrize('emit_sequence, expected_emits', [
+    (((0, 0), (0.05, 1), (0.4, 2), (0.6, 3), (0.2, 4), (0.2, 5)),
+     [(0.35, 1), (0.75, 2), (1.75, 5)]),
+    (((0, 0), (0.2, 1)), [(0.5, 1)]),
+    (((0.1, 0),), [(0.4, 0)]),
+])
+@pytest.mark.asyncio
+async def test_debounce(emit_sequence, expected_emits, wheel):
+    wheel = wheel and TimerWheel(resolution=wheel)
+    debounce = Debounce(0.3, wheel=wheel)
+    assert await run_sequence(debounce, emit_sequence) == expected_emits
+
+
+@pytest.mark.asyncio
+async def test_get_and_reset():
+    source = Value(1)
+    debounce = source | op.Debounce(0.1)
+    mock_sink = mock.Mock()
+
+    # not subscribed: state of the source
+    assert debounce.get() == 1
+
+    disposable = debounce.subscribe(Sink(mock_sink))
+    assert debounce.get() is NONE
+    await asyncio.sleep(0.15)
+    mock_sink.assert_called_once_with(1)
+    assert debounce.get() == 1
+
+    source.emit(2)
+    assert debounce.get() == 1
+
+    # resetting the state is dropping the pending value
+    debounce.reset_state()
+    assert debounce.get() is NONE
+    await asyncio.sleep(0.15)
+    mock_sink.assert_called_once_with(1)
+
+    # unsubscribing is dropping the pending value
+    source.emit(3)
+    disposable.dispose()
+    await asyncio.sleep(0.15)
+    mock_sink.assert_called_once_with(1)
+    assert debounce.get() == 3
+
+
+@pytest.mark.asyncio
+async def test_errorhandler():
+    mock_error_handler = mock.Mock()
+    p = Publisher()
+    debounce = p | op.Debounce(0.1, error_callback=mock_error_handler)
+    debounce.subscribe(Sink(mock.Mock(side_effect=ZeroDivisionError)))
+
+    p.notify(1)
+    await asyncio.sleep(0.15)
+    mock_error_handler.assert_called_once_with(ZeroDivisionError, mock.ANY,
+                                               mock.ANY)
+
+
+@pytest.mark.asyncio
+async def test_collected():
+    import gc
+    import weakref
+
+    p = Publisher()
+    debounce = p | op.Debounce(0.1)
+    disposable = debounce.subscribe(Sink())
+    p.notify(1)
+
+    reference = weakref.ref(debounce)
+    disposable.dispose()
+    del debounce, disposable
+    gc.collect()
+    assert reference() is None
+    await asyncio.sleep(0.15)
+
+
+@pytest.mark.asyncio
+async def test_argument_check():
+    with pytest.raises(ValueError):
+        Debounce(-1)
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from unittest import mock
+
+from broqer import NONE, Sink, Publisher, Value, op
+from broqer.op import Delay
+from broqer.timer import TimerWheel
+
+from .test_op_debounce import run_sequence
+
+
+@pytest.mark.parametrize('wheel', [None, 0.001])
+@pytest.mark.parametrize('emit_sequence, expected_emits', [
+    (((0, 0), (0, 1), (0.05, 2), (0.4, 3)),
+     [(0.2, 0), (0.2, 1), (0.25, 2), (0.65, 3)]),
+    (((0.1, 0),), [(0.3, 0)]),
+])
+@pytest.mark.asyncio
+async def test_delay(emit_sequence, expected_emits, wheel):
+    wheel = wheel and TimerWheel(resolution=wheel)
+    delay = Delay(0.2, wheel=wheel)
+    assert await run_sequence(delay, emit_sequence) == expected_emits
+
+
+@pytest.mark.asyncio
+async def test_get_and_reset():
+    source = Value(1)
+    delay = source | op.Delay(0.1)
+    mock_sink = mock.Mock()
+
+    assert delay.get() == 1
+
+    disposable = delay.subscribe(Sink(mock_sink))
+    assert delay.get() is NONE
+    await asyncio.sleep(0.15)
+    mock_sink.assert_called_once_with(1)
+    assert delay.get() == 1
+
+    source.emit(2)
+    source.emit(3)
+    delay.reset_state()
+    assert delay.get() is NONE
+    await asyncio.sleep(0.3)
+    mock_sink.assert_called_once_with(1)
+
+    source.emit(4)
+    disposable.dispose()
+    await asyncio.sleep(0.3)
+    mock_sink.assert_called_once_with(1)
+    assert delay.get() == 4
+
+
+@pytest.mark.asyncio
+async def test_errorhandler():
+    mock_error_handler = mock.Mock()
+    p = Publisher()
+    delay = p | op.Delay(0.1, error_callback=mock_error_handler)
+    mock_sink = mock.Mock(side_effect=(ZeroDivisionError, None))
+    delay.subscribe(Sink(mock_sink))
+
+    # an exception is not stopping the emit of the following value
+    p.notify(1)
+    p.notify(2)
+    await asyncio.sleep(0.15)
+    mock_error_handler.assert_called_once()
+    mock_sink.assert_has_calls([mock.call(1), mock.call(2)])
+
+
+@pytest.mark.asyncio
+async def test_argument_check():
+    with pytest.raises(ValueError):
+        Delay(-1)
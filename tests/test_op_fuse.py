@@ -0,0 +1,127 @@
+from unittest import mock
+
+import pytest
+
+from broqer import op, NONE, Value, Publisher, Sink
+from tests.helper_single import check_get_method, check_subscription, check_dependencies
+
+
+test_vector = [
+    # operators, input_vector, output_vector
+    ((op.Map(lambda v: v + 1),), [NONE, 1, 2], [NONE, 2, 3]),
+    ((op.Map(lambda v: v + 1), op.Map(lambda v: v * 2)), [1, 2], [4, 6]),
+    ((op.Map(lambda a, b: a + b, unpack=True), op.Filter(lambda v: v > 2)),
+     [(1, 1), (2, 2)], [NONE, 4]),
+    ((op.Filter(lambda a, b: a > b, unpack=True), op.Map(max, unpack=True)),
+     [(2, 1), (1, 2), (3, 1)], [2, NONE, 3]),
+    ((op.EvalTrue(), op.Map(lambda v: -v)), [0, 1, 2], [NONE, -1, -2]),
+    ((op.EvalFalse(), op.Map(str)), [0, 1], ['0', NONE]),
+    ((op.Map(lambda v: v // 2), op.Cache()), [1, 2, 4, 6], [0, 1, 2, 3]),
+]
+
+
+@pytest.mark.parametrize('method', [check_get_method, check_subscription, check_dependencies])
+@pytest.mark.parametrize('operators,input_vector,output_vector', test_vector)
+def test_operator(method, operators, input_vector, output_vector):
+    method(op.Fuse(*operators), input_vector, output_vector)
+
+
+def build_operators():
+    return [op.Map(lambda v: v // 2), op.Filter(lambda v: v % 5),
+            op.Cache(), op.EvalTrue(), op.Map(lambda v: (v, 1)),
+            op.Map(lambda a, b: a + b, unpack=True), op.Cache(-1)]
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_same_as_unfused(batch):
+    values = [0, 1, 2, 2, 3, 10, 11, 12, 14, 4, 4, 5, 0]
+    results = []
+
+    for fused in (False, True):
+        source = Value()
+        mock_sink = mock.Mock()
+
+        if fused:
+            publisher = source | op.Fuse(*build_operators())
+        else:
+            publisher = source
+            for operator in build_operators():
+                publisher = publisher | operator
+
+        gets = []
+        for value in values[:3]:
+            source.emit(value)
+            gets.append(publisher.get())
+
+        disposable = publisher.subscribe(Sink(mock_sink))
+
+        if batch:
+            source.emit_batch(values)
+        else:
+            for value in values:
+                source.emit(value)
+                gets.append(publisher.get())
+
+        disposable.dispose()
+        source.emit(8)
+        publisher.subscribe(Sink(mock_sink))
+        gets.append(publisher.get())
+
+        results.append((mock_sink.call_args_list, gets))
+
+    assert results[0] == results[1]
+
+
+def test_fuse_pipeline():
+    source = Value(1)
+    first = source | op.Map(lambda v: v + 1)
+    second = first | op.Filter(lambda v: v > 2) | op.Map(str)
+    fused = op.fuse(second)
+
+    assert isinstance(fused, op.Fuse)
+    assert fused.originator is source
+    assert fused.get() is NONE
+
+    # intermediate operators are still working
+    mock_first = mock.Mock()
+    mock_fused = mock.Mock()
+    first.subscribe(Sink(mock_first))
+    fused.subscribe(Sink(mock_fused))
+    mock_first.assert_called_once_with(2)
+    mock_fused.assert_not_called()
+
+    source.emit(2)
+    mock_first.assert_called_with(3)
+    mock_fused.assert_called_once_with('3')
+    assert second.get() == '3'
+
+    # stop at non fusable operators
+    pipeline = source | Value() | op.Map(str)
+    assert op.fuse(pipeline).originator is pipeline.originator
+    assert op.fuse(source) is source
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        op.Fuse(op.Map(str), Value())
+
+    with pytest.raises(ValueError):
+        op.Fuse(op.Cache(0), op.Map(str))
+
+    mock_sink = mock.Mock()
+    (Value(1) | op.Fuse(op.Map(str), op.Cache('x'))).subscribe(
+        Sink(mock_sink))
+    assert mock_sink.call_args_list == [mock.call('x'), mock.call('1')]
+
+
+def test_reset_state():
+    source = Publisher(1)
+    mock_sink = mock.Mock()
+    fused = source | op.Fuse(op.Map(lambda v: v), op.Cache())
+    fused.subscribe(Sink(mock_sink))
+
+    source.reset_state()
+    assert fused.get() is NONE
+
+    source.notify(1)
+    assert mock_sink.call_args_list == [mock.call(1), mock.call(1)]
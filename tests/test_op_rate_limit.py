@@ -0,0 +1,233 @@
+import asyncio
+import pytest
+from unittest import mock
+
+from broqer import NONE, Sink, Publisher, Value, op
+from broqer.coro_queue import MaxQueueException
+from broqer.op import RateLimit, TokenBucket, OverflowPolicy
+from broqer.timer import TimerWheel
+
+
+def timed_sink(emits):
+    """ Sink appending (time since start, value) to emits """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    return Sink(lambda v: emits.append((round(loop.time() - start, 3), v)))
+
+
+@pytest.mark.parametrize('wheel', [None, 0.001])
+@pytest.mark.asyncio
+async def test_rate_and_burst(wheel):
+    wheel = wheel and TimerWheel(resolution=wheel)
+    p = Publisher()
+    limit = p | RateLimit(10, burst=3, wheel=wheel)
+    emits = []
+    limit.subscribe(timed_sink(emits))
+
+    for value in range(6):
+        p.notify(value)
+
+    assert limit.backlog == 3
+    await asyncio.sleep(1)
+    assert emits == [(0, 0), (0, 1), (0, 2), (0.1, 3), (0.2, 4), (0.3, 5)]
+    assert limit.backlog == 0
+
+    # after being idle the burst is available again
+    emits.clear()
+    await asyncio.sleep(0.3)
+    p.notify_many(range(4))
+    await asyncio.sleep(0.2)
+    assert [v for _, v in emits] == [0, 1, 2, 3]
+    assert emits[3][0] - emits[2][0] == pytest.approx(0.1)
+
+
+@pytest.mark.asyncio
+async def test_long_run():
+    p = Publisher()
+    limit = p | RateLimit(100, burst=5, max_queue=1000)
+    mock_sink = mock.Mock()
+    limit.subscribe(Sink(mock_sink))
+
+    for value in range(500):
+        p.notify(value)
+        await asyncio.sleep(0.001)
+
+    # 5 values of the burst plus 100 per second
+    assert mock_sink.call_count == pytest.approx(55, abs=1)
+    await asyncio.sleep(5)
+    assert mock_sink.call_args_list == [mock.call(v) for v in range(500)]
+
+
+@pytest.mark.parametrize('policy, max_queue, expected', [
+    (OverflowPolicy.DROP_OLDEST, 2, [0, 3, 4]),
+    (OverflowPolicy.DROP_NEWEST, 2, [0, 1, 2]),
+    (OverflowPolicy.DROP_OLDEST, 0, [0]),
+    (OverflowPolicy.DROP_NEWEST, 0, [0]),
+])
+@pytest.mark.asyncio
+async def test_drop_policy(policy, max_queue, expected):
+    p = Publisher()
+    limit = p | RateLimit(10, max_queue=max_queue, policy=policy)
+    mock_sink = mock.Mock()
+    limit.subscribe(Sink(mock_sink))
+
+    p.notify_many(range(5))
+    assert limit.backlog == max_queue
+    await asyncio.sleep(0.5)
+    assert mock_sink.call_args_list == [mock.call(v) for v in expected]
+
+
+@pytest.mark.asyncio
+async def test_raise_policy():
+    p = Publisher()
+    limit = p | RateLimit(10, max_queue=1, policy=OverflowPolicy.RAISE)
+    mock_sink = mock.Mock()
+    limit.subscribe(Sink(mock_sink))
+
+    p.notify(0)
+    p.notify(1)
+
+    with pytest.raises(MaxQueueException):
+        p.notify(2)
+
+    await asyncio.sleep(0.15)
+    p.notify(3)
+    assert mock_sink.call_args_list == [mock.call(0), mock.call(1)]
+    await asyncio.sleep(0.1)
+    mock_sink.assert_called_with(3)
+
+
+@pytest.mark.asyncio
+async def test_get_reset_and_unsubscribe():
+    source = Value(1)
+    limit = source | RateLimit(10)
+    assert limit.get() == 1
+
+    mock_sink = mock.Mock()
+    disposable = limit.subscribe(Sink(mock_sink))
+    mock_sink.assert_called_once_with(1)
+    assert limit.get() == 1
+
+    source.emit(2)
+    source.emit(3)
+    assert limit.get() == 1
+    limit.reset_state()
+    assert limit.get() is NONE
+    assert limit.backlog == 0
+
+    await asyncio.sleep(0.3)
+    mock_sink.assert_called_once_with(1)
+
+    source.emit(4)
+    source.emit(5)
+    assert limit.backlog == 1
+    disposable.dispose()
+    assert limit.backlog == 0
+    assert limit.get() == 5
+
+    await asyncio.sleep(0.3)
+    assert mock_sink.call_args_list == [mock.call(1), mock.call(4)]
+
+
+@pytest.mark.asyncio
+async def test_errorhandler():
+    mock_error_handler = mock.Mock()
+    p = Publisher()
+    limit = p | RateLimit(10, error_callback=mock_error_handler)
+    mock_sink = mock.Mock(side_effect=ZeroDivisionError)
+    limit.subscribe(Sink(mock_sink))
+
+    p.notify(1)
+    p.notify(2)
+    mock_error_handler.assert_called_once_with(ZeroDivisionError, mock.ANY,
+                                               mock.ANY)
+
+    await asyncio.sleep(0.15)
+    assert mock_error_handler.call_count == 2
+    assert mock_sink.call_args_list == [mock.call(1), mock.call(2)]
+
+
+@pytest.mark.asyncio
+async def test_token_bucket():
+    bucket = TokenBucket(10, burst=2)
+    assert bucket.tokens == 2
+    assert bucket.delay() == 0
+
+    assert bucket.consume()
+    assert bucket.consume()
+    assert not bucket.consume()
+    assert bucket.delay() == pytest.approx(0.1)
+
+    await asyncio.sleep(0.05)
+    assert bucket.tokens == pytest.approx(0.5)
+    await asyncio.sleep(1)
+    assert bucket.tokens == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_high_rate():
+    # the tolerance is not growing with the rate
+    loop = asyncio.get_running_loop()
+    bucket = TokenBucket(1e6)
+    assert bucket.consume()
+    assert not bucket.consume()
+
+    start = loop.time()
+    await bucket.acquire()
+    assert loop.time() - start == pytest.approx(1e-6)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_acquire():
+    loop = asyncio.get_running_loop()
+    bucket = TokenBucket(10)
+    start = loop.time()
+    times = []
+
+    async def _acquire(index):
+        await bucket.acquire()
+        times.append((index, round(loop.time() - start, 3)))
+
+    tasks = [asyncio.ensure_future(_acquire(i)) for i in range(4)]
+    await asyncio.sleep(0)
+
+    # a cancelled waiter is giving back its token
+    tasks[2].cancel()
+    await asyncio.sleep(1)
+    assert times == [(0, 0), (1, 0.1), (3, 0.3)]
+    assert bucket.tokens == 1
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_with_map_async():
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    bucket = TokenBucket(20, burst=2)
+    calls = []
+
+    async def _query(factor, value):
+        calls.append(round(loop.time() - start, 3))
+        await asyncio.sleep(0.5)
+        return value * factor
+
+    p = Publisher()
+    mock_sink = mock.Mock()
+    (p | op.MapAsync(bucket.wrap(_query, 2))).subscribe(Sink(mock_sink))
+    p.notify_many(range(5))
+
+    await asyncio.sleep(1)
+    assert calls == [0, 0, 0.05, 0.1, 0.15]
+    assert mock_sink.call_args_list == [mock.call(v * 2) for v in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_argument_check():
+    for args in ((0,), (-1,), (10, 0)):
+        with pytest.raises(ValueError):
+            TokenBucket(*args)
+
+        with pytest.raises(ValueError):
+            RateLimit(*args)
+
+    with pytest.raises(ValueError):
+        RateLimit(10, max_queue=-1)
@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from unittest import mock
+
+from broqer import NONE, Sink, Publisher, Value, op
+from broqer.op import Sample
+from broqer.timer import TimerWheel
+
+from .test_op_debounce import run_sequence
+
+
+@pytest.mark.parametrize('wheel', [None, 0.001])
+@pytest.mark.parametrize('emit_sequence, expected_emits', [
+    (((0, 0), (0.05, 1), (0.1, 2), (0.1, 3), (0.5, 4)),
+     [(0.2, 2), (0.4, 3), (0.95, 4)]),
+    (((0.1, 0),), [(0.3, 0)]),
+])
+@pytest.mark.asyncio
+async def test_sample(emit_sequence, expected_emits, wheel):
+    wheel = wheel and TimerWheel(resolution=wheel)
+    sample = Sample(0.2, wheel=wheel)
+    assert await run_sequence(sample, emit_sequence) == expected_emits
+
+
+@pytest.mark.asyncio
+async def test_get_and_reset():
+    source = Value(1)
+    sample = source | op.Sample(0.1)
+    mock_sink = mock.Mock()
+
+    assert sample.get() == 1
+
+    disposable = sample.subscribe(Sink(mock_sink))
+    assert sample.get() is NONE
+    await asyncio.sleep(0.15)
+    mock_sink.assert_called_once_with(1)
+    assert sample.get() == 1
+
+    source.emit(2)
+    sample.reset_state()
+    assert sample.get() is NONE
+    await asyncio.sleep(0.3)
+    mock_sink.assert_called_once_with(1)
+
+    source.emit(3)
+    disposable.dispose()
+    await asyncio.sleep(0.3)
+    mock_sink.assert_called_once_with(1)
+    assert sample.get() == 3
+
+
+@pytest.mark.asyncio
+async def test_errorhandler():
+    mock_error_handler = mock.Mock()
+    p = Publisher()
+    sample = p | op.Sample(0.1, error_callback=mock_error_handler)
+    mock_sink = mock.Mock(side_effect=ZeroDivisionError)
+    sample.subscribe(Sink(mock_sink))
+
+    p.notify(1)
+    await asyncio.sleep(0.15)
+    p.notify(2)
+    await asyncio.sleep(0.1)
+    assert mock_error_handler.call_count == 2
+    mock_sink.assert_called_with(2)
+
+
+@pytest.mark.asyncio
+async def test_argument_check():
+    with pytest.raises(ValueError):
+        Sample(0)
@@ -0,0 +1,158 @@
+import asyncio
+import pytest
+from unittest import mock
+
+from broqer import NONE, Sink, SinkAsync, Publisher, Value, op
+from broqer.coro_queue import AsyncMode
+from broqer.op import Shed, ShedMode
+
+
+class SlowSink:
+    """ Sink advancing a fake clock by ``cost`` for each value """
+    def __init__(self, cost):
+        self.now = 0.0
+        self.cost = cost
+        self.values = []
+
+    def clock(self):
+        return self.now
+
+    def __call__(self, value):
+        self.now += self.cost
+        self.values.append(value)
+
+
+async def emit_values(publisher, count, interval=0.001):
+    for value in range(count):
+        publisher.notify(value)
+        await asyncio.sleep(interval)
+
+
+@pytest.mark.asyncio
+async def test_pass_through():
+    p = Publisher()
+    sink = SlowSink(0.0001)
+    shed = p | Shed(cpu_budget=0.5, window=0.1, clock=sink.clock)
+    shed.subscribe(Sink(sink))
+    ratios = []
+    shed.ratio.subscribe(Sink(ratios.append))
+
+    await emit_values(p, 500)
+    assert sink.values == list(range(500))
+    assert shed.mode is ShedMode.PASS
+    assert ratios == [0.0]
+
+
+@pytest.mark.asyncio
+async def test_sample_and_recover():
+    p = Publisher()
+    sink = SlowSink(0.01)
+    shed = p | Shed(cpu_budget=0.5, window=0.1, clock=sink.clock)
+    shed.subscribe(Sink(sink))
+
+    await emit_values(p, 1000)
+    assert shed.mode is ShedMode.SAMPLE
+
+    # the time spent in the sink is within the budget (after the first
+    # window)
+    assert len(sink.values) * 0.01 < 0.5 * 1.0 + 1.5
+    assert shed.ratio.get() > 0.5
+
+    # the latest value is forwarded at the end of the window
+    await asyncio.sleep(0.2)
+    assert sink.values[-1] == 999
+    assert shed.get() == 999
+
+    # recover when the sink is fast again
+    sink.cost = 0.00001
+    await emit_values(p, 1000)
+    assert shed.mode is ShedMode.PASS
+    assert sink.values[-100:] == list(range(900, 1000))
+
+    await asyncio.sleep(0.2)
+    assert shed.ratio.get() == 0
+
+
+@pytest.mark.asyncio
+async def test_conflate():
+    p = Publisher()
+    sink = SlowSink(1)  # much slower than the window
+    shed = p | Shed(cpu_budget=0.5, window=0.1, min_ratio=0.1,
+                    clock=sink.clock)
+    shed.subscribe(Sink(sink))
+
+    await emit_values(p, 200)
+    count = len(sink.values)
+    assert shed.mode is ShedMode.CONFLATE
+
+    # one value per window
+    await emit_values(p, 100)
+    assert len(sink.values) - count <= 2
+    assert shed.ratio.get() > 0.9
+
+
+@pytest.mark.asyncio
+async def test_backlog():
+    p = Publisher()
+    processed = []
+
+    async def _process(value):
+        await asyncio.sleep(0.01)
+        processed.append(value)
+
+    sink = SinkAsync(_process, mode=AsyncMode.QUEUE)
+    shed = p | Shed(window=0.1, backlog=lambda: sink.backlog, max_backlog=10)
+    shed.subscribe(sink)
+
+    await emit_values(p, 1000)
+    assert shed.mode is not ShedMode.PASS
+    assert sink.backlog < 30
+
+    await asyncio.sleep(1)
+    assert sink.backlog == 0
+    assert processed[-1] == 999
+
+
+@pytest.mark.asyncio
+async def test_get_reset_and_unsubscribe():
+    source = Value(1)
+    sink = SlowSink(1)
+    shed = source | Shed(window=0.1, clock=sink.clock)
+    assert shed.get() == 1
+
+    disposable = shed.subscribe(Sink(sink))
+    assert shed.get() == 1
+
+    await emit_values(source, 100)
+    assert shed.mode is not ShedMode.PASS
+
+    # the pending value is dropped
+    source.emit(5)
+    shed.reset_state()
+    assert shed.get() is NONE
+    await asyncio.sleep(0.2)
+    assert sink.values[-1] != 5
+
+    disposable.dispose()
+    assert shed.mode is ShedMode.PASS
+    assert shed.get() == 5
+
+
+@pytest.mark.asyncio
+async def test_errorhandler():
+    mock_error_handler = mock.Mock()
+    p = Publisher()
+    shed = p | Shed(error_callback=mock_error_handler)
+    shed.subscribe(Sink(mock.Mock(side_effect=ZeroDivisionError)))
+
+    p.notify(1)
+    mock_error_handler.assert_called_once_with(ZeroDivisionError, mock.ANY,
+                                               mock.ANY)
+
+
+@pytest.mark.asyncio
+async def test_argument_check():
+    for kwargs in ({'cpu_budget': 0}, {'cpu_budget': 1.5}, {'window': 0},
+                   {'max_backlog': 0}):
+        with pytest.raises(ValueError):
+            Shed(**kwargs)
@@ -4,6 +4,7 @@ from unittest import mock
 
 from broqer import NONE, Sink, Publisher, op
 from broqer.op import Throttle
+from broqer.timer import TimerWheel
 
 
 @pytest.mark.asyncio
@@ -127,3 +128,30 @@ async def test_throttle(emit_sequence, expected_emits):
 def test_argument_check():
     with pytest.raises(ValueError):
         Throttle(-1)
+
+
+@pytest.mark.parametrize('emit_sequence, expected_emits', [
+    (((0, 0), (0.05, 1), (0.4, 2), (0.6, 3), (0.2, 4), (0.2, 5)),
+     (mock.call(0), mock.call(2), mock.call(3), mock.call(5))),
+    (((0.001, 0), (0.6, 1), (0.5, 2), (0.05, 3), (0.44, 4)),
+     (mock.call(0), mock.call(1), mock.call(2), mock.call(4))),
+])
+@pytest.mark.asyncio
+async def test_throttle_wheel(emit_sequence, expected_emits):
+    p = Publisher()
+    mock_sink = mock.Mock()
+    wheel = TimerWheel(resolution=0.001)
+
+    throttle = p | op.Throttle(0.5, wheel=wheel)
+    throttle.subscribe(Sink(mock_sink))
+
+    for item in emit_sequence:
+        await asyncio.sleep(item[0])
+        p.notify(item[1])
+
+    await asyncio.sleep(0.5)
+
+    mock_sink.assert_has_calls(expected_emits)
+
+    throttle.reset()
+    assert len(wheel) == 0
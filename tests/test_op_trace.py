@@ -0,0 +1,162 @@
+import io
+import json
+from unittest import mock
+
+import pytest
+
+from broqer import Publisher, Trace, default_error_handler
+from broqer.subscribers.trace import TraceBuffer, load_binary
+
+
+@pytest.fixture
+def trace_buffer():
+    buffer = TraceBuffer(size=4)
+    Trace.set_handler(buffer)
+    try:
+        yield buffer
+    finally:
+        Trace.reset_handler()
+
+
+def test_ring_buffer(trace_buffer):
+    publisher = Publisher()
+    other = Publisher()
+    publisher.subscribe(Trace(label='first'))
+    other.subscribe(Trace())
+
+    publisher.notify(1)
+    assert len(trace_buffer) == 1
+    other.notify(2)
+
+    entries = trace_buffer.entries()
+    assert [(i, v) for _, i, v in entries] == [(id(publisher), 1),
+                                               (id(other), 2)]
+    assert entries[0][0] <= entries[1][0]
+    assert trace_buffer.label(id(publisher)) == 'first'
+    assert trace_buffer.label(id(other)) is None
+
+    publisher.notify_many([3, 4, 5, 6])
+    assert [v for _, _, v in trace_buffer.entries()] == [3, 4, 5, 6]
+    assert len(trace_buffer) == 4
+    assert trace_buffer.recorded == 6
+
+    trace_buffer.clear()
+    assert trace_buffer.entries() == []
+
+
+def test_sample_and_summary():
+    buffer = TraceBuffer(size=10, sample=3, summary=type)
+    publisher = Publisher()
+
+    for value in range(10):
+        buffer(publisher, value)
+
+    # the 1st, 4th, 7th, ... emit is recorded
+    for value in (None, None, 'text'):
+        buffer(publisher, value)
+
+    assert [v for _, _, v in buffer.entries()] == [int, int, int, int, str]
+
+    with pytest.raises(ValueError):
+        TraceBuffer(size=0)
+
+    with pytest.raises(ValueError):
+        TraceBuffer(sample=0)
+
+
+def test_dumps(tmp_path):
+    buffer = TraceBuffer(size=3)
+    publisher = Publisher()
+
+    for value in (1, 'ä', [1, 2], None):
+        buffer(publisher, value, label='p')
+
+    text = io.StringIO()
+    buffer.dump_jsonl(text)
+    lines = [json.loads(line) for line in text.getvalue().splitlines()]
+    assert [line['value'] for line in lines] == ["'ä'", '[1, 2]', 'None']
+    assert lines[0]['publisher'] == id(publisher)
+    assert lines[0]['label'] == 'p'
+
+    binary = io.BytesIO()
+    buffer.dump_binary(binary)
+    binary.seek(0)
+    loaded = list(load_binary(binary))
+    assert loaded == [(t, i, repr(v)) for t, i, v in buffer.entries()]
+
+    with pytest.raises(ValueError):
+        list(load_binary(io.BytesIO(b'invalid')))
+
+    buffer.dump(str(tmp_path / 'trace.jsonl'))
+    assert (tmp_path / 'trace.jsonl').read_text(encoding='utf-8') == \
+        text.getvalue()
+
+    buffer.dump(str(tmp_path / 'trace.bin'), binary=True)
+    assert (tmp_path / 'trace.bin').read_bytes() == binary.getvalue()
+
+
+def test_dump_on_error(tmp_path, trace_buffer):
+    path = tmp_path / 'trace.jsonl'
+    previous = mock.Mock()
+    default_error_handler.set(previous)
+
+    try:
+        trace_buffer.dump_on_error(str(path))
+
+        publisher = Publisher()
+        publisher.subscribe(Trace(mock.Mock(side_effect=ValueError)))
+        publisher.notify(1)
+
+        previous.assert_called_once()
+        assert json.loads(path.read_text())['value'] == '1'
+
+        trace_buffer.remove_dump_on_error()
+        trace_buffer.remove_dump_on_error()
+        assert default_error_handler._error_callback is previous
+    finally:
+        default_error_handler.reset()
+
+
+def test_default_handler(capsys):
+    publisher = Publisher()
+    publisher.subscribe(Trace(label='p'))
+    publisher.notify(1)
+    assert capsys.readouterr().out.endswith(': p 1\n')
+
+    Trace.set_handler(mock.Mock())
+    try:
+        publisher.notify(2)
+        Trace._trace_handler.assert_called_once_with(publisher, 2, label='p')
+    finally:
+        Trace.reset_handler()
+
+    publisher.notify(3)
+    assert capsys.readouterr().out.endswith(': p 3\n')
+
+
+def test_function_handler():
+    publisher = Publisher()
+    trace = Trace(label='p')
+    publisher.subscribe(trace)
+    calls = []
+
+    # plain functions are bound to the Trace instance (as before 3.3.0)
+    def bound_handler(self, publisher, value, label=None):
+        calls.append((self, publisher, value, label))
+
+    Trace.set_handler(bound_handler)
+    try:
+        publisher.notify(1)
+    finally:
+        Trace.reset_handler()
+
+    def handler(publisher, value, label=None):
+        calls.append((publisher, value, label))
+
+    Trace.set_function_handler(handler)
+    try:
+        publisher.notify(2)
+    finally:
+        Trace.reset_handler()
+
+    assert calls == [(trace, publisher, 1, 'p'), (publisher, 2, 'p')]
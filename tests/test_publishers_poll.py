@@ -3,6 +3,7 @@ import pytest
 from unittest import mock
 
 from broqer.publishers import PollPublisher
+from broqer.timer import TimerWheel
 from broqer import Sink, NONE
 
 
@@ -23,3 +24,30 @@ async def test_subscribe():
     await asyncio.sleep(2.5)
     sink_mock.assert_called_with(3)
     assert sink_mock.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_wheel():
+    poll_mock = mock.Mock(return_value=3)
+    sink_mock = mock.Mock()
+    wheel = TimerWheel(resolution=0.1)
+
+    p = PollPublisher(poll_mock, 1, wheel=wheel)
+    disposable = p.subscribe(Sink(sink_mock))
+    sink_mock.assert_called_once_with(3)
+
+    await asyncio.sleep(2.5)
+    assert sink_mock.call_count == 3
+
+    disposable.dispose()
+    assert len(wheel) == 0
+    await asyncio.sleep(2)
+    assert sink_mock.call_count == 3
+
+    # unsubscribing in the poll callback is stopping the polling
+    disposables = []
+    disposables.append(p.subscribe(
+        Sink(lambda v: disposables and disposables.pop().dispose())))
+    await asyncio.sleep(2)
+    assert poll_mock.call_count == 5
+    assert len(wheel) == 0